@@ -20,6 +20,10 @@ from .const import (
 )
 from .coordinator import MammotionDataUpdateCoordinator
 from .error_handling import MammotionErrorHandling
+from .memory import async_setup_snapshot_service
+from .profiling import CONF_MONITOR_CALLBACKS, async_setup_services
+from .scheduler import MammotionScheduler
+from .websocket_api import async_setup_websocket
 
 PLATFORMS: list[Platform] = [
     Platform.BINARY_SENSOR,
@@ -27,9 +31,12 @@ PLATFORMS: list[Platform] = [
     Platform.DEVICE_TRACKER,
     Platform.SENSOR,
     Platform.BUTTON,
+    Platform.CALENDAR,
     Platform.SWITCH,
     Platform.NUMBER,
     Platform.SELECT,
+    Platform.IMAGE,
+    Platform.UPDATE,
 ]
 
 type MammotionConfigEntry = ConfigEntry[MammotionDataUpdateCoordinator]
@@ -81,7 +88,19 @@ async def async_setup_entry(hass: HomeAssistant, entry: MammotionConfigEntry) ->
 
         await mammotion_coordinator.async_config_entry_first_refresh()
         entry.runtime_data = mammotion_coordinator
+        mammotion_coordinator.scheduler = MammotionScheduler(hass, mammotion_coordinator)
+        await mammotion_coordinator.scheduler.async_load()
+        await mammotion_coordinator.connection.async_start()
+        await mammotion_coordinator.statistics.async_start()
+        await mammotion_coordinator.predictions.async_start()
         await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+        mammotion_coordinator.async_monitor_callbacks(
+            entry.options.get(CONF_MONITOR_CALLBACKS, False)
+        )
+        async_setup_services(hass)
+        async_setup_snapshot_service(hass)
+        async_setup_websocket(hass)
+        entry.async_on_unload(entry.add_update_listener(_async_update_listener))
 
         # need to register service for triggering tasks
         # hass.services.async_register(DOMAIN, SERVICE_START_TASK, async_start_mowing)
@@ -108,6 +127,15 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     try:
         unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
         if unload_ok:
+            if entry.runtime_data.scheduler is not None:
+                entry.runtime_data.scheduler.async_unload()
+            await entry.runtime_data.manual_drive.async_stop()
+            entry.runtime_data.connection.async_stop()
+            entry.runtime_data.statistics.async_stop()
+            entry.runtime_data.predictions.async_stop()
+            entry.runtime_data.proxies.async_stop()
+            await entry.runtime_data.async_stop_capture()
+            entry.runtime_data.async_monitor_callbacks(False)
             await hass.async_add_executor_job(
                 entry.runtime_data.manager.remove_device, entry.runtime_data.device_name
             )
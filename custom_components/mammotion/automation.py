@@ -1,9 +1,18 @@
 """Automation capabilities for the Mammotion integration."""
 
-from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers.event import async_track_state_change_event
+from collections.abc import Callable
+from typing import Any
+
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    Event,
+    EventStateChangedData,
+    HomeAssistant,
+    callback,
+)
+from homeassistant.helpers import condition
+from homeassistant.helpers.event import async_call_later, async_track_state_change_event
 from homeassistant.helpers.script import Script
-from homeassistant.helpers.service import async_call_from_config
 
 from .const import DOMAIN
 from .error_handling import MammotionErrorHandling
@@ -12,29 +21,173 @@ AUTOMATION_SCHEMA = {
     "trigger": list,
     "condition": list,
     "action": list,
+    "debounce": float,
+    "throttle": float,
 }
 
 
+def _as_list(value: Any) -> list[Any]:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+class _StateTrigger:
+    """A state trigger reduced to its from/to filters."""
+
+    __slots__ = ("automation", "from_states", "to_states")
+
+    def __init__(self, automation: "MammotionAutomation", config: dict) -> None:
+        self.automation = automation
+        self.from_states = frozenset(_as_list(config.get("from"))) or None
+        self.to_states = frozenset(_as_list(config.get("to"))) or None
+
+    def matches(self, data: EventStateChangedData) -> bool:
+        """Return True if the state change passes the from/to filters."""
+        old_state, new_state = data["old_state"], data["new_state"]
+        if self.to_states is not None and (
+            new_state is None or new_state.state not in self.to_states
+        ):
+            return False
+        if self.from_states is not None and (
+            old_state is None or old_state.state not in self.from_states
+        ):
+            return False
+        return True
+
+
+class MammotionTriggerDispatcher:
+    """Route state changes to automations through an entity_id index.
+
+    A single state change listener covers every indexed entity, so a change
+    only reaches the triggers registered for that entity instead of fanning
+    out to every automation.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the dispatcher."""
+        self.hass = hass
+        self._index: dict[str, list[_StateTrigger]] = {}
+        self._remove_listener: CALLBACK_TYPE | None = None
+        self.error_handler = MammotionErrorHandling(hass)
+        self.triggers_fired = 0
+        self.triggers_suppressed = 0
+        self.executions = 0
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Return dispatch counters."""
+        return {
+            "entities": len(self._index),
+            "triggers_fired": self.triggers_fired,
+            "triggers_suppressed": self.triggers_suppressed,
+            "executions": self.executions,
+        }
+
+    def register(self, automation: "MammotionAutomation") -> None:
+        """Index the state triggers of an automation."""
+        added = False
+        for trigger_config in automation.config.get("trigger", []):
+            trigger = _StateTrigger(automation, trigger_config)
+            for entity_id in _as_list(trigger_config.get("entity_id")):
+                added |= entity_id not in self._index
+                self._index.setdefault(entity_id, []).append(trigger)
+        if added:
+            self._resubscribe()
+
+    def unregister(self, automation: "MammotionAutomation") -> None:
+        """Drop every trigger of an automation from the index."""
+        removed = False
+        for entity_id in list(self._index):
+            triggers = [
+                trigger
+                for trigger in self._index[entity_id]
+                if trigger.automation is not automation
+            ]
+            if triggers:
+                self._index[entity_id] = triggers
+            else:
+                del self._index[entity_id]
+                removed = True
+        if removed:
+            self._resubscribe()
+
+    def _resubscribe(self) -> None:
+        """Track exactly the indexed entities."""
+        if self._remove_listener:
+            self._remove_listener()
+            self._remove_listener = None
+        if self._index:
+            self._remove_listener = async_track_state_change_event(
+                self.hass, list(self._index), self._handle_event
+            )
+
+    @callback
+    def _handle_event(self, event: Event[EventStateChangedData]) -> None:
+        """Hand a state change to the triggers indexed for its entity."""
+        try:
+            fired: set[int] = set()
+            for trigger in self._index.get(event.data["entity_id"], ()):
+                automation = trigger.automation
+                if id(automation) in fired or not trigger.matches(event.data):
+                    continue
+                fired.add(id(automation))
+                automation.async_trigger(event)
+        except Exception as error:
+            self.error_handler.handle_error(error, "_handle_event")
+
+
 class MammotionAutomation:
-    """Class to handle automations for the Mammotion integration."""
+    """Class to handle automations for the Mammotion integration.
 
-    def __init__(self, hass: HomeAssistant, config: dict):
+    ``debounce`` delays the actions until triggers have been quiet for that
+    many seconds, running once with the latest event. ``throttle`` drops
+    triggers arriving within that many seconds of the last run.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        config: dict,
+        dispatcher: MammotionTriggerDispatcher | None = None,
+    ):
         """Initialize the automation."""
         self.hass = hass
         self.config = config
-        self.script = Script(hass, config.get("action", []), DOMAIN)
-        self._remove_listener = None
+        self.dispatcher = dispatcher or MammotionTriggerDispatcher(hass)
+        self.script = Script(hass, config.get("action", []), DOMAIN, DOMAIN)
+        self._remove_listener: Callable[[], None] | None = None
+        self._condition: condition.ConditionCheckerType | None = None
+        self._cancel_debounce: CALLBACK_TYPE | None = None
+        self._last_run: float | None = None
         self.error_handler = MammotionErrorHandling(hass)
+        self.triggers_fired = 0
+        self.triggers_suppressed = 0
+        self.executions = 0
 
     async def async_enable(self):
         """Enable the automation."""
         try:
-            self._remove_listener = async_track_state_change_event(
-                self.hass, self.config.get("trigger", []), self._handle_trigger
-            )
+            self._condition = None
+            if conditions := self.config.get("condition", []):
+                validated = await condition.async_validate_conditions_config(
+                    self.hass, conditions
+                )
+                self._condition = await condition.async_and_from_config(
+                    self.hass, {"conditions": validated}
+                )
+            self.dispatcher.register(self)
+            self._remove_listener = self._unregister
         except Exception as error:
             self.error_handler.handle_error(error, "async_enable")
 
+    @callback
+    def _unregister(self) -> None:
+        self.dispatcher.unregister(self)
+        if self._cancel_debounce:
+            self._cancel_debounce()
+            self._cancel_debounce = None
+
     async def async_disable(self):
         """Disable the automation."""
         try:
@@ -45,22 +198,68 @@ class MammotionAutomation:
             self.error_handler.handle_error(error, "async_disable")
 
     @callback
+    def async_trigger(self, event: Event) -> None:
+        """Apply the debounce and throttle windows to a matched trigger."""
+        self.triggers_fired += 1
+        self.dispatcher.triggers_fired += 1
+
+        if throttle := self.config.get("throttle"):
+            now = self.hass.loop.time()
+            if self._last_run is not None and now - self._last_run < throttle:
+                self._suppress()
+                return
+
+        if debounce := self.config.get("debounce"):
+            if self._cancel_debounce:
+                self._cancel_debounce()
+                self._suppress()
+
+            @callback
+            def _run_debounced(_now: Any) -> None:
+                self._cancel_debounce = None
+                self._start(event)
+
+            self._cancel_debounce = async_call_later(self.hass, debounce, _run_debounced)
+            return
+
+        self._start(event)
+
+    def _suppress(self) -> None:
+        self.triggers_suppressed += 1
+        self.dispatcher.triggers_suppressed += 1
+
+    @callback
+    def _start(self, event: Event) -> None:
+        self._last_run = self.hass.loop.time()
+        self.hass.async_create_task(self._handle_trigger(event))
+
     async def _handle_trigger(self, event):
         """Handle the trigger event."""
         try:
-            if all(
-                await self.hass.helpers.condition.async_condition(self.config.get("condition", []))
-            ):
-                await self.script.async_run(context=event.context)
+            variables = {"trigger": {"platform": "state", **event.data}}
+            if self._condition is not None and not self._condition(self.hass, variables):
+                return
+            self.executions += 1
+            self.dispatcher.executions += 1
+            await self.script.async_run(run_variables=variables, context=event.context)
         except Exception as error:
             self.error_handler.handle_error(error, "_handle_trigger")
 
+    @property
+    def stats(self) -> dict[str, int]:
+        """Return trigger counters for this automation."""
+        return {
+            "triggers_fired": self.triggers_fired,
+            "triggers_suppressed": self.triggers_suppressed,
+            "executions": self.executions,
+        }
+
     async def async_update(self, config: dict):
         """Update the automation configuration."""
         try:
             await self.async_disable()
             self.config = config
-            self.script = Script(self.hass, config.get("action", []), DOMAIN)
+            self.script = Script(self.hass, config.get("action", []), DOMAIN, DOMAIN)
             await self.async_enable()
         except Exception as error:
             self.error_handler.handle_error(error, "async_update")
@@ -70,9 +269,10 @@ async def async_setup_automations(hass: HomeAssistant, config: dict):
     """Set up automations for the Mammotion integration."""
     automations = []
     error_handler = MammotionErrorHandling(hass)
+    dispatcher = MammotionTriggerDispatcher(hass)
     try:
         for automation_config in config.get("automations", []):
-            automation = MammotionAutomation(hass, automation_config)
+            automation = MammotionAutomation(hass, automation_config, dispatcher)
             await automation.async_enable()
             automations.append(automation)
     except Exception as error:
@@ -82,9 +282,5 @@ async def async_setup_automations(hass: HomeAssistant, config: dict):
 
 async def async_unload_automations(automations):
     """Unload automations for the Mammotion integration."""
-    error_handler = MammotionErrorHandling(hass)
-    try:
-        for automation in automations:
-            await automation.async_disable()
-    except Exception as error:
-        error_handler.handle_error(error, "async_unload_automations")
+    for automation in automations:
+        await automation.async_disable()
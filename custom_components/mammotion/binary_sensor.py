@@ -10,12 +10,12 @@ from homeassistant.components.binary_sensor import (
 )
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from pymammotion.proto.luba_msg import LubaMsg
 
 from . import MammotionConfigEntry
 from .coordinator import MammotionDataUpdateCoordinator
 from .entity import MammotionBaseEntity
 from .error_handling import MammotionErrorHandling
+from .snapshot import MowerSnapshot
 
 
 @dataclass(frozen=True, kw_only=True)
@@ -24,15 +24,14 @@ class MammotionBinarySensorEntityDescription(
 ):
     """Describes Mammotion binary sensor entity."""
 
-    is_on_fn: Callable[[LubaMsg], bool | None]
+    is_on_fn: Callable[[MowerSnapshot], bool | None]
 
 
 BINARY_SENSORS: tuple[MammotionBinarySensorEntityDescription, ...] = (
     MammotionBinarySensorEntityDescription(
         key="charging",
         device_class=BinarySensorDeviceClass.BATTERY_CHARGING,
-        is_on_fn=lambda mower_data: mower_data.sys.toapp_report_data.dev.charge_state
-        in (1, 2),
+        is_on_fn=lambda snapshot: snapshot.charge_state in (1, 2),
     ),
 )
 
@@ -81,7 +80,7 @@ class MammotionBinarySensorEntity(MammotionBaseEntity, BinarySensorEntity):
     def is_on(self) -> bool | None:
         """Return true if the binary sensor is on."""
         try:
-            return self.entity_description.is_on_fn(self.coordinator.data)
+            return self.entity_description.is_on_fn(self.snapshot)
         except Exception as error:
             self.error_handler.handle_error(error, "is_on")
             return None
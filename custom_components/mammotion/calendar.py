@@ -0,0 +1,92 @@
+"""Calendar of the job plans stored on the mower."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from homeassistant.components.calendar import CalendarEntity, CalendarEvent
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.util import dt as dt_util
+
+from . import MammotionConfigEntry
+from .coordinator import MammotionDataUpdateCoordinator
+from .entity import MammotionBaseEntity
+from .error_handling import MammotionErrorHandling
+from .plans import CachedPlan
+
+NEXT_EVENT_LOOKAHEAD = timedelta(days=8)
+NEXT_EVENT_RECHECK = timedelta(hours=1)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: MammotionConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the Mammotion plan calendar."""
+    coordinator: MammotionDataUpdateCoordinator = entry.runtime_data
+    error_handler = MammotionErrorHandling(hass)
+
+    try:
+        async_add_entities([MammotionPlanCalendarEntity(coordinator)])
+    except Exception as error:
+        error_handler.handle_error(error, "async_setup_entry")
+
+
+def _to_event(start: datetime, end: datetime, plan: CachedPlan) -> CalendarEvent:
+    return CalendarEvent(
+        start=start,
+        end=end,
+        summary=plan.name,
+        uid=plan.plan_id,
+        recurrence_id=start.isoformat(),
+    )
+
+
+class MammotionPlanCalendarEntity(MammotionBaseEntity, CalendarEntity):
+    """Device-side job plans rendered from the plan cache."""
+
+    _attr_translation_key = "plans"
+
+    def __init__(self, coordinator: MammotionDataUpdateCoordinator) -> None:
+        """Initialize the plan calendar."""
+        super().__init__(coordinator, "plans")
+        self.error_handler = MammotionErrorHandling(coordinator.hass)
+        self._next_event: CalendarEvent | None = None
+        self._next_event_version = -1
+        self._next_event_valid_until = dt_util.now()
+
+    @property
+    def event(self) -> CalendarEvent | None:
+        """Return the current or next plan run."""
+        try:
+            plans = self.coordinator.plans
+            now = dt_util.now()
+            if self._next_event_version == plans.version and now < self._next_event_valid_until:
+                return self._next_event
+            events = plans.events(now, now + NEXT_EVENT_LOOKAHEAD)
+            self._next_event = _to_event(*events[0]) if events else None
+            self._next_event_version = plans.version
+            self._next_event_valid_until = (
+                self._next_event.end_datetime_local
+                if self._next_event
+                else now + NEXT_EVENT_RECHECK
+            )
+            return self._next_event
+        except Exception as error:
+            self.error_handler.handle_error(error, "event")
+            return None
+
+    async def async_get_events(
+        self, hass: HomeAssistant, start_date: datetime, end_date: datetime
+    ) -> list[CalendarEvent]:
+        """Return plan runs in a time window from the cache."""
+        try:
+            return [
+                _to_event(start, end, plan)
+                for start, end, plan in self.coordinator.plans.events(start_date, end_date)
+            ]
+        except Exception as error:
+            self.error_handler.handle_error(error, "async_get_events")
+            return []
@@ -0,0 +1,294 @@
+"""Capture raw mower traffic to a file and replay it."""
+
+from __future__ import annotations
+
+import asyncio
+import struct
+import time
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from datetime import timedelta
+from enum import IntEnum
+from pathlib import Path
+from typing import IO, Any
+
+import betterproto
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+from pymammotion.mammotion.devices.base import MammotionBaseDevice
+from pymammotion.proto import has_field
+from pymammotion.proto.luba_msg import LubaMsg
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CAPTURE_SUFFIX = ".mcap"
+MAGIC = b"MMCAP"
+FORMAT_VERSION = 1
+FLAG_ZSTD = 0x01
+# magic, format version, flags
+HEADER = struct.Struct("<5sBB")
+# direction, seconds since the capture started, payload length
+RECORD = struct.Struct("<BdI")
+FLUSH_BYTES = 64 * 1024
+FLUSH_INTERVAL = timedelta(seconds=5)
+
+
+class Direction(IntEnum):
+    """Which way a captured frame travelled."""
+
+    INBOUND = 0
+    OUTBOUND = 1
+
+
+@dataclass(frozen=True, slots=True)
+class CaptureRecord:
+    """One captured protobuf frame."""
+
+    direction: Direction
+    timestamp: float
+    data: bytes
+
+
+def compression_available() -> bool:
+    """Return True if captures can be zstd compressed."""
+    return zstandard is not None
+
+
+class _CommandRecorder:
+    """Wrap a device's command builder and record every command it builds."""
+
+    def __init__(self, commands: Any, record: Callable[[Direction, bytes], None]) -> None:
+        self.commands = commands
+        self._record = record
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self.commands, name)
+        if not callable(attr):
+            return attr
+
+        def _build(*args: Any, **kwargs: Any) -> Any:
+            result = attr(*args, **kwargs)
+            if isinstance(result, bytes | bytearray):
+                self._record(Direction.OUTBOUND, bytes(result))
+            return result
+
+        return _build
+
+
+class MammotionCapture:
+    """Append the frames a device's transports send and receive to a file.
+
+    Frames are buffered on the event loop and written in the executor, either
+    every ``FLUSH_INTERVAL`` or once ``FLUSH_BYTES`` are pending. With
+    compression each flush is written as an independent zstd frame, so the
+    file stays append-only and a capture cut short by a crash is still
+    readable up to its last flush.
+    """
+
+    def __init__(self, hass: HomeAssistant, path: Path, compress: bool = False) -> None:
+        """Initialize the capture."""
+        self.hass = hass
+        self.path = path
+        self.compress = compress and compression_available()
+        self.records = 0
+        self.bytes_written = 0
+        self._start: float | None = None
+        self._pending = bytearray()
+        self._transports: list[MammotionBaseDevice] = []
+        self._write_lock = asyncio.Lock()
+        self._flush_scheduled = False
+        self._cancel_interval: CALLBACK_TYPE | None = None
+        self._compressor = zstandard.ZstdCompressor() if self.compress else None
+
+    def attach(self, transport: MammotionBaseDevice) -> None:
+        """Record the frames going through a BLE or cloud transport."""
+        update_raw_data = transport._update_raw_data  # noqa: SLF001
+
+        def _update_raw_data(data: bytes) -> None:
+            self.record(Direction.INBOUND, bytes(data))
+            update_raw_data(data)
+
+        transport._update_raw_data = _update_raw_data  # noqa: SLF001
+        transport._commands = _CommandRecorder(transport._commands, self.record)  # noqa: SLF001
+        self._transports.append(transport)
+
+    def detach(self) -> None:
+        """Restore every attached transport."""
+        for transport in self._transports:
+            vars(transport).pop("_update_raw_data", None)
+            if isinstance(recorder := transport._commands, _CommandRecorder):  # noqa: SLF001
+                transport._commands = recorder.commands  # noqa: SLF001
+        self._transports.clear()
+
+    @callback
+    def record(self, direction: Direction, data: bytes) -> None:
+        """Buffer a frame."""
+        now = time.monotonic()
+        if self._start is None:
+            self._start = now
+        self._pending += RECORD.pack(direction, now - self._start, len(data))
+        self._pending += data
+        self.records += 1
+        if len(self._pending) >= FLUSH_BYTES and not self._flush_scheduled:
+            self._flush_scheduled = True
+            self.hass.async_create_background_task(
+                self.async_flush(), "mammotion capture flush"
+            )
+
+    @callback
+    def async_start(self) -> None:
+        """Start flushing on an interval."""
+        self._cancel_interval = async_track_time_interval(
+            self.hass, self._async_flush_interval, FLUSH_INTERVAL
+        )
+
+    async def async_stop(self) -> None:
+        """Detach from the transports and write what is left."""
+        self.detach()
+        if self._cancel_interval is not None:
+            self._cancel_interval()
+            self._cancel_interval = None
+        await self.async_flush()
+
+    async def _async_flush_interval(self, _now: Any) -> None:
+        await self.async_flush()
+
+    async def async_flush(self) -> None:
+        """Write pending frames in the executor, in order."""
+        async with self._write_lock:
+            self._flush_scheduled = False
+            if not self._pending:
+                return
+            chunk = bytes(self._pending)
+            self._pending.clear()
+            self.bytes_written += await self.hass.async_add_executor_job(
+                self._write, chunk
+            )
+
+    def _write(self, chunk: bytes) -> int:
+        """Append a chunk, writing the header first for a new file."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self._compressor is not None:
+            chunk = self._compressor.compress(chunk)
+        with self.path.open("ab") as file:
+            if file.tell() == 0:
+                flags = FLAG_ZSTD if self._compressor is not None else 0
+                file.write(HEADER.pack(MAGIC, FORMAT_VERSION, flags))
+            file.write(chunk)
+        return len(chunk)
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return capture counters for diagnostics."""
+        return {
+            "path": str(self.path),
+            "compressed": self.compress,
+            "records": self.records,
+            "bytes_written": self.bytes_written,
+            "bytes_pending": len(self._pending),
+        }
+
+
+def _read_exactly(stream: IO[bytes], size: int) -> bytes:
+    data = stream.read(size)
+    while data and len(data) < size:
+        if not (more := stream.read(size - len(data))):
+            break
+        data += more
+    return data
+
+
+def read_capture(path: Path) -> Iterator[CaptureRecord]:
+    """Yield the records of a capture file.
+
+    A record cut short at the end of the file, as left by an interrupted
+    write, ends the iteration quietly.
+    """
+    with path.open("rb") as file:
+        header = file.read(HEADER.size)
+        if len(header) < HEADER.size:
+            return
+        magic, version, flags = HEADER.unpack(header)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} capture")
+        stream: IO[bytes] = file
+        if flags & FLAG_ZSTD:
+            if zstandard is None:
+                raise RuntimeError("zstandard is required to read a compressed capture")
+            stream = zstandard.ZstdDecompressor().stream_reader(
+                file, read_across_frames=True
+            )
+        while len(head := _read_exactly(stream, RECORD.size)) == RECORD.size:
+            direction, timestamp, length = RECORD.unpack(head)
+            data = _read_exactly(stream, length)
+            if len(data) < length:
+                return
+            yield CaptureRecord(Direction(direction), timestamp, data)
+
+
+@dataclass(slots=True)
+class ReplayStats:
+    """Outcome of a replay."""
+
+    inbound: int = 0
+    outbound: int = 0
+    requested: list[str] = field(default_factory=list)
+    duration: float = 0.0
+
+
+async def _async_feed(device: MammotionBaseDevice, data: bytes) -> None:
+    """Handle a frame the way the transports handle a notification."""
+    device._update_raw_data(data)  # noqa: SLF001
+    message = LubaMsg().parse(data)
+    if betterproto.serialized_on_wire(message.net) and (
+        message.net.todev_ble_sync != 0 or has_field(message.net.toapp_wifi_iot_status)
+    ):
+        return
+    await device.state_manager.notification(message)
+
+
+async def async_replay(
+    device: MammotionBaseDevice,
+    records: Iterable[CaptureRecord],
+    realtime: bool = False,
+) -> ReplayStats:
+    """Feed captured inbound frames through ``device`` as if they just arrived.
+
+    The device's state manager and notification callback run as they would
+    live, so a coordinator bound to the device sees every update. Commands
+    the device queues in response are recorded in the stats instead of
+    being sent. With ``realtime`` frames keep their captured spacing,
+    otherwise they are fed as fast as the event loop allows.
+    """
+    stats = ReplayStats()
+
+    async def _queue_command(key: str, **kwargs: Any) -> None:
+        stats.requested.append(key)
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    first: float | None = None
+    device.queue_command = _queue_command
+    device.set_queue_callback(_queue_command)
+    try:
+        for record in records:
+            if first is None:
+                first = record.timestamp
+            if record.direction is Direction.OUTBOUND:
+                stats.outbound += 1
+                continue
+            if realtime:
+                delay = started + record.timestamp - first - loop.time()
+                await asyncio.sleep(max(delay, 0))
+            else:
+                await asyncio.sleep(0)
+            await _async_feed(device, record.data)
+            stats.inbound += 1
+    finally:
+        del device.queue_command
+        device.set_queue_callback(device.queue_command)
+    stats.duration = loop.time() - started
+    return stats
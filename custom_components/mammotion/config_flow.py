@@ -40,6 +40,12 @@ from .const import (
     LOGGER,
 )
 from .error_handling import MammotionErrorHandling
+from .filters import (
+    CONF_SENSOR_FILTER_SCALE,
+    DEFAULT_SENSOR_FILTER_SCALE,
+    MAX_SENSOR_FILTER_SCALE,
+)
+from .profiling import CONF_MONITOR_CALLBACKS
 
 
 class MammotionConfigFlow(ConfigFlow, domain=DOMAIN):
@@ -407,7 +413,22 @@ class MammotionConfigFlowHandler(OptionsFlowWithConfigEntry):
                         default=self.config_entry.options.get(
                             CONF_STAY_CONNECTED_BLUETOOTH, False
                         ),
-                    ): cv.boolean
+                    ): cv.boolean,
+                    vol.Optional(
+                        CONF_MONITOR_CALLBACKS,
+                        default=self.config_entry.options.get(
+                            CONF_MONITOR_CALLBACKS, False
+                        ),
+                    ): cv.boolean,
+                    vol.Optional(
+                        CONF_SENSOR_FILTER_SCALE,
+                        default=self.config_entry.options.get(
+                            CONF_SENSOR_FILTER_SCALE, DEFAULT_SENSOR_FILTER_SCALE
+                        ),
+                    ): vol.All(
+                        vol.Coerce(float),
+                        vol.Range(min=0, max=MAX_SENSOR_FILTER_SCALE),
+                    ),
                 }
             )
 
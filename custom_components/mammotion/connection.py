@@ -0,0 +1,455 @@
+"""Decide when the Bluetooth link to the mower is opened and closed."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import Counter, deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
+
+from bleak_retry_connector import BLEAK_RETRY_EXCEPTIONS
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+from pymammotion.mammotion.devices.mammotion import ConnectionPreference
+from pymammotion.utility.constant.device_constant import WorkMode
+
+from .const import CONF_STAY_CONNECTED_BLUETOOTH, LOGGER
+from .error_handling import MammotionErrorHandling
+
+if TYPE_CHECKING:
+    from pymammotion.mammotion.devices.mammotion_bluetooth import MammotionBaseBLEDevice
+
+    from .coordinator import MammotionDataUpdateCoordinator
+
+PRECONNECT_LEAD = timedelta(minutes=2)
+PRECONNECT_GRACE = timedelta(minutes=1)
+TICK_INTERVAL = timedelta(seconds=15)
+MIN_IDLE_TIMEOUT = 10.0
+MAX_IDLE_TIMEOUT = 300.0
+IDLE_MARGIN = 5.0
+IDLE_QUANTILE = 0.9
+BURST_GAP = 2.0
+GAP_HISTORY = 32
+HOURS_PER_WEEK = 7 * 24
+PATTERN_ALPHA = 0.3
+PATTERN_THRESHOLD = 0.5
+STORAGE_VERSION = 1
+
+# Commands the integration sends on its own; they need the link but say
+# nothing about when a person will use the mower next.
+BACKGROUND_COMMANDS = frozenset({"get_report_cfg", "read_plan", "request_iot_sys"})
+
+HOLD_JOB = "job"
+HOLD_PLAN = "plan"
+HOLD_SCHEDULE = "schedule"
+HOLD_PATTERN = "pattern"
+
+
+def idle_timeout(gaps: deque[float] | list[float]) -> float:
+    """Return how long to keep an idle link, given recent gaps between commands.
+
+    When most gaps are short enough to bridge, the link stays up long enough
+    to cover nine in ten of them; otherwise the next command is likely to be
+    far off and the link is dropped quickly.
+    """
+    short = sorted(gap for gap in gaps if gap <= MAX_IDLE_TIMEOUT)
+    if not short or len(short) * 2 < len(gaps):
+        return MIN_IDLE_TIMEOUT
+    quantile = short[min(len(short) - 1, int(len(short) * IDLE_QUANTILE))]
+    return min(MAX_IDLE_TIMEOUT, max(MIN_IDLE_TIMEOUT, quantile + IDLE_MARGIN))
+
+
+def ble_connected(ble: MammotionBaseBLEDevice | None) -> bool:
+    """Return whether a Bluetooth transport holds a connected client.
+
+    pymammotion does not expose its client, so this is the one place that
+    reads it.
+    """
+    client = ble._client if ble is not None else None  # noqa: SLF001
+    return client is not None and client.is_connected
+
+
+def _hour_of_week(when: datetime) -> int:
+    return when.weekday() * 24 + when.hour
+
+
+class UsagePattern:
+    """How likely each hour of the week is to see user commands.
+
+    Every hour of the week holds an exponentially weighted probability that
+    is updated once that hour has passed, so a habit is picked up after a
+    couple of weeks and forgotten again just as quickly.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty pattern."""
+        self.probabilities = [0.0] * HOURS_PER_WEEK
+        self._bucket: int | None = None
+        self._active = False
+
+    def record(self, when: datetime) -> None:
+        """Note a user command at ``when``."""
+        self.roll(when)
+        self._active = True
+
+    def roll(self, when: datetime) -> bool:
+        """Fold the previous hour in once ``when`` has left it; return if it did."""
+        bucket = _hour_of_week(when)
+        if bucket == self._bucket:
+            return False
+        previous, self._bucket = self._bucket, bucket
+        if previous is None:
+            return False
+        probability = self.probabilities[previous]
+        self.probabilities[previous] = probability + PATTERN_ALPHA * (
+            self._active - probability
+        )
+        self._active = False
+        return True
+
+    def likely(self, when: datetime) -> bool:
+        """Return whether user commands are expected in the hour of ``when``."""
+        return self.probabilities[_hour_of_week(when)] >= PATTERN_THRESHOLD
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the pattern for storage."""
+        return {"probabilities": [round(value, 4) for value in self.probabilities]}
+
+    def restore(self, stored: dict[str, Any] | None) -> None:
+        """Load a stored pattern."""
+        values = (stored or {}).get("probabilities") or []
+        if len(values) == HOURS_PER_WEEK:
+            self.probabilities = [float(value) for value in values]
+
+
+@dataclass(slots=True)
+class ConnectionStats:
+    """Counters for connects, disconnects and the commands that waited on them."""
+
+    preconnects: int = 0
+    preconnect_failures: int = 0
+    preconnect_ms: float = 0.0
+    last_preconnect_ms: float = 0.0
+    preconnect_hits: int = 0
+    cold_commands: int = 0
+    cold_ms: float = 0.0
+    warm_commands: int = 0
+    idle_disconnects: int = 0
+
+
+class MammotionConnectionManager:
+    """Open the Bluetooth link before it is needed and close it when it is not.
+
+    pymammotion drops the link ten seconds after the last command. When
+    Bluetooth is the preferred transport and the user has not asked to stay
+    connected, that timer is switched off and this manager decides instead:
+
+    * the link is opened ahead of plans on the mower, integration schedules
+      and hours in which the user usually sends commands;
+    * it is held open for as long as anything holds it, such as a running
+      job or manual control;
+    * otherwise it is closed after an idle timeout that adapts to how far
+      apart the user's commands tend to be.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator: MammotionDataUpdateCoordinator) -> None:
+        """Initialize the connection manager."""
+        self.hass = hass
+        self.coordinator = coordinator
+        self.active = False
+        self.stats = ConnectionStats()
+        self.pattern = UsagePattern()
+        self.error_handler = MammotionErrorHandling(hass)
+        self._gaps: deque[float] = deque(maxlen=GAP_HISTORY)
+        self._last_command: float | None = None
+        self._holds: Counter[str] = Counter()
+        self._timed_holds: dict[tuple[str, datetime], CALLBACK_TYPE] = {}
+        self._release_job: CALLBACK_TYPE | None = None
+        self._preconnected = False
+        self._ble: MammotionBaseBLEDevice | None = None
+        self._connecting: asyncio.Task[None] | None = None
+        self._cancel_idle: CALLBACK_TYPE | None = None
+        self._unsubs: list[CALLBACK_TYPE] = []
+        self._store: Store[dict[str, Any]] | None = None
+
+    @property
+    def idle_timeout(self) -> float:
+        """Return the current idle timeout in seconds."""
+        return idle_timeout(self._gaps)
+
+    @property
+    def connected(self) -> bool:
+        """Return whether the Bluetooth link is up."""
+        return ble_connected(self._ble)
+
+    def _transport(self) -> MammotionBaseBLEDevice | None:
+        """Return the mower's Bluetooth transport, taking over its disconnects."""
+        coordinator = self.coordinator
+        device = coordinator.manager.get_device_by_name(coordinator.device_name)
+        ble = device.ble() if device else None
+        if ble is not None and ble is not self._ble:
+            ble.set_disconnect_strategy(False)
+            self._ble = ble
+        return ble
+
+    async def async_start(self) -> None:
+        """Take over the link if Bluetooth is used on demand."""
+        coordinator = self.coordinator
+        device = coordinator.manager.get_device_by_name(coordinator.device_name)
+        if (
+            self.active
+            or device is None
+            or device.ble() is None
+            or device.preference is not ConnectionPreference.BLUETOOTH
+            or coordinator.config_entry.options.get(CONF_STAY_CONNECTED_BLUETOOTH, False)
+        ):
+            return
+        try:
+            self._store = Store(
+                self.hass, STORAGE_VERSION, f"{coordinator.device_name}_connection"
+            )
+            self.pattern.restore(await self._store.async_load())
+            self.active = True
+            self._transport()
+            self._unsubs = [
+                async_track_time_interval(self.hass, self._async_tick, TICK_INTERVAL),
+                coordinator.async_add_listener(self._handle_coordinator_update),
+            ]
+            self._handle_coordinator_update()
+            self._schedule_idle()
+        except Exception as error:
+            self.error_handler.handle_error(error, "async_start")
+
+    @callback
+    def async_stop(self) -> None:
+        """Hand disconnects back to pymammotion."""
+        if not self.active:
+            return
+        self.active = False
+        for unsub in (*self._unsubs, *self._timed_holds.values()):
+            unsub()
+        self._unsubs = []
+        self._timed_holds.clear()
+        self._cancel_idle_timer()
+        if self._connecting is not None:
+            self._connecting.cancel()
+            self._connecting = None
+        self._release_job = None
+        self._holds.clear()
+        if self._ble is not None:
+            self._ble.set_disconnect_strategy(True)
+            self._ble = None
+        if self._store is not None:
+            self._store.async_delay_save(self.pattern.as_dict)
+
+    @asynccontextmanager
+    async def track(self, command: str) -> AsyncIterator[None]:
+        """Account for a command and restart the idle timeout once it is sent."""
+        if not self.active:
+            yield
+            return
+        user = command not in BACKGROUND_COMMANDS
+        if user:
+            self._note_user_command()
+        self._cancel_idle_timer()
+        self._transport()
+        cold = not self.connected
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if cold:
+                self.coordinator.proxies.record_connect(
+                    self.connected, (time.perf_counter() - start) * 1000
+                )
+            if user:
+                if cold:
+                    self.stats.cold_commands += 1
+                    self.stats.cold_ms += (time.perf_counter() - start) * 1000
+                else:
+                    self.stats.warm_commands += 1
+                    if self._preconnected:
+                        self.stats.preconnect_hits += 1
+                self._preconnected = False
+            self._schedule_idle()
+
+    def _note_user_command(self) -> None:
+        """Record the gap since the previous user command and the hour it fell in."""
+        now = time.monotonic()
+        if self._last_command is not None and (gap := now - self._last_command) >= BURST_GAP:
+            self._gaps.append(gap)
+        self._last_command = now
+        self.pattern.record(dt_util.now())
+
+    @callback
+    def async_hold(self, reason: str) -> CALLBACK_TYPE:
+        """Keep the link open until the returned callback is called."""
+        self._holds[reason] += 1
+        self._cancel_idle_timer()
+        self._async_preconnect()
+        released = False
+
+        @callback
+        def _release() -> None:
+            nonlocal released
+            if released:
+                return
+            released = True
+            self._holds[reason] -= 1
+            if self._holds[reason] <= 0:
+                del self._holds[reason]
+            if not self._holds:
+                self._schedule_idle()
+
+        return _release
+
+    @callback
+    def _hold_until(self, reason: str, when: datetime) -> None:
+        """Hold the link until a grace period after ``when``."""
+        key = (reason, when)
+        if key in self._timed_holds:
+            return
+        release = self.async_hold(reason)
+
+        @callback
+        def _expire(_now: datetime) -> None:
+            self._timed_holds.pop(key, None)
+            release()
+
+        delay = (when + PRECONNECT_GRACE - dt_util.utcnow()).total_seconds()
+        self._timed_holds[key] = async_call_later(self.hass, max(delay, 0), _expire)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Hold the link while the mower is working or heading home."""
+        snapshot = self.coordinator.snapshot
+        working = snapshot.reported and snapshot.reported_sys_status in (
+            WorkMode.MODE_WORKING,
+            WorkMode.MODE_RETURNING,
+        )
+        if working and self._release_job is None:
+            self._release_job = self.async_hold(HOLD_JOB)
+        elif not working and self._release_job is not None:
+            self._release_job()
+            self._release_job = None
+
+    @callback
+    def _async_tick(self, now: datetime) -> None:
+        """Look ahead for work and learn from the hour that just ended."""
+        if self.pattern.roll(dt_util.as_local(now)) and self._store is not None:
+            self._store.async_delay_save(self.pattern.as_dict)
+        until = now + PRECONNECT_LEAD
+        for start, _end, _plan in self.coordinator.plans.events(now, until):
+            if start >= now:
+                self._hold_until(HOLD_PLAN, start)
+        if (scheduler := self.coordinator.scheduler) is not None:
+            for start, _end, _schedule in scheduler.schedules_between(now, until):
+                if start >= now:
+                    self._hold_until(HOLD_SCHEDULE, start)
+        upcoming = dt_util.as_local(until)
+        if self.pattern.likely(upcoming) and _hour_of_week(upcoming) != _hour_of_week(
+            dt_util.as_local(now)
+        ):
+            self._hold_until(HOLD_PATTERN, upcoming.replace(minute=0, second=0, microsecond=0))
+
+    @callback
+    def _async_preconnect(self) -> None:
+        """Open the link in the background unless it is up or opening."""
+        if (
+            not self.active
+            or self.connected
+            or self._connecting is not None
+            or not self.coordinator.ble_reachable
+        ):
+            return
+        self._connecting = self.hass.async_create_background_task(
+            self._async_connect(), "mammotion preconnect"
+        )
+
+    async def _async_connect(self) -> None:
+        try:
+            if (ble := self._transport()) is None:
+                return
+            start = time.perf_counter()
+            await ble._ensure_connected()  # noqa: SLF001
+            elapsed = (time.perf_counter() - start) * 1000
+            self.stats.preconnects += 1
+            self.stats.preconnect_ms += elapsed
+            self.stats.last_preconnect_ms = elapsed
+            self._preconnected = True
+            self.coordinator.proxies.record_connect(True, elapsed)
+            LOGGER.debug("Preconnected to %s in %.0f ms", self.coordinator.device_name, elapsed)
+        except (*BLEAK_RETRY_EXCEPTIONS, TimeoutError) as error:
+            self.stats.preconnect_failures += 1
+            self.coordinator.proxies.record_connect(False, 0)
+            LOGGER.debug("Preconnecting to %s failed: %s", self.coordinator.device_name, error)
+        except Exception as error:
+            self.stats.preconnect_failures += 1
+            self.error_handler.handle_error(error, "_async_connect")
+        finally:
+            self._connecting = None
+            if not self._holds:
+                self._schedule_idle()
+
+    def _cancel_idle_timer(self) -> None:
+        if self._cancel_idle is not None:
+            self._cancel_idle()
+            self._cancel_idle = None
+
+    def _schedule_idle(self) -> None:
+        """Restart the idle timeout unless something holds the link."""
+        self._cancel_idle_timer()
+        if self.active and not self._holds:
+            self._cancel_idle = async_call_later(
+                self.hass, self.idle_timeout, self._async_idle_disconnect
+            )
+
+    async def _async_idle_disconnect(self, _now: datetime) -> None:
+        self._cancel_idle = None
+        try:
+            ble = self._ble
+            if self._holds or ble is None or not self.connected:
+                return
+            if ble._operation_lock.locked():  # noqa: SLF001
+                self._schedule_idle()
+                return
+            self.stats.idle_disconnects += 1
+            self._preconnected = False
+            await ble._execute_forced_disconnect()  # noqa: SLF001
+        except Exception as error:
+            self.error_handler.handle_error(error, "_async_idle_disconnect")
+
+    @property
+    def diagnostics(self) -> dict[str, Any]:
+        """Return the connection state and counters for diagnostics."""
+        stats = self.stats
+        return {
+            "active": self.active,
+            "connected": self.connected,
+            "holds": dict(self._holds),
+            "idle_timeout": self.idle_timeout,
+            "command_gaps": len(self._gaps),
+            "preconnects": stats.preconnects,
+            "preconnect_failures": stats.preconnect_failures,
+            "preconnect_ms_avg": round(stats.preconnect_ms / stats.preconnects, 1)
+            if stats.preconnects
+            else None,
+            "preconnect_ms_last": round(stats.last_preconnect_ms, 1),
+            "preconnect_hits": stats.preconnect_hits,
+            "cold_commands": stats.cold_commands,
+            "cold_ms_avg": round(stats.cold_ms / stats.cold_commands, 1)
+            if stats.cold_commands
+            else None,
+            "warm_commands": stats.warm_commands,
+            "idle_disconnects": stats.idle_disconnects,
+            "likely_hours": [
+                hour for hour, value in enumerate(self.pattern.probabilities)
+                if value >= PATTERN_THRESHOLD
+            ],
+        }
@@ -0,0 +1,152 @@
+"""Local frame to WGS84 conversion for the Mammotion integration."""
+
+from __future__ import annotations
+
+import math
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+from pymammotion.data.model.device import MowingDevice
+from pymammotion.data.model.location import Location
+
+WGS84_A = 6378137.0
+WGS84_F = 1 / 298.257223563
+WGS84_B = WGS84_A * (1 - WGS84_F)
+WGS84_E2 = WGS84_F * (2 - WGS84_F)
+WGS84_EP2 = WGS84_E2 / (1 - WGS84_E2)
+
+type Pose = tuple[float, float, float]
+
+
+def dock_pose(location: Location) -> Pose | None:
+    """Return the dock position and rotation in the local frame."""
+    dock = location.dock
+    if dock.latitude == 0 and dock.longitude == 0:
+        return None
+    return dock.longitude, dock.latitude, math.radians(dock.rotation)
+
+
+def mower_pose(mower: MowingDevice) -> Pose | None:
+    """Return the mower position and heading in the local frame.
+
+    ``x`` points east and ``y`` points north, both in metres from the RTK
+    base station. The heading is in radians.
+    """
+    if mower.report_data.locations:
+        location = mower.report_data.locations[0]
+        if location.real_pos_x == 0 and location.real_pos_y == 0:
+            return None
+        return (
+            location.real_pos_x / 10000,
+            location.real_pos_y / 10000,
+            location.real_toward / 10000,
+        )
+    # The rapid state is already scaled by pymammotion.
+    state = mower.mowing_state
+    if state.pos_x == 0 and state.pos_y == 0:
+        return None
+    return state.pos_x, state.pos_y, state.toward
+
+
+class MammotionCoordinateService:
+    """Convert batches of local ENU points to and from WGS84.
+
+    The origin is the RTK base station reported in response to
+    ``async_rtk_dock_location``. The ECEF origin and rotation matrix are
+    computed once per origin change and reused for every conversion.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the coordinate service."""
+        self._origin: tuple[float, float] | None = None
+        self._ecef_origin: NDArray[np.float64] = np.zeros(3)
+        self._rotation: NDArray[np.float64] = np.eye(3)
+        self.dock: Pose | None = None
+
+    @property
+    def has_origin(self) -> bool:
+        """Return True once an RTK origin is known."""
+        return self._origin is not None
+
+    @property
+    def origin(self) -> tuple[float, float] | None:
+        """Return the origin as (latitude, longitude) in degrees."""
+        if self._origin is None:
+            return None
+        return math.degrees(self._origin[0]), math.degrees(self._origin[1])
+
+    def set_origin(self, latitude_rad: float, longitude_rad: float) -> bool:
+        """Set the RTK origin in radians, returning True if it changed."""
+        if self._origin == (latitude_rad, longitude_rad):
+            return False
+
+        sin_lat, cos_lat = math.sin(latitude_rad), math.cos(latitude_rad)
+        sin_lon, cos_lon = math.sin(longitude_rad), math.cos(longitude_rad)
+        radius = WGS84_A / math.sqrt(1.0 - WGS84_E2 * sin_lat**2)
+
+        self._ecef_origin = np.array(
+            [
+                radius * cos_lat * cos_lon,
+                radius * cos_lat * sin_lon,
+                radius * (1 - WGS84_E2) * sin_lat,
+            ]
+        )
+        # Rows are the east, north and up unit vectors in ECEF.
+        self._rotation = np.array(
+            [
+                [-sin_lon, cos_lon, 0.0],
+                [-sin_lat * cos_lon, -sin_lat * sin_lon, cos_lat],
+                [cos_lat * cos_lon, cos_lat * sin_lon, sin_lat],
+            ]
+        )
+        self._origin = (latitude_rad, longitude_rad)
+        return True
+
+    def update_from_location(self, location: Location) -> bool:
+        """Refresh the cached origin and dock from the mower location."""
+        self.dock = dock_pose(location)
+        if location.RTK.latitude == 0 and location.RTK.longitude == 0:
+            return False
+        return self.set_origin(location.RTK.latitude, location.RTK.longitude)
+
+    def local_to_geodetic(self, points: ArrayLike) -> NDArray[np.float64]:
+        """Convert (N, 2) local east/north metres to (N, 2) latitude/longitude."""
+        if self._origin is None:
+            raise ValueError("RTK origin is not known yet")
+        enu = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        ecef = self._ecef_origin + enu @ self._rotation[:2]
+        x, y, z = ecef[:, 0], ecef[:, 1], ecef[:, 2]
+
+        # Bowring's closed form, accurate to well below a millimetre here.
+        hypot = np.hypot(x, y)
+        theta = np.arctan2(z * WGS84_A, hypot * WGS84_B)
+        latitude = np.arctan2(
+            z + WGS84_EP2 * WGS84_B * np.sin(theta) ** 3,
+            hypot - WGS84_E2 * WGS84_A * np.cos(theta) ** 3,
+        )
+        longitude = np.arctan2(y, x)
+        return np.degrees(np.column_stack((latitude, longitude)))
+
+    def geodetic_to_local(self, points: ArrayLike) -> NDArray[np.float64]:
+        """Convert (N, 2) latitude/longitude to (N, 2) local east/north metres."""
+        if self._origin is None:
+            raise ValueError("RTK origin is not known yet")
+        lla = np.radians(np.asarray(points, dtype=np.float64).reshape(-1, 2))
+        sin_lat, cos_lat = np.sin(lla[:, 0]), np.cos(lla[:, 0])
+        sin_lon, cos_lon = np.sin(lla[:, 1]), np.cos(lla[:, 1])
+        radius = WGS84_A / np.sqrt(1.0 - WGS84_E2 * sin_lat**2)
+        ecef = np.column_stack(
+            (
+                radius * cos_lat * cos_lon,
+                radius * cos_lat * sin_lon,
+                radius * (1 - WGS84_E2) * sin_lat,
+            )
+        )
+        return (ecef - self._ecef_origin) @ self._rotation[:2].T
+
+    def pose_to_geodetic(self, pose: Pose | None) -> tuple[float, float] | None:
+        """Convert a single local pose to (latitude, longitude)."""
+        if pose is None or self._origin is None:
+            return None
+        latitude, longitude = self.local_to_geodetic((pose[0], pose[1]))[0]
+        return float(latitude), float(longitude)
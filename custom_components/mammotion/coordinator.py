@@ -2,19 +2,23 @@
 
 from __future__ import annotations
 
+import logging
 from dataclasses import asdict
-from datetime import timedelta
+from datetime import datetime, timedelta
+from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
 import betterproto
 from aiohttp import ClientConnectorError
 from homeassistant.components import bluetooth
 from homeassistant.const import CONF_ADDRESS, CONF_PASSWORD
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryNotReady, HomeAssistantError
 from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 from pymammotion.aliyun.cloud_gateway import DeviceOfflineException, SetupException
 from pymammotion.data.model import GenerateRouteInformation, HashList
 from pymammotion.data.model.account import Credentials
@@ -28,6 +32,8 @@ from pymammotion.proto import has_field
 from pymammotion.proto.luba_msg import LubaMsg
 from pymammotion.proto.mctrl_sys import RptAct, RptInfoType
 
+from .capture import CAPTURE_SUFFIX, MammotionCapture, compression_available
+from .connection import MammotionConnectionManager, ble_connected
 from .const import (
     COMMAND_EXCEPTIONS,
     CONF_ACCOUNTNAME,
@@ -37,12 +43,29 @@ from .const import (
     DOMAIN,
     LOGGER,
 )
+from .coordinates import MammotionCoordinateService
 from .error_handling import MammotionErrorHandling
+from .filters import StateFilterTracker
+from .manual_drive import MammotionManualDrive
+from .map_renderer import MammotionMapRenderer
+from .plans import MammotionPlanCache, raw_plan
+from .prediction import MammotionJobPredictions
+from .profiling import MammotionCallbackMonitor
+from .proxies import MammotionProxySelector
+from .route_preview import MammotionRoutePlanner
+from .serialization import MammotionSerializer
+from .snapshot import MowerSnapshot
+from .statistics import MammotionWorkStatistics
+from .telemetry import MammotionTelemetryHub
 
 if TYPE_CHECKING:
+    from bleak.backends.device import BLEDevice
+
     from . import MammotionConfigEntry
+    from .scheduler import MammotionScheduler
 
 UPDATE_INTERVAL = timedelta(minutes=1)
+PLAN_SAVE_DELAY = 10
 
 
 class MammotionDataUpdateCoordinator(DataUpdateCoordinator[MowingDevice]):
@@ -51,6 +74,7 @@ class MammotionDataUpdateCoordinator(DataUpdateCoordinator[MowingDevice]):
     address: str | None = None
     config_entry: MammotionConfigEntry
     manager: Mammotion = None
+    scheduler: MammotionScheduler | None = None
     _operation_settings: OperationSettings
 
     def __init__(self, hass: HomeAssistant, config_entry: MammotionConfigEntry) -> None:
@@ -66,6 +90,25 @@ class MammotionDataUpdateCoordinator(DataUpdateCoordinator[MowingDevice]):
         self._operation_settings = OperationSettings()
         self.update_failures = 0
         self.error_handler = MammotionErrorHandling(hass)
+        self.map_renderer = MammotionMapRenderer()
+        self.route_planner = MammotionRoutePlanner(hass, self)
+        self.coordinates = MammotionCoordinateService()
+        self.plans = MammotionPlanCache()
+        self._plan_store: Store | None = None
+        self._saved_plan_version = 0
+        self.capture: MammotionCapture | None = None
+        self._cancel_capture_timer: CALLBACK_TYPE | None = None
+        self.callback_monitor: MammotionCallbackMonitor | None = None
+        self._snapshot: MowerSnapshot | None = None
+        self.snapshot_changes: frozenset[str] = frozenset()
+        self.serializer = MammotionSerializer(hass)
+        self.connection = MammotionConnectionManager(hass, self)
+        self.proxies = MammotionProxySelector(hass)
+        self.manual_drive = MammotionManualDrive(hass, self)
+        self.telemetry = MammotionTelemetryHub(hass)
+        self.statistics = MammotionWorkStatistics(hass, self)
+        self.predictions = MammotionJobPredictions(hass, self)
+        self.sensor_filters: dict[str, StateFilterTracker] = {}
 
     async def async_setup(self) -> None:
         """Set coordinator up."""
@@ -108,7 +151,10 @@ class MammotionDataUpdateCoordinator(DataUpdateCoordinator[MowingDevice]):
                     preference = ConnectionPreference.WIFI
 
             if address:
-                ble_device = bluetooth.async_ble_device_from_address(self.hass, address)
+                self.proxies.async_start(address, self._async_ble_device_changed)
+                ble_device = self.proxies.device() or bluetooth.async_ble_device_from_address(
+                    self.hass, address
+                )
                 if not ble_device and credentials is None:
                     self.error_handler.handle_error(
                         Exception(f"Could not find Mammotion lawn mower with address {address}"),
@@ -173,6 +219,25 @@ class MammotionDataUpdateCoordinator(DataUpdateCoordinator[MowingDevice]):
 
         await self.async_restore_data()
 
+    @callback
+    def _async_ble_device_changed(self, ble_device: BLEDevice) -> None:
+        """Hand a new ``BLEDevice`` for the mower to the Bluetooth client."""
+        device = self.manager.get_device_by_name(self.device_name) if self.manager else None
+        if device is None or ble_device.name != device.name:
+            return
+        if device.ble() is not None:
+            device.ble().update_device(ble_device)
+        else:
+            device.add_ble(ble_device)
+
+    @property
+    def ble_reachable(self) -> bool:
+        """Return whether the mower is advertising or connected over Bluetooth."""
+        if self.proxies.reachable:
+            return True
+        device = self.manager.get_device_by_name(self.device_name) if self.manager else None
+        return device is not None and ble_connected(device.ble())
+
     async def async_restore_data(self) -> None:
         """Restore saved data."""
         store = Store(self.hass, version=1, key=self.device_name)
@@ -184,21 +249,106 @@ class MammotionDataUpdateCoordinator(DataUpdateCoordinator[MowingDevice]):
                 else:
                     device_dict = LubaMsg().to_dict(casing=betterproto.Casing.SNAKE)
 
-                self.data = MowingDevice().from_dict(restored_data)
+                self.data = await self.serializer.async_run(
+                    restored_data, MowingDevice().from_dict, "restore", copy=False
+                )
                 self.data.update_raw(device_dict)
+                self.coordinates.update_from_location(self.data.location)
                 self.manager.get_device_by_name(self.device_name).mower_state = self.data
+                self._update_snapshot(self.data)
+
+            self._plan_store = Store(self.hass, version=1, key=f"{self.device_name}_plans")
+            self.plans.restore(await self._plan_store.async_load())
+            self._saved_plan_version = self.plans.version
         except Exception as error:
             self.error_handler.handle_error(error, "async_restore_data")
 
+    @property
+    def snapshot(self) -> MowerSnapshot:
+        """Return the entity-facing view of the current data."""
+        if self._snapshot is None:
+            self._update_snapshot(self.data)
+        return self._snapshot
+
+    def _update_snapshot(self, data: MowingDevice) -> None:
+        """Build the snapshot for new data and note which fields changed."""
+        previous = self._snapshot
+        self._snapshot = MowerSnapshot.from_mower(
+            data, previous.version + 1 if previous else 1, self.coordinates
+        )
+        self.snapshot_changes = self._snapshot.changed(previous)
+
+    @callback
+    def async_set_updated_data(self, data: MowingDevice) -> None:
+        """Publish a new snapshot along with pushed data."""
+        self._update_snapshot(data)
+        super().async_set_updated_data(data)
+
     async def async_save_data(self, data: MowingDevice) -> None:
         """Get map data from the device."""
         store = Store(self.hass, version=1, key=self.device_name)
         try:
-            stored_data = asdict(data)
+            stored_data = await self.serializer.async_as_dict(data, "save")
             await store.async_save(stored_data)
         except Exception as error:
             self.error_handler.handle_error(error, "async_save_data")
 
+    async def async_start_capture(
+        self, compress: bool = False, duration: timedelta | None = None
+    ) -> Path | None:
+        """Start capturing raw device traffic to the config directory."""
+        try:
+            if self.capture is not None:
+                return self.capture.path
+            if compress and not compression_available():
+                LOGGER.warning("zstandard is not installed, capturing uncompressed")
+            device = self.manager.get_device_by_name(self.device_name)
+            name = f"{self.device_name}_{dt_util.utcnow():%Y%m%d%H%M%S}{CAPTURE_SUFFIX}"
+            self.capture = MammotionCapture(
+                self.hass, Path(self.hass.config.path(DOMAIN, "captures", name)), compress
+            )
+            for transport in (device.ble(), device.cloud()):
+                if transport is not None:
+                    self.capture.attach(transport)
+            self.capture.async_start()
+            if duration:
+                self._cancel_capture_timer = async_call_later(
+                    self.hass, duration, self._async_capture_timeout
+                )
+            LOGGER.info("Capturing %s traffic to %s", self.device_name, self.capture.path)
+            return self.capture.path
+        except Exception as error:
+            self.error_handler.handle_error(error, "async_start_capture")
+            return None
+
+    async def async_stop_capture(self) -> None:
+        """Stop capturing and write out the remaining frames."""
+        try:
+            if self._cancel_capture_timer is not None:
+                self._cancel_capture_timer()
+                self._cancel_capture_timer = None
+            if (capture := self.capture) is None:
+                return
+            self.capture = None
+            await capture.async_stop()
+            LOGGER.info("Captured %s frames to %s", capture.records, capture.path)
+        except Exception as error:
+            self.error_handler.handle_error(error, "async_stop_capture")
+
+    async def _async_capture_timeout(self, _now: datetime) -> None:
+        self._cancel_capture_timer = None
+        await self.async_stop_capture()
+
+    @callback
+    def async_monitor_callbacks(self, enabled: bool) -> None:
+        """Start or stop timing listener and notification callbacks."""
+        if enabled and self.callback_monitor is None:
+            self.callback_monitor = MammotionCallbackMonitor()
+            self.callback_monitor.attach(self)
+        elif not enabled and self.callback_monitor is not None:
+            self.callback_monitor.detach()
+            self.callback_monitor = None
+
     async def async_sync_maps(self) -> None:
         """Get map data from the device."""
         try:
@@ -206,6 +356,14 @@ class MammotionDataUpdateCoordinator(DataUpdateCoordinator[MowingDevice]):
         except Exception as error:
             self.error_handler.handle_error(error, "async_sync_maps")
 
+    async def async_sync_plans(self) -> None:
+        """Read the job plans from the device, starting at the first one."""
+        try:
+            self.plans.begin_sync(dt_util.utcnow())
+            await self.async_send_command("read_plan", sub_cmd=2, plan_index=0)
+        except Exception as error:
+            self.error_handler.handle_error(error, "async_sync_plans")
+
     async def async_start_stop_blades(self, start_stop: bool) -> None:
         try:
             if start_stop:
@@ -256,6 +414,28 @@ class MammotionDataUpdateCoordinator(DataUpdateCoordinator[MowingDevice]):
         except Exception as error:
             self.error_handler.handle_error(error, "async_cancel_task")
 
+    async def async_start_mowing(self, **kwargs: Any) -> None:
+        """Plan a route and start a mowing job."""
+        try:
+            operation_settings = (
+                OperationSettings.from_dict(kwargs)
+                if kwargs
+                else self.operation_settings
+            )
+            await self.async_plan_route(operation_settings)
+            await self.async_send_command("start_job")
+            await self.async_request_iot_sync()
+        except Exception as error:
+            self.error_handler.handle_error(error, "async_start_mowing")
+
+    async def async_dock(self) -> None:
+        """Return the mower to its dock."""
+        try:
+            await self.async_send_command("return_to_dock")
+            await self.async_request_iot_sync()
+        except Exception as error:
+            self.error_handler.handle_error(error, "async_dock")
+
     async def async_move_forward(self, speed: float) -> None:
         """Move forward."""
         try:
@@ -312,6 +492,10 @@ class MammotionDataUpdateCoordinator(DataUpdateCoordinator[MowingDevice]):
 
     async def async_send_command(self, command: str, **kwargs: Any) -> None:
         """Send command."""
+        async with self.connection.track(command):
+            await self._async_send_command(command, **kwargs)
+
+    async def _async_send_command(self, command: str, **kwargs: Any) -> None:
         try:
             await self.manager.send_command_with_args(
                 self.device_name, command, **kwargs
@@ -321,7 +505,10 @@ class MammotionDataUpdateCoordinator(DataUpdateCoordinator[MowingDevice]):
         except DeviceOfflineException:
             """Device is offline try bluetooth if we have it."""
             try:
-                if self.manager.get_device_by_name(self.device_name).ble():
+                if (
+                    self.manager.get_device_by_name(self.device_name).ble()
+                    and self.ble_reachable
+                ):
                     await (
                         self.manager.get_device_by_name(self.device_name)
                         .ble()
@@ -354,6 +541,14 @@ class MammotionDataUpdateCoordinator(DataUpdateCoordinator[MowingDevice]):
             obstacle_laps=operation_settings.obstacle_laps,
         )
 
+        # The preview is advisory; it must never keep the route from being sent.
+        try:
+            estimate = await self.route_planner.async_estimate(operation_settings)
+            if estimate is not None:
+                LOGGER.debug("Route preview for %s: %s", self.device_name, estimate.as_dict())
+        except Exception as error:  # noqa: BLE001
+            LOGGER.debug("Route preview for %s failed: %s", self.device_name, error)
+
         try:
             await self.async_send_command(
                 "generate_route_information", generate_route_information=route_information
@@ -372,10 +567,24 @@ class MammotionDataUpdateCoordinator(DataUpdateCoordinator[MowingDevice]):
         """Update data from incoming messages."""
         try:
             mower = self.manager.mower(self.device_name)
+            self.coordinates.update_from_location(mower.location)
+            self._async_handle_plan(mower)
             self.async_set_updated_data(mower)
+            self.telemetry.async_publish(self._snapshot)
         except Exception as error:
             self.error_handler.handle_error(error, "_async_update_notification")
 
+    def _async_handle_plan(self, mower: MowingDevice) -> None:
+        """Continue a plan sync and persist the cache when a plan changed."""
+        next_index = self.plans.handle(raw_plan(mower))
+        if next_index is not None:
+            self.hass.async_create_task(
+                self.async_send_command("read_plan", sub_cmd=2, plan_index=next_index)
+            )
+        if self.plans.version != self._saved_plan_version and self._plan_store:
+            self._saved_plan_version = self.plans.version
+            self._plan_store.async_delay_save(self.plans.as_dict, PLAN_SAVE_DELAY)
+
     async def check_firmware_version(self) -> None:
         """Check if firmware version is udpated."""
         try:
@@ -422,23 +631,12 @@ class MammotionDataUpdateCoordinator(DataUpdateCoordinator[MowingDevice]):
         device = self.manager.get_device_by_name(self.device_name)
         await self.check_firmware_version()
 
-        if self.address:
-            ble_device = bluetooth.async_ble_device_from_address(
-                self.hass, self.address
+        if self.address and not self.ble_reachable and device.cloud() is None:
+            self.update_failures += 1
+            self.error_handler.handle_error(
+                Exception("Could not find device"), "_async_update_data"
             )
-
-            if not ble_device and device.cloud() is None:
-                self.update_failures += 1
-                self.error_handler.handle_error(
-                    Exception("Could not find device"), "_async_update_data"
-                )
-                raise UpdateFailed("Could not find device")
-
-            if ble_device and ble_device.name == device.name:
-                if device.ble() is not None:
-                    device.ble().update_device(ble_device)
-                else:
-                    device.add_ble(ble_device)
+            raise UpdateFailed("Could not find device")
 
         try:
             if (
@@ -449,6 +647,9 @@ class MammotionDataUpdateCoordinator(DataUpdateCoordinator[MowingDevice]):
 
             await self.async_send_command("get_report_cfg")
 
+            if self.plans.sync_due(dt_util.utcnow()):
+                await self.async_sync_plans()
+
         except COMMAND_EXCEPTIONS as exc:
             self.update_failures += 1
             self.error_handler.handle_error(exc, "_async_update_data")
@@ -457,7 +658,7 @@ class MammotionDataUpdateCoordinator(DataUpdateCoordinator[MowingDevice]):
             await self.async_login()
         except DeviceOfflineException:
             """Device is offline try bluetooth if we have it."""
-            if device.ble():
+            if device.ble() and self.ble_reachable:
                 await device.ble().command("get_report_cfg")
             # TODO set a sensor to offline
         except Exception as error:
@@ -466,15 +667,15 @@ class MammotionDataUpdateCoordinator(DataUpdateCoordinator[MowingDevice]):
             raise UpdateFailed(f"Updating Mammotion device failed: {error}") from error
 
         LOGGER.debug("Updated Mammotion device %s", self.device_name)
-        LOGGER.debug("================= Debug Log =================")
-        LOGGER.debug(
-            "Mammotion device data: %s",
-            asdict(self.manager.get_device_by_name(self.device_name).mower_state),
-        )
-        LOGGER.debug("==================================")
-
         self.update_failures = 0
         data = self.manager.get_device_by_name(self.device_name).mower_state
+        if LOGGER.isEnabledFor(logging.DEBUG):
+            self.hass.async_create_background_task(
+                self.serializer.async_run(data, _log_device_data, "debug"),
+                "mammotion debug dump",
+            )
+        self.coordinates.update_from_location(data.location)
+        self._update_snapshot(data)
         await self.async_save_data(data)
         return data
 
@@ -489,3 +690,10 @@ class MammotionDataUpdateCoordinator(DataUpdateCoordinator[MowingDevice]):
     #         await self.async_setup()
     #     except COMMAND_EXCEPTIONS as exc:
     #         raise UpdateFailed(f"Setting up Mammotion device failed: {exc}") from exc
+
+
+def _log_device_data(data: MowingDevice) -> None:
+    """Log the full device state; runs in the executor."""
+    LOGGER.debug("================= Debug Log =================")
+    LOGGER.debug("Mammotion device data: %s", asdict(data))
+    LOGGER.debug("==================================")
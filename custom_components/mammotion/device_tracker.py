@@ -49,11 +49,7 @@ class MammotionTracker(MammotionBaseEntity, TrackerEntity, RestoreEntity):
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return entity specific state attributes."""
         try:
-            return {
-                ATTR_DIRECTION: self.coordinator.manager.mower(
-                    self.coordinator.device_name
-                ).location.orientation
-            }
+            return {ATTR_DIRECTION: self.snapshot.orientation}
         except Exception as error:
             self.error_handler.handle_error(error, "extra_state_attributes")
             return {}
@@ -62,9 +58,10 @@ class MammotionTracker(MammotionBaseEntity, TrackerEntity, RestoreEntity):
     def latitude(self) -> float | None:
         """Return latitude value of the device."""
         try:
-            return self.coordinator.manager.mower(
-                self.coordinator.device_name
-            ).location.device.latitude
+            snapshot = self.snapshot
+            if snapshot.position is not None:
+                return snapshot.position[0]
+            return snapshot.device_latitude
         except Exception as error:
             self.error_handler.handle_error(error, "latitude")
             return None
@@ -73,9 +70,10 @@ class MammotionTracker(MammotionBaseEntity, TrackerEntity, RestoreEntity):
     def longitude(self) -> float | None:
         """Return longitude value of the device."""
         try:
-            return self.coordinator.manager.mower(
-                self.coordinator.device_name
-            ).location.device.longitude
+            snapshot = self.snapshot
+            if snapshot.position is not None:
+                return snapshot.position[1]
+            return snapshot.device_longitude
         except Exception as error:
             self.error_handler.handle_error(error, "longitude")
             return None
@@ -84,7 +82,7 @@ class MammotionTracker(MammotionBaseEntity, TrackerEntity, RestoreEntity):
     def battery_level(self) -> int | None:
         """Return the battery level of the device."""
         try:
-            return self.coordinator.data.report_data.dev.battery_val
+            return self.snapshot.battery_val
         except Exception as error:
             self.error_handler.handle_error(error, "battery_level")
             return None
@@ -2,16 +2,204 @@
 
 from __future__ import annotations
 
-from dataclasses import asdict
+import time
+from collections.abc import Callable, Mapping
+from dataclasses import fields, is_dataclass
+from datetime import date, datetime
+from enum import Enum
 from typing import Any
 
-from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.const import CONF_PASSWORD
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.json import json_bytes
 
 from . import MammotionConfigEntry
+from .const import (
+    CONF_ACCOUNTNAME,
+    CONF_AEP_DATA,
+    CONF_AUTH_DATA,
+    CONF_DEVICE_DATA,
+    CONF_REGION_DATA,
+    CONF_SESSION_DATA,
+)
 from .error_handling import MammotionErrorHandling
+from .memory import DATA_MEMORY_TRACER, measure_snapshot, snapshot_coordinator
 
-TO_REDACT: list[str] = []
+REDACTED = "**REDACTED**"
+MAX_COLLECTION_ITEMS = 100
+MAX_STRING_LENGTH = 1024
+MAX_SECTION_BYTES = 512 * 1024
+MAX_DEPTH = 16
+
+
+def _normalize(key: str) -> str:
+    """Fold snake_case and camelCase spellings of a key together."""
+    return key.replace("_", "").lower()
+
+
+TO_REDACT: frozenset[str] = frozenset(
+    _normalize(key)
+    for key in (
+        CONF_PASSWORD,
+        CONF_ACCOUNTNAME,
+        CONF_AUTH_DATA,
+        CONF_AEP_DATA,
+        CONF_SESSION_DATA,
+        CONF_REGION_DATA,
+        CONF_DEVICE_DATA,
+        "access_token",
+        "refresh_token",
+        "authorization_code",
+        "device_secret",
+        "iot_token",
+        "identity_id",
+        "user_id",
+        "account_id",
+        "iot_id",
+        "email",
+        "username",
+    )
+)
+
+
+class MammotionDiagnosticsBuilder:
+    """Build diagnostics section by section with bounded output.
+
+    Sections are registered as factories. ``collect`` evaluates them on the
+    event loop, where live state can be read safely, so each factory must
+    return a copy or a freshly built stats dict. ``build`` then only walks
+    and encodes what was collected, which is meant to run in the executor;
+    a section's ``finish`` callable, if any, runs there first to turn the
+    collected copy into its value.
+    Values are walked once: keys in ``TO_REDACT`` are masked, long sequences
+    are sampled evenly, large mappings and strings are capped, and each
+    section gets a size and timing entry in the summary.
+    """
+
+    def __init__(
+        self,
+        max_items: int = MAX_COLLECTION_ITEMS,
+        max_string: int = MAX_STRING_LENGTH,
+        max_section_bytes: int = MAX_SECTION_BYTES,
+    ) -> None:
+        """Initialize the builder."""
+        self.max_items = max_items
+        self.max_string = max_string
+        self.max_section_bytes = max_section_bytes
+        self._sections: dict[str, Callable[[], Any]] = {}
+        self._finish: dict[str, Callable[[Any], Any]] = {}
+        self._collected: dict[str, Any] = {}
+        self._errors: dict[str, str] = {}
+        self._collect_ms: dict[str, float] = {}
+        self._redact: dict[str, bool] = {}
+        self._truncated = 0
+
+    def add_section(
+        self,
+        name: str,
+        factory: Callable[[], Any],
+        finish: Callable[[Any], Any] | None = None,
+    ) -> None:
+        """Register a section to be collected later."""
+        self._sections[name] = factory
+        if finish is not None:
+            self._finish[name] = finish
+
+    def collect(self) -> None:
+        """Evaluate every section factory; call this on the event loop."""
+        for name, factory in self._sections.items():
+            start = time.perf_counter()
+            try:
+                self._collected[name] = factory()
+            except Exception as error:  # noqa: BLE001
+                self._errors[name] = repr(error)
+            self._collect_ms[name] = (time.perf_counter() - start) * 1000
+
+    def build(self) -> dict[str, Any]:
+        """Sanitize and measure every collected section and add the summary."""
+        result: dict[str, Any] = {}
+        summary: dict[str, Any] = {}
+        for name in self._sections:
+            if (error := self._errors.get(name)) is not None:
+                result[name] = None
+                summary[name] = {"error": error}
+                continue
+            start = time.perf_counter()
+            self._truncated = 0
+            try:
+                value = self._collected[name]
+                if (finish := self._finish.get(name)) is not None:
+                    value = finish(value)
+                value = self.sanitize(value)
+                size = len(json_bytes(value))
+                if size > self.max_section_bytes:
+                    value = {"omitted": f"section is {size} bytes"}
+                result[name] = value
+                summary[name] = {
+                    "bytes": size,
+                    "ms": round(
+                        self._collect_ms[name] + (time.perf_counter() - start) * 1000, 2
+                    ),
+                    "truncated": self._truncated,
+                }
+            except Exception as error:  # noqa: BLE001
+                result[name] = None
+                summary[name] = {"error": repr(error)}
+        result["summary"] = summary
+        return result
+
+    def sanitize(self, value: Any, depth: int = 0) -> Any:
+        """Return a bounded, redacted, JSON serializable copy of ``value``."""
+        if value is None or isinstance(value, bool | int | float):
+            return value
+        if isinstance(value, str):
+            if len(value) <= self.max_string:
+                return value
+            self._truncated += 1
+            return value[: self.max_string] + "..."
+        if isinstance(value, Enum):
+            return value.name
+        if isinstance(value, datetime | date):
+            return value.isoformat()
+        if isinstance(value, bytes | bytearray | memoryview):
+            return f"<{len(value)} bytes>"
+        if depth >= MAX_DEPTH:
+            self._truncated += 1
+            return f"<{type(value).__name__}>"
+
+        if isinstance(value, Mapping):
+            return self._sanitize_items(value.items(), len(value), depth)
+        if is_dataclass(value) and not isinstance(value, type):
+            pairs = ((field.name, getattr(value, field.name)) for field in fields(value))
+            return self._sanitize_items(pairs, None, depth)
+        if isinstance(value, list | tuple | set | frozenset):
+            items = list(value)
+            if len(items) > self.max_items:
+                self._truncated += 1
+                step = len(items) / self.max_items
+                items = [items[int(index * step)] for index in range(self.max_items)]
+            return [self.sanitize(item, depth + 1) for item in items]
+        return str(value)
+
+    def _sanitize_items(self, items: Any, total: int | None, depth: int) -> dict[str, Any]:
+        result: dict[str, Any] = {}
+        for count, (key, value) in enumerate(items):
+            # Dataclass fields are a fixed schema; only open mappings are capped.
+            if total is not None and count == self.max_items:
+                self._truncated += 1
+                result["__truncated__"] = total
+                break
+            key = str(key)
+            if self._should_redact(key) and value not in (None, "", [], {}):
+                result[key] = REDACTED
+            else:
+                result[key] = self.sanitize(value, depth + 1)
+        return result
+
+    def _should_redact(self, key: str) -> bool:
+        if (redact := self._redact.get(key)) is None:
+            redact = self._redact[key] = _normalize(key) in TO_REDACT
+        return redact
 
 
 async def async_get_config_entry_diagnostics(
@@ -22,7 +210,48 @@ async def async_get_config_entry_diagnostics(
     coordinator = entry.runtime_data
     error_handler = MammotionErrorHandling(hass)
     try:
-        return async_redact_data(asdict(coordinator.data), TO_REDACT)
+        # The map is walked in the executor, so it is taken from a copy.
+        mower = coordinator.serializer.snapshot(coordinator.data, "diagnostics")
+        builder = MammotionDiagnosticsBuilder()
+        builder.add_section(
+            "config_entry",
+            lambda: {"data": dict(entry.data), "options": dict(entry.options)},
+        )
+        builder.add_section(
+            "device",
+            lambda: {
+                field.name: getattr(mower, field.name)
+                for field in fields(mower)
+                if field.name != "map"
+            },
+        )
+        builder.add_section("map", lambda: mower.map)
+        snapshot = coordinator.snapshot
+        builder.add_section("snapshot", lambda: snapshot)
+        builder.add_section("map_renderer", lambda: coordinator.map_renderer.stats)
+        builder.add_section(
+            "memory", lambda: snapshot_coordinator(coordinator), finish=measure_snapshot
+        )
+        builder.add_section("serialization", lambda: coordinator.serializer.stats)
+        builder.add_section("connection", lambda: coordinator.connection.diagnostics)
+        builder.add_section("bluetooth_sources", lambda: coordinator.proxies.stats)
+        builder.add_section("manual_drive", lambda: coordinator.manual_drive.diagnostics)
+        builder.add_section("telemetry", lambda: coordinator.telemetry.stats)
+        builder.add_section("statistics", lambda: coordinator.statistics.stats)
+        builder.add_section("prediction", lambda: coordinator.predictions.stats)
+        builder.add_section("route_preview", lambda: coordinator.route_planner.stats)
+        builder.add_section(
+            "sensor_filters",
+            lambda: {key: tracker.stats for key, tracker in coordinator.sensor_filters.items()},
+        )
+        if (tracer := hass.data.get(DATA_MEMORY_TRACER)) is not None and tracer.count:
+            builder.add_section("memory_trace", lambda: tracer.stats)
+        if (capture := coordinator.capture) is not None:
+            builder.add_section("capture", lambda: capture.stats)
+        if (monitor := coordinator.callback_monitor) is not None:
+            builder.add_section("callbacks", lambda: monitor.stats)
+        builder.collect()
+        return await hass.async_add_executor_job(builder.build)
     except Exception as error:
         error_handler.handle_error(error, "async_get_config_entry_diagnostics")
         return {}
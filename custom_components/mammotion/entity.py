@@ -8,6 +8,7 @@ from pymammotion.utility.device_type import DeviceType
 from .const import CONF_RETRY_COUNT, DEFAULT_RETRY_COUNT, DOMAIN
 from .coordinator import MammotionDataUpdateCoordinator
 from .error_handling import MammotionErrorHandling
+from .snapshot import MowerSnapshot
 
 
 class MammotionBaseEntity(CoordinatorEntity[MammotionDataUpdateCoordinator]):
@@ -21,6 +22,11 @@ class MammotionBaseEntity(CoordinatorEntity[MammotionDataUpdateCoordinator]):
         self._attr_unique_id = f"{coordinator.device_name}_{key}"
         self.error_handler = MammotionErrorHandling(coordinator.hass)
 
+    @property
+    def snapshot(self) -> MowerSnapshot:
+        """Return the coordinator's current snapshot."""
+        return self.coordinator.snapshot
+
     @property
     def device_info(self) -> DeviceInfo:
         try:
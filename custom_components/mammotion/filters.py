@@ -0,0 +1,102 @@
+"""Hold back sensor state writes that are only noise."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+from homeassistant.helpers.typing import StateType
+
+CONF_SENSOR_FILTER_SCALE = "sensor_filter_scale"
+DEFAULT_SENSOR_FILTER_SCALE = 1.0
+MAX_SENSOR_FILTER_SCALE = 5.0
+
+
+@dataclass(frozen=True, slots=True)
+class StateFilter:
+    """How far and how often a sensor has to change before it is written.
+
+    ``deadband`` is the smallest change from the last written value that is
+    written at all. A change in the opposite direction to the last one must
+    also clear ``hysteresis``, so a value flipping between two neighbours
+    stays put. ``min_interval`` is the least time in seconds between writes.
+    """
+
+    deadband: float = 0.0
+    hysteresis: float = 0.0
+    min_interval: float = 0.0
+
+    def scaled(self, scale: float) -> StateFilter | None:
+        """Return this filter with every setting multiplied by ``scale``."""
+        if scale <= 0:
+            return None
+        return StateFilter(
+            self.deadband * scale, self.hysteresis * scale, self.min_interval * scale
+        )
+
+
+class StateFilterTracker:
+    """The last written value of one sensor and the writes held back since."""
+
+    __slots__ = (
+        "direction",
+        "filter",
+        "pending",
+        "suppressed",
+        "value",
+        "written",
+        "written_at",
+    )
+
+    def __init__(self, state_filter: StateFilter) -> None:
+        """Initialize the tracker."""
+        self.filter = state_filter
+        self.value: StateType = None
+        self.written = 0
+        self.written_at = 0.0
+        self.direction = 0
+        self.suppressed = 0
+        self.pending = False
+
+    def accept(self, value: StateType, now: float) -> bool:
+        """Return whether ``value`` should be written, recording it if so.
+
+        ``pending`` is set when only ``min_interval`` held the value back, so
+        it should be tried again once ``retry_in`` has passed.
+        """
+        self.pending = False
+        if self.written and value == self.value:
+            return False
+        if (
+            self.written
+            and isinstance(value, int | float)
+            and isinstance(self.value, int | float)
+        ):
+            delta = value - self.value
+            direction = 1 if delta > 0 else -1
+            threshold = self.filter.deadband
+            if direction == -self.direction:
+                threshold += self.filter.hysteresis
+            if abs(delta) < threshold:
+                self.suppressed += 1
+                return False
+        else:
+            direction = 0
+        if self.written and now - self.written_at < self.filter.min_interval:
+            self.suppressed += 1
+            self.pending = True
+            return False
+        self.value = value
+        self.direction = direction
+        self.written += 1
+        self.written_at = now
+        return True
+
+    def retry_in(self, now: float) -> float:
+        """Return the seconds until ``min_interval`` allows another write."""
+        return max(0.0, self.written_at + self.filter.min_interval - now)
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return the write counts for diagnostics."""
+        return {"written": self.written, "suppressed": self.suppressed}
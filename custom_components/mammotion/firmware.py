@@ -1,90 +1,127 @@
 """Firmware update functionality for the Mammotion integration."""
 
+from __future__ import annotations
+
+from datetime import timedelta
+
+from homeassistant.components.update import UpdateEntity, UpdateEntityFeature
+from homeassistant.const import EntityCategory
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
-from homeassistant.helpers.entity import EntityCategory
-from homeassistant.components.update import UpdateEntity, UpdateEntityDescription
-from homeassistant.const import EntityCategory
 
 from .coordinator import MammotionDataUpdateCoordinator
 from .entity import MammotionBaseEntity
 from .error_handling import MammotionErrorHandling
 
-class MammotionFirmwareUpdateCoordinator(DataUpdateCoordinator):
-    """Coordinator to manage firmware updates for Mammotion devices."""
+OTA_INTERVAL = timedelta(hours=6)
+OTA_PROGRESS_INTERVAL = timedelta(seconds=30)
+
+
+class MammotionFirmwareUpdateCoordinator(DataUpdateCoordinator[None]):
+    """Coordinator to manage firmware updates for Mammotion devices.
+
+    The mower downloads and installs OTA images itself, so this asks the
+    device for its OTA state on a schedule. The answer lands in the data
+    coordinator's device state, and the request repeats more often while
+    the device reports an OTA in progress.
+    """
 
     def __init__(self, hass: HomeAssistant, coordinator: MammotionDataUpdateCoordinator):
         """Initialize the firmware update coordinator."""
-        super().__init__(hass, coordinator.logger, name="Mammotion Firmware Update")
+        super().__init__(
+            hass,
+            coordinator.logger,
+            name="Mammotion Firmware Update",
+            update_interval=OTA_INTERVAL,
+        )
         self.coordinator = coordinator
         self.error_handler = MammotionErrorHandling(hass)
 
+    async def _async_update_data(self) -> None:
+        """Request the OTA state and pick the next interval."""
+        await self.async_check_for_updates()
+        mower = self.coordinator.data
+        installing = mower is not None and 0 < mower.ota.toapp_get_info_rsp.ota.progress < 100
+        self.update_interval = OTA_PROGRESS_INTERVAL if installing else OTA_INTERVAL
+
     async def async_check_for_updates(self):
-        """Check for firmware updates."""
+        """Ask the device for its OTA state."""
         try:
-            await self.coordinator.async_send_command("check_firmware_update")
+            await self.coordinator.async_send_command("get_device_ota_info", log_type=1)
         except Exception as error:
             self.error_handler.handle_error(error, "async_check_for_updates")
 
-    async def async_download_update(self):
-        """Download firmware update."""
-        try:
-            await self.coordinator.async_send_command("download_firmware_update")
-        except Exception as error:
-            self.error_handler.handle_error(error, "async_download_update")
-
-    async def async_install_update(self):
-        """Install firmware update."""
-        try:
-            await self.coordinator.async_send_command("install_firmware_update")
-        except Exception as error:
-            self.error_handler.handle_error(error, "async_install_update")
-
     async def async_update(self):
-        """Update the firmware."""
+        """Refresh the OTA state the entity reports."""
         try:
-            await self.async_check_for_updates()
-            await self.async_download_update()
-            await self.async_install_update()
+            await self.async_refresh()
         except Exception as error:
             self.error_handler.handle_error(error, "async_update")
 
+
 class MammotionFirmwareUpdateEntity(MammotionBaseEntity, UpdateEntity):
     """Representation of a firmware update entity for Mammotion devices."""
 
-    def __init__(self, coordinator: MammotionDataUpdateCoordinator):
+    _attr_supported_features = UpdateEntityFeature.PROGRESS
+
+    def __init__(
+        self,
+        coordinator: MammotionDataUpdateCoordinator,
+        firmware_coordinator: MammotionFirmwareUpdateCoordinator | None = None,
+    ):
         """Initialize the firmware update entity."""
         super().__init__(coordinator, "firmware_update")
+        self.firmware_coordinator = firmware_coordinator or MammotionFirmwareUpdateCoordinator(
+            coordinator.hass, coordinator
+        )
         self._attr_entity_category = EntityCategory.DIAGNOSTIC
         self._attr_name = "Firmware Update"
         self._attr_unique_id = f"{coordinator.device_name}_firmware_update"
         self._attr_should_poll = False
         self.error_handler = MammotionErrorHandling(coordinator.hass)
 
+    async def async_added_to_hass(self) -> None:
+        """Start requesting the OTA state while the entity exists."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.firmware_coordinator.async_add_listener(self.async_write_ha_state)
+        )
+        await self.firmware_coordinator.async_request_refresh()
+
+    @property
+    def installed_version(self) -> str | None:
+        """Return the firmware version reported by the device."""
+        mower = self.coordinator.data
+        if mower is None or not mower.net.toapp_devinfo_resp.resp_ids:
+            return None
+        return mower.net.toapp_devinfo_resp.resp_ids[0].info
+
+    @property
+    def latest_version(self) -> str | None:
+        """Return the version the device reports for its OTA."""
+        mower = self.coordinator.data
+        if mower is not None and (version := mower.ota.toapp_get_info_rsp.ota.version):
+            return version
+        return self.installed_version
+
+    @property
+    def in_progress(self) -> bool | int | None:
+        """Return the device's own OTA progress."""
+        mower = self.coordinator.data
+        if mower is not None and 0 < (progress := mower.ota.toapp_get_info_rsp.ota.progress) < 100:
+            return progress
+        return False
+
     async def async_update(self):
         """Update the firmware entity."""
         try:
-            await self.coordinator.async_update()
+            await self.firmware_coordinator.async_update()
         except Exception as error:
             self.error_handler.handle_error(error, "async_update")
 
     async def async_check_for_updates(self):
         """Check for firmware updates."""
         try:
-            await self.coordinator.async_check_for_updates()
+            await self.firmware_coordinator.async_check_for_updates()
         except Exception as error:
             self.error_handler.handle_error(error, "async_check_for_updates")
-
-    async def async_download_update(self):
-        """Download firmware update."""
-        try:
-            await self.coordinator.async_download_update()
-        except Exception as error:
-            self.error_handler.handle_error(error, "async_download_update")
-
-    async def async_install_update(self):
-        """Install firmware update."""
-        try:
-            await self.coordinator.async_install_update()
-        except Exception as error:
-            self.error_handler.handle_error(error, "async_install_update")
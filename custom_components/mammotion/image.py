@@ -0,0 +1,98 @@
+"""Map image entity for the mower."""
+
+from __future__ import annotations
+
+from homeassistant.components.image import ImageEntity
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.util import dt as dt_util
+
+from . import MammotionConfigEntry
+from .coordinates import Pose, mower_pose
+from .coordinator import MammotionDataUpdateCoordinator
+from .entity import MammotionBaseEntity
+from .error_handling import MammotionErrorHandling
+from .map_renderer import MapKey, map_key, map_layers
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: MammotionConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the Mammotion map image entity."""
+    coordinator: MammotionDataUpdateCoordinator = entry.runtime_data
+    error_handler = MammotionErrorHandling(hass)
+
+    try:
+        async_add_entities([MammotionMapImageEntity(coordinator)])
+    except Exception as error:
+        error_handler.handle_error(error, "async_setup_entry")
+
+
+class MammotionMapImageEntity(MammotionBaseEntity, ImageEntity):
+    """Renders the synced map with the live mower position."""
+
+    _attr_content_type = "image/png"
+    _attr_translation_key = "map"
+
+    def __init__(self, coordinator: MammotionDataUpdateCoordinator) -> None:
+        """Initialize the map image entity."""
+        super().__init__(coordinator, "map")
+        ImageEntity.__init__(self, coordinator.hass)
+        self.error_handler = MammotionErrorHandling(coordinator.hass)
+        self._map_key: MapKey | None = None
+        self._pose: Pose | None = None
+
+    async def async_added_to_hass(self) -> None:
+        """Redraw when a new route preview is planned."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.route_planner.async_add_preview_listener(
+                self._handle_preview_update
+            )
+        )
+
+    @callback
+    def _handle_preview_update(self) -> None:
+        """Bump the image timestamp for the new preview."""
+        self._attr_image_last_updated = dt_util.utcnow()
+        self.async_write_ha_state()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Bump the image timestamp only when the map or the pose moved."""
+        try:
+            mower = self.coordinator.data
+            if mower is not None:
+                key = map_key(mower.map)
+                pose = mower_pose(mower)
+                if key != self._map_key or pose != self._pose:
+                    self._map_key = key
+                    self._pose = pose
+                    self._attr_image_last_updated = dt_util.utcnow()
+        except Exception as error:
+            self.error_handler.handle_error(error, "_handle_coordinator_update")
+        super()._handle_coordinator_update()
+
+    async def async_image(self) -> bytes | None:
+        """Return the rendered map."""
+        try:
+            mower = self.coordinator.data
+            if mower is None:
+                return None
+            renderer = self.coordinator.map_renderer
+            key = map_key(mower.map)
+            layers = map_layers(mower.map) if key != renderer.base_key else None
+            preview = self.coordinator.route_planner.preview
+            return await self.hass.async_add_executor_job(
+                renderer.render,
+                key,
+                layers,
+                self.coordinator.coordinates.dock,
+                mower_pose(mower),
+                preview.path if preview else None,
+            )
+        except Exception as error:
+            self.error_handler.handle_error(error, "async_image")
+            return None
@@ -0,0 +1,124 @@
+"""Interval index for the Mammotion integration."""
+
+from __future__ import annotations
+
+import random
+from collections.abc import Iterator
+from typing import Any
+
+
+class _Node:
+    """Treap node augmented with the largest end in its subtree."""
+
+    __slots__ = ("start", "end", "value", "priority", "max_end", "left", "right")
+
+    def __init__(self, start: Any, end: Any, value: Any) -> None:
+        self.start = start
+        self.end = end
+        self.value = value
+        self.priority = random.random()
+        self.max_end = end
+        self.left: _Node | None = None
+        self.right: _Node | None = None
+
+    def update(self) -> None:
+        """Recompute the subtree maximum after a child changed."""
+        max_end = self.end
+        if self.left is not None and self.left.max_end > max_end:
+            max_end = self.left.max_end
+        if self.right is not None and self.right.max_end > max_end:
+            max_end = self.right.max_end
+        self.max_end = max_end
+
+
+def _split(node: _Node | None, key: tuple[Any, Any]) -> tuple[_Node | None, _Node | None]:
+    """Split into nodes ordered before ``key`` and the rest."""
+    if node is None:
+        return None, None
+    if (node.start, node.value) < key:
+        node.right, right = _split(node.right, key)
+        node.update()
+        return node, right
+    left, node.left = _split(node.left, key)
+    node.update()
+    return left, node
+
+
+def _merge(left: _Node | None, right: _Node | None) -> _Node | None:
+    """Join two treaps where every key in ``left`` precedes ``right``."""
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        left.update()
+        return left
+    right.left = _merge(left, right.left)
+    right.update()
+    return right
+
+
+class IntervalTree:
+    """Dynamic set of half-open ``[start, end)`` intervals.
+
+    Intervals are keyed by ``(start, value)`` in a treap so inserts and
+    removals are O(log n). Each node carries the largest end in its subtree,
+    which lets an overlap query skip every subtree that ends before the
+    window, giving O(log n + k) for k matches.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty tree."""
+        self._root: _Node | None = None
+        self._size = 0
+
+    def __len__(self) -> int:
+        """Return the number of intervals."""
+        return self._size
+
+    def insert(self, start: Any, end: Any, value: Any) -> None:
+        """Add an interval; ``(start, value)`` must be unique."""
+        left, right = _split(self._root, (start, value))
+        self._root = _merge(_merge(left, _Node(start, end, value)), right)
+        self._size += 1
+
+    def remove(self, start: Any, value: Any) -> bool:
+        """Remove the interval stored under ``(start, value)``."""
+        left, rest = _split(self._root, (start, value))
+        match, right = _split_first(rest, (start, value))
+        self._root = _merge(left, right)
+        if match is None:
+            return False
+        self._size -= 1
+        return True
+
+    def overlap(self, start: Any, end: Any) -> list[tuple[Any, Any, Any]]:
+        """Return ``(start, end, value)`` for every interval overlapping the window."""
+        return list(self._overlap(self._root, start, end))
+
+    def _overlap(
+        self, node: _Node | None, start: Any, end: Any
+    ) -> Iterator[tuple[Any, Any, Any]]:
+        while node is not None and node.max_end > start:
+            yield from self._overlap(node.left, start, end)
+            if node.start >= end:
+                return
+            if node.end > start:
+                yield node.start, node.end, node.value
+            node = node.right
+
+
+def _split_first(
+    node: _Node | None, key: tuple[Any, Any]
+) -> tuple[_Node | None, _Node | None]:
+    """Detach the node equal to ``key`` from a treap whose keys are all >= ``key``."""
+    if node is None:
+        return None, None
+    if node.left is None:
+        if (node.start, node.value) == key:
+            return node, node.right
+        return None, node
+    match, node.left = _split_first(node.left, key)
+    node.update()
+    return match, node
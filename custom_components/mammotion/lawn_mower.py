@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import dataclasses
+from datetime import timedelta
 from typing import Any
 
 import voluptuous as vol
@@ -10,7 +12,7 @@ from homeassistant.components.lawn_mower import (
     LawnMowerEntity,
     LawnMowerEntityFeature,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, ServiceResponse, SupportsResponse
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers import entity_platform
@@ -28,6 +30,14 @@ from .entity import MammotionBaseEntity
 from .error_handling import MammotionErrorHandling
 
 SERVICE_START_MOWING = "start_mow"
+SERVICE_START_CAPTURE = "start_capture"
+SERVICE_STOP_CAPTURE = "stop_capture"
+SERVICE_PREVIEW_ROUTE = "preview_route"
+
+START_CAPTURE_SCHEMA = {
+    vol.Optional("compress", default=False): cv.boolean,
+    vol.Optional("duration"): cv.positive_time_period,
+}
 
 START_MOW_SCHEMA = {
     vol.Optional("is_mow", default=True): cv.boolean,
@@ -69,6 +79,15 @@ START_MOW_SCHEMA = {
     ),  # This assumes `areas` are entity IDs from the integration
 }
 
+PREVIEW_ROUTE_SCHEMA = {
+    vol.Optional("speed"): vol.All(vol.Coerce(float), vol.Range(min=0.2, max=1.2)),
+    vol.Optional("channel_width"): vol.All(vol.Coerce(int), vol.Range(min=20, max=35)),
+    vol.Optional("toward"): vol.All(vol.Coerce(int), vol.Range(min=-180, max=180)),
+    vol.Optional("border_mode"): vol.In([0, 1, 2, 3, 4]),
+    vol.Optional("obstacle_laps"): vol.In([0, 1, 2, 3, 4]),
+    vol.Optional("areas"): vol.All(cv.ensure_list, [cv.entity_id]),
+}
+
 
 def get_entity_attribute(hass, entity_id, attribute_name):
     # Get the state object of the entity
@@ -102,6 +121,18 @@ async def async_setup_entry(
     platform.async_register_entity_service(
         SERVICE_START_MOWING, START_MOW_SCHEMA, "async_start_mowing"
     )
+    platform.async_register_entity_service(
+        SERVICE_START_CAPTURE, START_CAPTURE_SCHEMA, "async_start_capture"
+    )
+    platform.async_register_entity_service(
+        SERVICE_STOP_CAPTURE, {}, "async_stop_capture"
+    )
+    platform.async_register_entity_service(
+        SERVICE_PREVIEW_ROUTE,
+        PREVIEW_ROUTE_SCHEMA,
+        "async_preview_route",
+        supports_response=SupportsResponse.ONLY,
+    )
 
 
 class MammotionLawnMowerEntity(MammotionBaseEntity, LawnMowerEntity):
@@ -134,11 +165,12 @@ class MammotionLawnMowerEntity(MammotionBaseEntity, LawnMowerEntity):
     def activity(self) -> LawnMowerActivity | None:
         """Return the state of the mower."""
 
-        if self.rpt_dev_status is None:
+        snapshot = self.snapshot
+        if not snapshot.reported:
             return None
 
-        mode = self.rpt_dev_status.sys_status
-        charge_state = self.rpt_dev_status.charge_state
+        mode = snapshot.reported_sys_status
+        charge_state = snapshot.charge_state
 
         LOGGER.debug("activity mode %s", mode)
         if (
@@ -176,13 +208,14 @@ class MammotionLawnMowerEntity(MammotionBaseEntity, LawnMowerEntity):
 
             # check if job in progress
             #
-            if self.rpt_dev_status is None:
+            snapshot = self.snapshot
+            if not snapshot.reported:
                 raise HomeAssistantError(
                     translation_domain=DOMAIN, translation_key="device_not_ready"
                 )
-            work_area = self.report_data.work.area >> 16
+            work_area = snapshot.work_area >> 16
 
-            if work_area > 0 and self.rpt_dev_status.sys_status in (
+            if work_area > 0 and snapshot.reported_sys_status in (
                 WorkMode.MODE_PAUSE,
                 WorkMode.MODE_READY,
             ):
@@ -204,6 +237,32 @@ class MammotionLawnMowerEntity(MammotionBaseEntity, LawnMowerEntity):
         except Exception as error:
             self.error_handler.handle_error(error, "async_start_mowing")
 
+    async def async_start_capture(
+        self, compress: bool = False, duration: timedelta | None = None
+    ) -> None:
+        """Start capturing the mower's raw traffic."""
+        await self.coordinator.async_start_capture(compress, duration)
+
+    async def async_stop_capture(self) -> None:
+        """Stop capturing the mower's raw traffic."""
+        await self.coordinator.async_stop_capture()
+
+    async def async_preview_route(self, **kwargs: Any) -> ServiceResponse:
+        """Estimate a job's route, defaulting to the current operation settings."""
+        if "areas" in kwargs:
+            kwargs["areas"] = [
+                area_hash
+                for entity_id in kwargs["areas"]
+                if (area_hash := get_entity_attribute(self.hass, entity_id, "hash")) is not None
+            ]
+        settings = dataclasses.replace(self.coordinator.operation_settings, **kwargs)
+        estimate = await self.coordinator.route_planner.async_estimate(settings)
+        if estimate is None:
+            raise HomeAssistantError(
+                translation_domain=DOMAIN, translation_key="map_not_synced"
+            )
+        return estimate.as_dict()
+
     async def async_dock(self) -> None:
         """Start docking."""
         try:
@@ -234,15 +293,16 @@ class MammotionLawnMowerEntity(MammotionBaseEntity, LawnMowerEntity):
     async def async_pause(self) -> None:
         """Pause mower."""
         try:
-            await self.coordinator.async_send_command("pause_execute_task")
-            await self.coordinator.async_request_iot_sync()
-        except COMMAND_EXCEPTIONS as exc:
-            raise HomeAssistantError(
-                translation_domain=DOMAIN, translation_key="pause_failed"
-            ) from exc
-        finally:
-            self.coordinator.async_set_updated_data(
-                self.coordinator.manager.mower(self.coordinator.device_name)
-            )
+            try:
+                await self.coordinator.async_send_command("pause_execute_task")
+                await self.coordinator.async_request_iot_sync()
+            except COMMAND_EXCEPTIONS as exc:
+                raise HomeAssistantError(
+                    translation_domain=DOMAIN, translation_key="pause_failed"
+                ) from exc
+            finally:
+                self.coordinator.async_set_updated_data(
+                    self.coordinator.manager.mower(self.coordinator.device_name)
+                )
         except Exception as error:
             self.error_handler.handle_error(error, "async_pause")
@@ -0,0 +1,205 @@
+"""Stream joystick setpoints to the mower over a held Bluetooth link."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from pymammotion.utility.movement import get_percent
+
+from .const import LOGGER
+from .error_handling import MammotionErrorHandling
+
+if TYPE_CHECKING:
+    from .coordinator import MammotionDataUpdateCoordinator
+
+CONTROL_RATE = 10
+STREAM_TIMEOUT = 0.5
+HOLD_MANUAL = "manual"
+ANGULAR_SCALE = 4.5
+
+
+def movement_speeds(linear: float, angular: float) -> tuple[int, int]:
+    """Convert joystick axes in ``[-1, 1]`` to the mower's motion units.
+
+    This is the scaling pymammotion's ``move_*`` commands apply to a single
+    axis, done for both axes at once so one message carries the whole
+    setpoint. Forward and left are positive.
+    """
+    linear = max(-1.0, min(1.0, linear))
+    angular = max(-1.0, min(1.0, angular))
+    linear_speed = int(get_percent(abs(linear) * 100)) * 10
+    angular_speed = int(int(get_percent(abs(angular) * 100)) * ANGULAR_SCALE)
+    return (
+        linear_speed if linear >= 0 else -linear_speed,
+        angular_speed if angular >= 0 else -angular_speed,
+    )
+
+
+@dataclass(slots=True)
+class DriveStats:
+    """Counters for one manual drive session and the ones before it."""
+
+    sessions: int = 0
+    setpoints: int = 0
+    coalesced: int = 0
+    sent: int = 0
+    timeouts: int = 0
+    errors: int = 0
+    latency_ms: float = 0.0
+    latency_samples: int = 0
+    last_latency_ms: float = 0.0
+    max_latency_ms: float = 0.0
+
+
+class MammotionManualDrive:
+    """Drive the mower from a stream of ``(linear, angular)`` setpoints.
+
+    Setpoints may arrive faster than the mower can take them; only the
+    latest is kept. A control loop sends it at most ``CONTROL_RATE`` times a
+    second, straight away when a new one arrives and otherwise repeating the
+    last one so the mower keeps moving. When no setpoint has arrived for
+    ``STREAM_TIMEOUT`` seconds, or the session is stopped, a zero setpoint is
+    sent and the loop ends.
+
+    Motion commands are written to the Bluetooth link without waiting for a
+    reply, which pymammotion would otherwise wait up to two seconds for, and
+    the link is held open for the whole session. Without a Bluetooth
+    transport the commands go through the coordinator instead.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator: MammotionDataUpdateCoordinator) -> None:
+        """Initialize manual drive."""
+        self.hass = hass
+        self.coordinator = coordinator
+        self.stats = DriveStats()
+        self.error_handler = MammotionErrorHandling(hass)
+        self._setpoint: tuple[int, int] = (0, 0)
+        self._received = 0.0
+        self._fresh = False
+        self._stopping = False
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+        self._release: CALLBACK_TYPE | None = None
+
+    @property
+    def active(self) -> bool:
+        """Return whether a drive session is running."""
+        return self._task is not None
+
+    @callback
+    def async_setpoint(self, linear: float, angular: float) -> None:
+        """Take the latest joystick position, starting a session if needed."""
+        self.stats.setpoints += 1
+        if self._fresh:
+            self.stats.coalesced += 1
+        self._setpoint = movement_speeds(linear, angular)
+        self._received = time.monotonic()
+        self._fresh = True
+        if self._task is None:
+            self.stats.sessions += 1
+            self._stopping = False
+            self._release = self.coordinator.connection.async_hold(HOLD_MANUAL)
+            self._task = self.hass.async_create_background_task(
+                self._async_run(), "mammotion manual drive"
+            )
+        self._wake.set()
+
+    async def async_stop(self) -> None:
+        """Stop the mower and end the session."""
+        if (task := self._task) is None:
+            return
+        self._stopping = True
+        self._wake.set()
+        await task
+
+    async def _async_run(self) -> None:
+        """Send the latest setpoint at the control rate until the stream ends."""
+        period = 1 / CONTROL_RATE
+        sent_at = 0.0
+        try:
+            while not self._stopping:
+                if time.monotonic() - self._received >= STREAM_TIMEOUT:
+                    self.stats.timeouts += 1
+                    LOGGER.debug("Manual drive stream for %s timed out", self.coordinator.device_name)
+                    break
+                if (wait := sent_at + period - time.monotonic()) > 0:
+                    await asyncio.sleep(wait)
+                if self._stopping:
+                    break
+                fresh, received = self._fresh, self._received
+                self._fresh = False
+                self._wake.clear()
+                sent_at = time.monotonic()
+                await self._async_send(*self._setpoint)
+                if fresh:
+                    self._record_latency((time.monotonic() - received) * 1000)
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(self._wake.wait(), period)
+        except Exception as error:
+            self.stats.errors += 1
+            self.error_handler.handle_error(error, "_async_run")
+        finally:
+            await self._async_finish()
+
+    async def _async_finish(self) -> None:
+        """Stop the mower and let go of the link."""
+        try:
+            await self._async_send(0, 0)
+        except Exception as error:
+            self.stats.errors += 1
+            self.error_handler.handle_error(error, "_async_finish")
+        finally:
+            self._task = None
+            self._fresh = False
+            if self._release is not None:
+                self._release()
+                self._release = None
+
+    async def _async_send(self, linear_speed: int, angular_speed: int) -> None:
+        """Write one motion command, bypassing the reply wait on Bluetooth."""
+        coordinator = self.coordinator
+        device = coordinator.manager.get_device_by_name(coordinator.device_name)
+        ble = device.ble() if device else None
+        if ble is None or not coordinator.ble_reachable:
+            await coordinator.async_send_command(
+                "send_movement", linear_speed=linear_speed, angular_speed=angular_speed
+            )
+        else:
+            await ble._ensure_connected()  # noqa: SLF001
+            await ble._message.post_custom_data_bytes(  # noqa: SLF001
+                ble._commands.send_movement(  # noqa: SLF001
+                    linear_speed=linear_speed, angular_speed=angular_speed
+                )
+            )
+        self.stats.sent += 1
+
+    def _record_latency(self, elapsed_ms: float) -> None:
+        stats = self.stats
+        stats.latency_ms += elapsed_ms
+        stats.latency_samples += 1
+        stats.last_latency_ms = elapsed_ms
+        stats.max_latency_ms = max(stats.max_latency_ms, elapsed_ms)
+
+    @property
+    def diagnostics(self) -> dict[str, Any]:
+        """Return the session counters and latencies for diagnostics."""
+        stats = self.stats
+        return {
+            "active": self.active,
+            "sessions": stats.sessions,
+            "setpoints": stats.setpoints,
+            "coalesced": stats.coalesced,
+            "sent": stats.sent,
+            "timeouts": stats.timeouts,
+            "errors": stats.errors,
+            "latency_ms_avg": round(stats.latency_ms / stats.latency_samples, 1)
+            if stats.latency_samples
+            else None,
+            "latency_ms_last": round(stats.last_latency_ms, 1),
+            "latency_ms_max": round(stats.max_latency_ms, 1),
+        }
@@ -0,0 +1,261 @@
+"""Map rendering for the Mammotion integration."""
+
+from __future__ import annotations
+
+import io
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+from PIL import Image, ImageDraw
+from pymammotion.data.model.hash_list import HashList
+
+from .coordinates import Pose
+
+MAX_IMAGE_SIZE = 1024
+MAP_MARGIN = 16
+MAX_LAYER_POINTS = 20000
+
+BACKGROUND_COLOR = (0, 0, 0, 0)
+AREA_FILL = (76, 175, 80, 160)
+AREA_OUTLINE = (46, 125, 50, 255)
+OBSTACLE_FILL = (244, 67, 54, 160)
+PATH_COLOR = (158, 158, 158, 255)
+ROUTE_COLOR = (255, 255, 255, 200)
+DOCK_COLOR = (33, 150, 243, 255)
+MOWER_COLOR = (255, 193, 7, 255)
+MOWER_OUTLINE = (0, 0, 0, 255)
+
+type Point = tuple[float, float]
+type MapKey = tuple[tuple[int, ...], int]
+type MapLayers = dict[str, list[list[Any]]]
+
+
+@dataclass(frozen=True)
+class MapTransform:
+    """Projection from the device's local frame (metres) to image pixels."""
+
+    min_x: float
+    max_y: float
+    scale: float
+
+    def to_pixel(self, x: float, y: float) -> Point:
+        """Project a local point, flipping y so north is up."""
+        return (
+            MAP_MARGIN + (x - self.min_x) * self.scale,
+            MAP_MARGIN + (self.max_y - y) * self.scale,
+        )
+
+
+def map_key(hash_list: HashList) -> MapKey:
+    """Return a cheap key that changes whenever the synced map changes."""
+    frames = sum(
+        len(frame_list.data)
+        for layer in (hash_list.area, hash_list.obstacle, hash_list.path)
+        for frame_list in layer.values()
+    )
+    return tuple(hash_list.hashlist), frames
+
+
+def map_layers(hash_list: HashList) -> MapLayers:
+    """Take a shallow copy of the map frames so they can be read off the loop."""
+    return {
+        "area": [list(frame_list.data) for frame_list in hash_list.area.values()],
+        "obstacle": [
+            list(frame_list.data) for frame_list in hash_list.obstacle.values()
+        ],
+        "path": [list(frame_list.data) for frame_list in hash_list.path.values()],
+    }
+
+
+def frames_to_points(frames: list[Any]) -> list[Point]:
+    """Join the frames of one map element into a single point list."""
+    return [
+        (couple.x, couple.y)
+        for frame in sorted(frames, key=lambda frame: frame.current_frame)
+        for couple in frame.data_couple
+    ]
+
+
+def _decimate(points: list[Point], budget: int) -> list[Point]:
+    """Drop points evenly so a shape never exceeds its share of the budget."""
+    if len(points) <= budget or budget < 3:
+        return points
+    step = math.ceil(len(points) / budget)
+    return points[::step]
+
+
+class MammotionMapRenderer:
+    """Render the synced map with a cached base layer and a pose overlay."""
+
+    def __init__(self, max_size: int = MAX_IMAGE_SIZE) -> None:
+        """Initialize the renderer."""
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._base_key: MapKey | None = None
+        self._base: Image.Image | None = None
+        self._transform: MapTransform | None = None
+        self._last_pose: Pose | None = None
+        self._last_route: NDArray[np.float64] | None = None
+        self._last_image: bytes | None = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.overlay_hits = 0
+        self.renders = 0
+        self.last_base_ms = 0.0
+        self.last_overlay_ms = 0.0
+
+    @property
+    def base_key(self) -> MapKey | None:
+        """Return the key of the cached base layer."""
+        return self._base_key
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return cache counters and timings for diagnostics."""
+        return {
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "overlay_hits": self.overlay_hits,
+            "renders": self.renders,
+            "last_base_ms": round(self.last_base_ms, 2),
+            "last_overlay_ms": round(self.last_overlay_ms, 2),
+            "base_size": self._base.size if self._base else None,
+        }
+
+    def render(
+        self,
+        key: MapKey,
+        layers: MapLayers | None,
+        dock: Pose | None,
+        pose: Pose | None,
+        route: NDArray[np.float64] | None = None,
+    ) -> bytes:
+        """Render the map as PNG, rebuilding the base layer only on a new key.
+
+        Runs in the executor. ``layers`` may be None when the caller already
+        knows the cached base layer matches ``key``. ``route`` is a planned
+        path in the local frame, drawn over the base layer under the mower.
+        """
+        with self._lock:
+            if key != self._base_key or self._base is None:
+                if layers is None:
+                    raise ValueError("Map layers are required to rebuild the base layer")
+                self.cache_misses += 1
+                start = time.perf_counter()
+                self._build_base(layers, dock)
+                self._base_key = key
+                self._last_image = None
+                self.last_base_ms = (time.perf_counter() - start) * 1000
+            else:
+                self.cache_hits += 1
+
+            if (
+                self._last_image is not None
+                and pose == self._last_pose
+                and route is self._last_route
+            ):
+                self.overlay_hits += 1
+                return self._last_image
+
+            start = time.perf_counter()
+            image = self._base.copy()
+            if self._transform is not None:
+                draw = ImageDraw.Draw(image, "RGBA")
+                if route is not None and len(route) >= 2:
+                    self._draw_route(draw, route)
+                if pose is not None:
+                    self._draw_mower(draw, pose)
+            buffer = io.BytesIO()
+            image.save(buffer, format="PNG", optimize=False, compress_level=1)
+            self._last_pose = pose
+            self._last_route = route
+            self._last_image = buffer.getvalue()
+            self.renders += 1
+            self.last_overlay_ms = (time.perf_counter() - start) * 1000
+            return self._last_image
+
+    def _build_base(self, layers: MapLayers, dock: Pose | None) -> None:
+        """Draw areas, obstacles, paths and the dock onto a new base image."""
+        shapes = {
+            name: [frames_to_points(frames) for frames in elements]
+            for name, elements in layers.items()
+        }
+        total = sum(len(points) for elements in shapes.values() for points in elements)
+        if total > MAX_LAYER_POINTS:
+            shapes = {
+                name: [
+                    _decimate(points, max(3, MAX_LAYER_POINTS * len(points) // total))
+                    for points in elements
+                ]
+                for name, elements in shapes.items()
+            }
+
+        xs = [x for elements in shapes.values() for points in elements for x, _ in points]
+        ys = [y for elements in shapes.values() for points in elements for _, y in points]
+        if dock is not None:
+            xs.append(dock[0])
+            ys.append(dock[1])
+        if not xs:
+            self._base = Image.new("RGBA", (2 * MAP_MARGIN, 2 * MAP_MARGIN), BACKGROUND_COLOR)
+            self._transform = None
+            return
+
+        min_x, max_x, min_y, max_y = min(xs), max(xs), min(ys), max(ys)
+        span = max(max_x - min_x, max_y - min_y, 1.0)
+        scale = (self.max_size - 2 * MAP_MARGIN) / span
+        self._transform = MapTransform(min_x=min_x, max_y=max_y, scale=scale)
+        size = (
+            int((max_x - min_x) * scale) + 2 * MAP_MARGIN,
+            int((max_y - min_y) * scale) + 2 * MAP_MARGIN,
+        )
+        self._base = Image.new("RGBA", size, BACKGROUND_COLOR)
+        draw = ImageDraw.Draw(self._base, "RGBA")
+        to_pixel = self._transform.to_pixel
+
+        for points in shapes.get("area", []):
+            if len(points) >= 3:
+                draw.polygon(
+                    [to_pixel(x, y) for x, y in points], fill=AREA_FILL, outline=AREA_OUTLINE
+                )
+        for points in shapes.get("obstacle", []):
+            if len(points) >= 3:
+                draw.polygon([to_pixel(x, y) for x, y in points], fill=OBSTACLE_FILL)
+        for points in shapes.get("path", []):
+            if len(points) >= 2:
+                draw.line([to_pixel(x, y) for x, y in points], fill=PATH_COLOR, width=2)
+        if dock is not None:
+            dock_x, dock_y = to_pixel(dock[0], dock[1])
+            draw.rectangle(
+                (dock_x - 5, dock_y - 5, dock_x + 5, dock_y + 5), fill=DOCK_COLOR
+            )
+
+    def _draw_route(self, draw: ImageDraw.ImageDraw, route: NDArray[np.float64]) -> None:
+        """Draw a planned path, projecting all of its points at once."""
+        transform = self._transform
+        pixels = np.column_stack(
+            (
+                MAP_MARGIN + (route[:, 0] - transform.min_x) * transform.scale,
+                MAP_MARGIN + (transform.max_y - route[:, 1]) * transform.scale,
+            )
+        )
+        draw.line(pixels.ravel().tolist(), fill=ROUTE_COLOR, width=1)
+
+    def _draw_mower(self, draw: ImageDraw.ImageDraw, pose: Pose) -> None:
+        """Draw the mower as an arrow pointing along its heading."""
+        x, y, heading = pose
+        center_x, center_y = self._transform.to_pixel(x, y)
+        size = 10
+        # Pixel y grows downwards, so the heading is mirrored.
+        points = [
+            (
+                center_x + size * math.cos(heading + offset),
+                center_y - size * math.sin(heading + offset),
+            )
+            for offset in (0.0, 2.5, -2.5)
+        ]
+        draw.polygon(points, fill=MOWER_COLOR, outline=MOWER_OUTLINE)
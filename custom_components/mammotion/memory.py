@@ -0,0 +1,283 @@
+"""Account for the memory the integration holds on to.
+
+Retained sizes are estimated by walking a copy of a coordinator's
+structures, which is only done when diagnostics are built: the copy is
+taken on the event loop and walked in the executor, up to ``MAX_OBJECTS``
+objects. tracemalloc is only started by the ``mammotion.memory_snapshot``
+service and stays off otherwise.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+import tracemalloc
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from datetime import datetime
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+from typing import TYPE_CHECKING, Any
+
+import voluptuous as vol
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.util import dt as dt_util
+from PIL import Image
+from pymammotion.data.model.device import MowingDevice
+from pymammotion.mammotion.devices.base import MammotionBaseDevice
+
+from .const import DOMAIN, LOGGER
+from .serialization import cow_copy
+
+if TYPE_CHECKING:
+    from .coordinator import MammotionDataUpdateCoordinator
+
+SERVICE_MEMORY_SNAPSHOT = "memory_snapshot"
+DATA_MEMORY_TRACER = f"{DOMAIN}_memory_tracer"
+TRACE_FRAMES = 1
+TRACE_LINES = 25
+# Objects walked per diagnostics download, several times a large map.
+MAX_OBJECTS = 500_000
+
+MEMORY_SNAPSHOT_SCHEMA = vol.Schema({vol.Optional("stop", default=False): bool})
+
+_OPAQUE = (type, ModuleType, FunctionType, BuiltinFunctionType, MethodType)
+# Shared with everything else in Home Assistant; reaching one would size it all.
+_BOUNDARIES = (HomeAssistant, DataUpdateCoordinator, MammotionBaseDevice)
+_SKIPPED = (*_OPAQUE, *_BOUNDARIES)
+_LEAVES = (str, bytes, bytearray, int, float, complex, bool, datetime)
+
+
+def _children(obj: Any) -> Iterator[Any]:
+    """Yield the objects ``obj`` refers to."""
+    if isinstance(obj, dict):
+        yield from obj.keys()
+        yield from obj.values()
+        return
+    if isinstance(obj, list | tuple | set | frozenset):
+        yield from obj
+        return
+    if (attributes := getattr(obj, "__dict__", None)) is not None:
+        yield attributes
+    for cls in type(obj).__mro__:
+        for slot in cls.__dict__.get("__slots__", ()):
+            if (value := getattr(obj, slot, None)) is not None:
+                yield value
+
+
+def retained_size(obj: Any, seen: set[int] | None = None, limit: int | None = None) -> int:
+    """Estimate the bytes ``obj`` and everything it refers to occupy.
+
+    Objects whose id is in ``seen`` are skipped and new ones are added, so
+    sizing several structures with one set counts shared objects once.
+    Classes, modules and functions are not followed, and neither are Home
+    Assistant, coordinators or transports. The walk stops once ``seen``
+    holds ``limit`` objects.
+    """
+    if seen is None:
+        seen = set()
+    total = 0
+    stack = [obj]
+    while stack and (limit is None or len(seen) < limit):
+        item = stack.pop()
+        if item is None or id(item) in seen or isinstance(item, _SKIPPED):
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, _LEAVES):
+            continue
+        if isinstance(item, Image.Image):
+            total += item.width * item.height * len(item.getbands())
+            continue
+        stack.extend(_children(item))
+    return total
+
+
+def _mower_states(coordinator: MammotionDataUpdateCoordinator) -> Iterable[MowingDevice]:
+    """Yield every mower state the coordinator and its transports reference."""
+    yield coordinator.data
+    if (device := coordinator.manager.get_device_by_name(coordinator.device_name)) is None:
+        return
+    yield device.mower_state
+    for transport in (device.ble(), device.cloud()):
+        if transport is not None:
+            yield transport.state_manager.get_device()
+
+
+def _copy_attributes(obj: Any) -> dict[str, Any] | None:
+    """Copy the attributes of an object that is not a dataclass."""
+    if obj is None:
+        return None
+    return {name: cow_copy(value) for name, value in vars(obj).items()}
+
+
+@dataclass(slots=True)
+class MemorySnapshot:
+    """Copies of a coordinator's structures, safe to walk off the loop."""
+
+    structures: dict[str, Any]
+    stale_states: list[MowingDevice]
+    mower_states: int
+
+
+def snapshot_coordinator(coordinator: MammotionDataUpdateCoordinator) -> MemorySnapshot:
+    """Copy what ``measure_snapshot`` sizes; call this on the event loop.
+
+    Only containers are copied, so this costs about as much as a
+    ``cow_copy`` of the mower state, however large the map is.
+    """
+    mower = cow_copy(coordinator.data)
+    capture, monitor = coordinator.capture, coordinator.callback_monitor
+    states = {id(state): state for state in _mower_states(coordinator) if state is not None}
+    return MemorySnapshot(
+        structures={
+            "map": mower.map if mower else None,
+            "report_data": mower.report_data if mower else None,
+            "history": (mower.err_code_list, mower.err_code_list_time) if mower else None,
+            "mower": mower,
+            "restored_store": (
+                _copy_attributes(coordinator.plans),
+                # Data waiting for a delayed save is held by the store itself.
+                cow_copy(getattr(coordinator._plan_store, "_data", None)),  # noqa: SLF001
+            ),
+            "map_renderer": _copy_attributes(coordinator.map_renderer),
+            "debug": (
+                # Records waiting to be written; the rest of a capture is fixed size.
+                bytes(capture._pending) if capture else None,  # noqa: SLF001
+                cow_copy(monitor.timings) if monitor else None,
+            ),
+        },
+        # Copies the transports kept after the coordinator swapped its state.
+        stale_states=[
+            cow_copy(state) for key, state in states.items() if key != id(coordinator.data)
+        ],
+        mower_states=len(states),
+    )
+
+
+def measure_snapshot(snapshot: MemorySnapshot, limit: int = MAX_OBJECTS) -> dict[str, Any]:
+    """Return the approximate retained size of a coordinator's structures.
+
+    Runs in the executor. Structures are measured in order with a shared
+    ``seen`` set, so each byte is attributed to the first structure that
+    reaches it; ``mower`` is what the mower state holds beyond its map and
+    report data. Once ``limit`` objects were walked the rest is not
+    counted and ``complete`` is False.
+    """
+    start = time.perf_counter()
+    seen: set[int] = set()
+    sizes = {
+        name: retained_size(value, seen, limit) for name, value in snapshot.structures.items()
+    }
+    sizes["stale_mower_states"] = sum(
+        retained_size(state, seen, limit) for state in snapshot.stale_states
+    )
+    return {
+        "bytes": sizes,
+        "total_bytes": sum(sizes.values()),
+        "mower_states": snapshot.mower_states,
+        "objects": len(seen),
+        "complete": len(seen) < limit,
+        "ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+
+
+@dataclass(slots=True)
+class MammotionMemoryTracer:
+    """Take tracemalloc snapshots on demand and diff each against the last."""
+
+    snapshot: tracemalloc.Snapshot | None = None
+    taken: datetime | None = None
+    count: int = 0
+    diff: dict[str, Any] | None = None
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    def take(self) -> dict[str, Any] | None:
+        """Take a snapshot, starting tracemalloc first if needed.
+
+        Returns the difference to the previous snapshot, or None when this
+        is the first one.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACE_FRAMES)
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                tracemalloc.Filter(False, "<unknown>"),
+            )
+        )
+        now = dt_util.utcnow()
+        previous, since = self.snapshot, self.taken
+        self.snapshot, self.taken = snapshot, now
+        self.count += 1
+        if previous is None or since is None:
+            return None
+        stats = snapshot.compare_to(previous, "lineno")
+        self.diff = {
+            "from": since,
+            "to": now,
+            "size_diff": sum(stat.size_diff for stat in stats),
+            "count_diff": sum(stat.count_diff for stat in stats),
+            "top": [
+                {
+                    "where": str(stat.traceback),
+                    "size": stat.size,
+                    "size_diff": stat.size_diff,
+                    "count_diff": stat.count_diff,
+                }
+                for stat in stats[:TRACE_LINES]
+            ],
+        }
+        return self.diff
+
+    def stop(self) -> None:
+        """Stop tracing and drop the last snapshot, keeping the last diff."""
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.snapshot = self.taken = None
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return the tracing state and last diff for diagnostics."""
+        return {
+            "tracing": tracemalloc.is_tracing(),
+            "snapshots": self.count,
+            "last_snapshot": self.taken,
+            "diff": self.diff,
+        }
+
+
+@callback
+def async_setup_snapshot_service(hass: HomeAssistant) -> None:
+    """Register the memory snapshot service once for all entries."""
+    if hass.services.has_service(DOMAIN, SERVICE_MEMORY_SNAPSHOT):
+        return
+    tracer = hass.data[DATA_MEMORY_TRACER] = MammotionMemoryTracer()
+
+    async def _async_handle_snapshot(call: ServiceCall) -> ServiceResponse:
+        async with tracer.lock:
+            if call.data["stop"]:
+                await hass.async_add_executor_job(tracer.stop)
+                return {"tracing": False}
+            diff = await hass.async_add_executor_job(tracer.take)
+        if diff is None:
+            LOGGER.info("Started tracing memory allocations, call again to compare")
+            return {"tracing": True}
+        LOGGER.info("Memory changed by %s bytes since the last snapshot", diff["size_diff"])
+        return {"tracing": True, "size_diff": diff["size_diff"], "top": diff["top"]}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_MEMORY_SNAPSHOT,
+        _async_handle_snapshot,
+        schema=MEMORY_SNAPSHOT_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
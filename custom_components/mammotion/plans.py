@@ -0,0 +1,243 @@
+"""Cache of the job plans stored on the mower."""
+
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from typing import Any
+
+import betterproto
+from dateutil.rrule import DAILY, WEEKLY, rrule
+from homeassistant.util import dt as dt_util
+from pymammotion.data.model.device import MowingDevice
+from pymammotion.proto.mctrl_nav import NavPlanJobSet
+
+DEFAULT_PLAN_DURATION = timedelta(hours=1)
+PLAN_SYNC_INTERVAL = timedelta(minutes=30)
+# A sync whose final index never arrives is given up after this long.
+PLAN_SYNC_TIMEOUT = timedelta(minutes=5)
+# Reply fields that change between reads of an unchanged plan.
+PLAN_STATUS_FIELDS = frozenset(
+    {"sub_cmd", "result", "plan_index", "total_plan_num", "remained_seconds"}
+)
+
+
+def raw_plan(mower: MowingDevice) -> dict[str, Any] | None:
+    """Return the last plan reply as the raw dict pymammotion keeps for it."""
+    nav = mower.device.nav
+    if isinstance(nav, dict):
+        return nav.get("todev_planjob_set")
+    if betterproto.serialized_on_wire(nav.todev_planjob_set):
+        return nav.todev_planjob_set.to_dict(casing=betterproto.Casing.SNAKE)
+    return None
+
+
+def _plan_digest(raw: dict[str, Any]) -> str:
+    """Return a digest of the fields that define a plan, including its version."""
+    plan = NavPlanJobSet().from_dict(
+        {key: value for key, value in raw.items() if key not in PLAN_STATUS_FIELDS}
+    )
+    return hashlib.blake2b(bytes(plan), digest_size=8).hexdigest()
+
+
+def _parse_time(value: str) -> time | None:
+    try:
+        return time.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+def _parse_date(value: str) -> date | None:
+    try:
+        return date.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+@dataclass
+class CachedPlan:
+    """A device job plan with its content digest and compiled recurrence."""
+
+    plan_id: str
+    digest: str
+    data: dict[str, Any]
+    _rule: rrule | None = field(default=None, repr=False)
+    _start: datetime | None = field(default=None, repr=False)
+    _compiled: bool = field(default=False, repr=False)
+
+    @property
+    def name(self) -> str:
+        """Return a display name for the plan."""
+        return (
+            self.data.get("task_name")
+            or self.data.get("job_name")
+            or f"Plan {self.plan_id[-4:]}"
+        )
+
+    @property
+    def duration(self) -> timedelta:
+        """Return the length of each run."""
+        start = _parse_time(self.data.get("start_time", ""))
+        end = _parse_time(self.data.get("end_time", ""))
+        if start is not None and end is not None and end != start:
+            anchor = date(2000, 1, 1)
+            delta = datetime.combine(anchor, end) - datetime.combine(anchor, start)
+            return delta if delta > timedelta(0) else delta + timedelta(days=1)
+        if minutes := self.data.get("required_time"):
+            return timedelta(minutes=minutes)
+        return DEFAULT_PLAN_DURATION
+
+    def _compile(self) -> None:
+        """Build the recurrence on first use."""
+        self._compiled = True
+        start_time = _parse_time(self.data.get("start_time", ""))
+        if start_time is None:
+            return
+        start_date = _parse_date(self.data.get("start_date", ""))
+        end_date = _parse_date(self.data.get("end_date", ""))
+        interval_days = self.data.get("day", 0)
+        # ``weeks`` carries ISO weekdays (1 = Monday); older firmware only
+        # sends the ``week`` bitmask with bit 0 for Monday.
+        weekdays = sorted({day - 1 for day in self.data.get("weeks", []) if 1 <= day <= 7})
+        if not weekdays:
+            week = self.data.get("week", 0)
+            weekdays = [day for day in range(7) if week & (1 << day)]
+
+        if start_date is None:
+            if not weekdays and not interval_days:
+                return
+            start_date = dt_util.now().date()
+        self._start = datetime.combine(
+            start_date, start_time, tzinfo=dt_util.get_default_time_zone()
+        )
+        if not weekdays and not interval_days:
+            return
+
+        until = None
+        if end_date is not None:
+            until = datetime.combine(
+                end_date, time.max, tzinfo=dt_util.get_default_time_zone()
+            )
+        if interval_days:
+            self._rule = rrule(DAILY, interval=interval_days, dtstart=self._start, until=until)
+        else:
+            self._rule = rrule(WEEKLY, byweekday=weekdays, dtstart=self._start, until=until)
+
+    def occurrences(self, start: datetime, end: datetime) -> list[tuple[datetime, datetime]]:
+        """Expand only the runs overlapping ``[start, end)``."""
+        if not self._compiled:
+            self._compile()
+        if self._start is None:
+            return []
+        duration = self.duration
+        if self._rule is None:
+            runs = [self._start]
+        else:
+            runs = self._rule.between(start - duration, end, inc=True)
+        return [(run, run + duration) for run in runs if run < end and run + duration > start]
+
+
+class MammotionPlanCache:
+    """Job plans read from the mower, keyed by plan id.
+
+    Plans are read one index at a time, as the mower has no command listing
+    plan ids or versions. Each reply is digested without its status fields
+    (index, count, remaining time) and only plans whose digest changed
+    replace the cached copy, so the compiled recurrences of unchanged plans
+    survive a sync, even when they moved index. Replies are only taken
+    while a sync is running, and a sync that stalls expires after
+    ``PLAN_SYNC_TIMEOUT``. Calendar queries are answered from the cache and
+    never wait on the mower.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty cache."""
+        self.plans: dict[str, CachedPlan] = {}
+        self.version = 0
+        self.last_sync: datetime | None = None
+        self._sync_deadline: datetime | None = None
+        self._seen: set[str] = set()
+        self._last_raw: dict[str, Any] | None = None
+        self._window: tuple[int, datetime, datetime] | None = None
+        self._window_events: list[tuple[datetime, datetime, CachedPlan]] = []
+
+    def sync_due(self, now: datetime) -> bool:
+        """Return True when a full plan sync should be started."""
+        self._expire(now)
+        return self._sync_deadline is None and (
+            self.last_sync is None or now - self.last_sync >= PLAN_SYNC_INTERVAL
+        )
+
+    def begin_sync(self, now: datetime) -> None:
+        """Mark the start of a read starting at plan index 0."""
+        self._expire(now)
+        self._sync_deadline = now + PLAN_SYNC_TIMEOUT
+        self._seen = set()
+        self.last_sync = now
+
+    def _expire(self, now: datetime) -> None:
+        """Give up on a sync that ran past its deadline."""
+        if self._sync_deadline is not None and now >= self._sync_deadline:
+            self._sync_deadline = None
+
+    def handle(self, raw: dict[str, Any] | None) -> int | None:
+        """Feed the latest plan reply and return the next index to read."""
+        if raw is None or raw is self._last_raw:
+            return None
+        self._last_raw = raw
+        if self._sync_deadline is None:
+            return None
+        plan = NavPlanJobSet().from_dict(raw)
+        if plan.plan_id:
+            self._seen.add(plan.plan_id)
+            self._store(plan.plan_id, raw)
+
+        if plan.plan_index + 1 < plan.total_plan_num:
+            return plan.plan_index + 1
+        self._sync_deadline = None
+        for plan_id in set(self.plans) - self._seen:
+            del self.plans[plan_id]
+            self.version += 1
+        return None
+
+    def _store(self, plan_id: str, raw: dict[str, Any]) -> None:
+        digest = _plan_digest(raw)
+        cached = self.plans.get(plan_id)
+        if cached is not None and cached.digest == digest:
+            return
+        self.plans[plan_id] = CachedPlan(plan_id=plan_id, digest=digest, data=dict(raw))
+        self.version += 1
+
+    def events(
+        self, start: datetime, end: datetime
+    ) -> list[tuple[datetime, datetime, CachedPlan]]:
+        """Return plan runs overlapping ``[start, end)``, sorted by start."""
+        if self._window == (self.version, start, end):
+            return self._window_events
+        events = [
+            (run_start, run_end, plan)
+            for plan in self.plans.values()
+            for run_start, run_end in plan.occurrences(start, end)
+        ]
+        events.sort(key=lambda event: event[0])
+        self._window = (self.version, start, end)
+        self._window_events = events
+        return events
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the cache for storage."""
+        return {
+            "plans": [
+                {"plan_id": plan.plan_id, "digest": plan.digest, "data": plan.data}
+                for plan in self.plans.values()
+            ]
+        }
+
+    def restore(self, stored: dict[str, Any] | None) -> None:
+        """Restore plans saved by ``as_dict``."""
+        for item in (stored or {}).get("plans", []):
+            self.plans[item["plan_id"]] = CachedPlan(
+                plan_id=item["plan_id"], digest=item["digest"], data=item["data"]
+            )
+        self.version += 1
@@ -0,0 +1,292 @@
+"""Predict when a job finishes and how long the battery lasts."""
+
+from __future__ import annotations
+
+import math
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+from pymammotion.utility.constant.device_constant import WorkMode
+
+from .error_handling import MammotionErrorHandling
+from .snapshot import MowerSnapshot
+
+if TYPE_CHECKING:
+    from .coordinator import MammotionDataUpdateCoordinator
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 300
+ALPHA = 0.3
+# Battery percent at which the mower heads home and at which it resumes.
+RETURN_BATTERY = 15
+RESUME_BATTERY = 95
+# Reports further apart than this say nothing about the rates in between.
+MAX_REPORT_GAP = 900
+MAX_ZONES = 32
+JOB_STATES = (WorkMode.MODE_WORKING, WorkMode.MODE_RETURNING, WorkMode.MODE_PAUSE)
+
+
+def _smooth(rate: float | None, observed: float) -> float:
+    return observed if rate is None else rate + ALPHA * (observed - rate)
+
+
+class RateEstimator:
+    """Smoothed rate of a value that only moves in whole steps.
+
+    Time is accumulated between steps and each step contributes one
+    observation, so a percentage that ticks up once a minute is not seen as
+    a burst followed by a stall. The first step after a reset only aligns
+    the anchor, as the time before it covers part of a step.
+    """
+
+    __slots__ = ("aligned", "anchor", "elapsed", "rate")
+
+    def __init__(self, rate: float | None = None) -> None:
+        """Initialize the estimator."""
+        self.rate = rate
+        self.anchor: float | None = None
+        self.elapsed = 0.0
+        self.aligned = False
+
+    def observe(self, value: float, elapsed: float) -> float | None:
+        """Add ``elapsed`` active seconds ending at ``value``.
+
+        Return the observed rate when ``value`` completed a step.
+        """
+        if self.anchor is None or value < self.anchor:
+            self.anchor = value
+            self.elapsed = 0.0
+            self.aligned = False
+            return None
+        self.elapsed += elapsed
+        if value == self.anchor or self.elapsed <= 0:
+            return None
+        observed = (value - self.anchor) / self.elapsed
+        self.anchor = value
+        self.elapsed = 0.0
+        if not self.aligned:
+            self.aligned = True
+            return None
+        self.rate = _smooth(self.rate, observed)
+        return observed
+
+    def reset(self) -> None:
+        """Forget the anchor; the next value starts a new measurement."""
+        self.anchor = None
+
+
+@dataclass(frozen=True, slots=True)
+class JobPrediction:
+    """What the predictor expects from the current job and battery."""
+
+    time_left: float | None = None
+    battery_runtime: float | None = None
+    return_at: datetime | None = None
+    finish_at: datetime | None = None
+
+
+def _minutes(seconds: float | None) -> float | None:
+    return None if seconds is None else round(seconds / 60)
+
+
+def _at(now: datetime, seconds: float) -> datetime:
+    """Return ``now`` plus ``seconds`` to the minute, so states do not churn."""
+    return (now + timedelta(seconds=seconds)).replace(second=0, microsecond=0)
+
+
+class JobPredictor:
+    """Online mowing and battery rates for one mower.
+
+    Each report updates three step rate estimators (job progress and battery
+    drain while working, battery gain while charging) and a smoothed area
+    rate for the zone being mowed, all in constant time. The area rates are
+    kept for at most ``MAX_ZONES`` zones, so memory stays bounded however
+    long the mower runs.
+    """
+
+    def __init__(self) -> None:
+        """Initialize with nothing learned."""
+        self.progress = RateEstimator()
+        self.drain = RateEstimator()
+        self.charge = RateEstimator()
+        self.area_rate: float | None = None
+        self.zone_rates: dict[int, float] = {}
+        self.prediction = JobPrediction()
+        self._last_at: float | None = None
+        self._job: tuple[int, int] = (0, 0)
+
+    def update(self, snapshot: MowerSnapshot, now: datetime) -> JobPrediction:
+        """Learn from a report and return the new prediction."""
+        if not snapshot.reported:
+            return self.prediction
+        at = now.timestamp()
+        elapsed = 0.0 if self._last_at is None else at - self._last_at
+        self._last_at = at
+        if not 0 <= elapsed <= MAX_REPORT_GAP:
+            for estimator in (self.progress, self.drain, self.charge):
+                estimator.reset()
+            elapsed = 0.0
+        working = snapshot.reported_sys_status == WorkMode.MODE_WORKING
+        charging = bool(snapshot.charge_state)
+        progress = snapshot.work_area >> 16
+        job_area = snapshot.work_area & 65535
+        # Progress is a percentage of the job, so its rate starts over with
+        # every job; a lower progress or a different area is a new one.
+        if job_area != self._job[0] or progress < self._job[1]:
+            self.progress = RateEstimator()
+        self._job = (job_area, progress)
+        if working:
+            if (rate := self.progress.observe(progress, elapsed)) is not None and job_area:
+                self._learn_area(snapshot.work_zone, rate * job_area / 100)
+            self.drain.observe(-snapshot.battery_val, elapsed)
+        else:
+            self.progress.reset()
+            self.drain.reset()
+        if charging:
+            self.charge.observe(snapshot.battery_val, elapsed)
+        else:
+            self.charge.reset()
+        self.prediction = self._predict(snapshot, now, charging, progress, job_area)
+        return self.prediction
+
+    def _learn_area(self, zone: int, rate: float) -> None:
+        """Smooth the area rate of ``zone``, evicting the least recent zone."""
+        self.area_rate = _smooth(self.area_rate, rate)
+        previous = self.zone_rates.pop(zone, None)
+        if previous is None and len(self.zone_rates) >= MAX_ZONES:
+            del self.zone_rates[next(iter(self.zone_rates))]
+        self.zone_rates[zone] = _smooth(previous, rate)
+
+    def _time_left(self, snapshot: MowerSnapshot, progress: int, job_area: int) -> float | None:
+        """Return the mowing seconds left in the job."""
+        if self.progress.rate:
+            return (100 - progress) / self.progress.rate
+        if job_area and (rate := self.zone_rates.get(snapshot.work_zone) or self.area_rate):
+            return job_area * (100 - progress) / 100 / rate
+        if left := snapshot.work_progress >> 16:
+            return left * 60
+        return None
+
+    def _predict(
+        self,
+        snapshot: MowerSnapshot,
+        now: datetime,
+        charging: bool,
+        progress: int,
+        job_area: int,
+    ) -> JobPrediction:
+        battery = snapshot.battery_val
+        drain = self.drain.rate
+        runtime = max(battery - RETURN_BATTERY, 0) / drain if drain else None
+        if not 0 < progress < 100 or not (
+            charging or snapshot.reported_sys_status in JOB_STATES
+        ):
+            return JobPrediction(battery_runtime=_minutes(runtime))
+        time_left = self._time_left(snapshot, progress, job_area)
+        if time_left is None:
+            return JobPrediction(battery_runtime=_minutes(runtime))
+        charge = self.charge.rate
+        wait = 0.0
+        if charging and battery < RESUME_BATTERY:
+            if not charge:
+                return JobPrediction(_minutes(time_left), _minutes(runtime))
+            wait = (RESUME_BATTERY - battery) / charge
+            battery = RESUME_BATTERY
+        if not drain:
+            return JobPrediction(
+                _minutes(time_left), None, None, _at(now, wait + time_left)
+            )
+        mowing = max(battery - RETURN_BATTERY, 0) / drain
+        if mowing >= time_left:
+            finish = _at(now, wait + time_left)
+            return JobPrediction(_minutes(time_left), _minutes(runtime), finish, finish)
+        return_at = _at(now, wait + mowing)
+        if not charge:
+            return JobPrediction(_minutes(time_left), _minutes(runtime), return_at, None)
+        span = RESUME_BATTERY - RETURN_BATTERY
+        recharges = math.ceil((time_left - mowing) / (span / drain))
+        return JobPrediction(
+            _minutes(time_left),
+            _minutes(runtime),
+            return_at,
+            _at(now, wait + time_left + recharges * span / charge),
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the learned rates for storage."""
+        return {
+            "drain": self.drain.rate,
+            "charge": self.charge.rate,
+            "area": self.area_rate,
+            "zones": [[zone, rate] for zone, rate in self.zone_rates.items()],
+        }
+
+    def restore(self, data: dict[str, Any] | None) -> None:
+        """Load rates saved by ``as_dict``."""
+        if not data:
+            return
+        self.drain.rate = data.get("drain")
+        self.charge.rate = data.get("charge")
+        self.area_rate = data.get("area")
+        self.zone_rates = dict(data.get("zones", [])[-MAX_ZONES:])
+
+
+class MammotionJobPredictions:
+    """Feed coordinator updates into the predictor and keep what it learned."""
+
+    def __init__(self, hass: HomeAssistant, coordinator: MammotionDataUpdateCoordinator) -> None:
+        """Initialize the predictions for one mower."""
+        self.hass = hass
+        self.coordinator = coordinator
+        self.predictor = JobPredictor()
+        self.error_handler = MammotionErrorHandling(hass)
+        self._store: Store[dict[str, Any]] | None = None
+        self._unsub: CALLBACK_TYPE | None = None
+
+    @property
+    def prediction(self) -> JobPrediction:
+        """Return the latest prediction."""
+        return self.predictor.prediction
+
+    async def async_start(self) -> None:
+        """Restore the learned rates and start following the coordinator.
+
+        The listener is added before the platforms are set up, so sensors
+        read a prediction that already includes the update they are for.
+        """
+        try:
+            self._store = Store(
+                self.hass, STORAGE_VERSION, f"{self.coordinator.device_name}_prediction"
+            )
+            self.predictor.restore(await self._store.async_load())
+            self._unsub = self.coordinator.async_add_listener(self._handle_coordinator_update)
+            self._handle_coordinator_update()
+        except Exception as error:
+            self.error_handler.handle_error(error, "async_start")
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop following the coordinator."""
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        self.predictor.update(self.coordinator.snapshot, dt_util.utcnow())
+        if self._store is not None:
+            self._store.async_delay_save(self.predictor.as_dict, SAVE_DELAY)
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return the learned rates for diagnostics."""
+        predictor = self.predictor
+        return {
+            "progress_per_hour": predictor.progress.rate and predictor.progress.rate * 3600,
+            **predictor.as_dict(),
+            "prediction": asdict(predictor.prediction),
+        }
@@ -0,0 +1,290 @@
+"""Profile the integration and time its callbacks.
+
+Nothing here runs unless asked for: the profilers only exist for the length
+of a ``mammotion.profile`` call and the callback monitor is only attached
+to a coordinator while the option is on.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import io
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import voluptuous as vol
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, LOGGER
+
+if TYPE_CHECKING:
+    from .coordinator import MammotionDataUpdateCoordinator
+
+CONF_MONITOR_CALLBACKS = "monitor_callbacks"
+SERVICE_PROFILE = "profile"
+PROFILE_CPROFILE = "cprofile"
+PROFILE_SAMPLER = "sampler"
+DEFAULT_PROFILE_SECONDS = 30
+SAMPLE_INTERVAL = 0.005
+SLOW_CALLBACK_SECONDS = 0.05
+REPORT_LINES = 60
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional("seconds", default=DEFAULT_PROFILE_SECONDS): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=3600)
+        ),
+        vol.Optional("mode", default=PROFILE_CPROFILE): vol.In(
+            [PROFILE_CPROFILE, PROFILE_SAMPLER]
+        ),
+    }
+)
+
+_SCOPE = re.compile(
+    rf"custom_components{re.escape(os.sep)}mammotion|{re.escape(os.sep)}pymammotion{re.escape(os.sep)}"
+)
+
+
+class StackSampler(threading.Thread):
+    """Sample one thread's stack and count the stacks inside the integration."""
+
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL) -> None:
+        """Initialize the sampler."""
+        super().__init__(name="mammotion-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = 0
+        self.stacks: Counter[str] = Counter()
+        self._stop_event = threading.Event()
+        self._in_scope: dict[str, bool] = {}
+
+    def run(self) -> None:
+        """Take samples until stopped."""
+        while not self._stop_event.wait(self.interval):
+            if (frame := sys._current_frames().get(self.thread_id)) is None:  # noqa: SLF001
+                return
+            self.samples += 1
+            names: list[str] = []
+            scoped = False
+            while frame is not None:
+                code = frame.f_code
+                if (in_scope := self._in_scope.get(code.co_filename)) is None:
+                    in_scope = self._in_scope[code.co_filename] = bool(
+                        _SCOPE.search(code.co_filename)
+                    )
+                scoped |= in_scope
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)})")
+                frame = frame.f_back
+            if scoped:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def stop(self) -> None:
+        """Stop sampling."""
+        self._stop_event.set()
+
+    def write(self, path: Path) -> None:
+        """Write the stacks in collapsed form, as flame graph tools read it."""
+        with path.open("w", encoding="utf-8") as file:
+            file.write(f"# samples {self.samples} in scope {self.stacks.total()}\n")
+            for stack, count in self.stacks.most_common():
+                file.write(f"{stack} {count}\n")
+
+
+def _write_cprofile(profiler: cProfile.Profile, path: Path) -> None:
+    """Dump the raw stats and a text report limited to the integration."""
+    profiler.dump_stats(path)
+    report = io.StringIO()
+    stats = pstats.Stats(profiler, stream=report)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(_SCOPE.pattern, REPORT_LINES)
+    path.with_suffix(".txt").write_text(report.getvalue(), encoding="utf-8")
+
+
+async def async_profile(
+    hass: HomeAssistant, seconds: float, mode: str = PROFILE_CPROFILE
+) -> Path:
+    """Profile the event loop for ``seconds`` and write the result to the config dir.
+
+    cProfile traces everything on the loop and keeps the full stats in a
+    ``.prof`` file next to a report restricted to the integration. The
+    sampler only keeps stacks that pass through the integration or
+    pymammotion, at far lower overhead.
+    """
+    name = f"mammotion_{mode}_{dt_util.utcnow():%Y%m%d%H%M%S}"
+    if mode == PROFILE_SAMPLER:
+        sampler = StackSampler(threading.get_ident())
+        sampler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            sampler.stop()
+            await hass.async_add_executor_job(sampler.join)
+        path = Path(hass.config.path(f"{name}.folded"))
+        await hass.async_add_executor_job(sampler.write, path)
+    else:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.disable()
+        path = Path(hass.config.path(f"{name}.prof"))
+        await hass.async_add_executor_job(_write_cprofile, profiler, path)
+    LOGGER.info("Wrote Mammotion profile to %s", path)
+    return path
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the profile service once for all entries."""
+    if hass.services.has_service(DOMAIN, SERVICE_PROFILE):
+        return
+    lock = asyncio.Lock()
+
+    async def _async_handle_profile(call: ServiceCall) -> ServiceResponse:
+        if lock.locked():
+            raise HomeAssistantError(
+                translation_domain=DOMAIN, translation_key="profile_running"
+            )
+        async with lock:
+            path = await async_profile(hass, call.data["seconds"], call.data["mode"])
+        return {"path": str(path)}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        _async_handle_profile,
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+@dataclass(slots=True)
+class CallbackTiming:
+    """Durations seen for one callback."""
+
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    slow: int = 0
+
+
+class MammotionCallbackMonitor:
+    """Time a coordinator's listeners and notification handlers.
+
+    The timed wrappers are installed as instance attributes on attach and
+    removed on detach, so an unmonitored coordinator runs the stock code.
+    """
+
+    def __init__(self, threshold: float = SLOW_CALLBACK_SECONDS) -> None:
+        """Initialize the monitor."""
+        self.threshold = threshold
+        self.timings: dict[str, CallbackTiming] = {}
+        self._coordinator: MammotionDataUpdateCoordinator | None = None
+        self._restore: list[Callable[[], None]] = []
+
+    @callback
+    def observe(self, name: str, duration: float) -> None:
+        """Record one run of a callback and warn when it was slow."""
+        timing = self.timings.get(name)
+        if timing is None:
+            timing = self.timings[name] = CallbackTiming()
+        timing.count += 1
+        timing.total += duration
+        if duration > self.threshold:
+            timing.slow += 1
+            if duration > timing.max:
+                LOGGER.warning(
+                    "%s took %.1f ms, over the %.0f ms threshold",
+                    name,
+                    duration * 1000,
+                    self.threshold * 1000,
+                )
+        timing.max = max(timing.max, duration)
+
+    def attach(self, coordinator: MammotionDataUpdateCoordinator) -> None:
+        """Start timing the coordinator's callbacks."""
+        self.detach()
+        self._coordinator = coordinator
+
+        @callback
+        def _async_update_listeners() -> None:
+            for update_callback, _ in list(coordinator._listeners.values()):  # noqa: SLF001
+                start = time.perf_counter()
+                update_callback()
+                self.observe(_callback_name(update_callback), time.perf_counter() - start)
+
+        coordinator.async_update_listeners = _async_update_listeners
+        self._restore.append(lambda: vars(coordinator).pop("async_update_listeners", None))
+
+        device = coordinator.manager.get_device_by_name(coordinator.device_name)
+        for kind, transport in (("ble", device.ble()), ("cloud", device.cloud())):
+            if transport is None:
+                continue
+            state_manager = transport.state_manager
+            if (handler := state_manager.on_notification_callback) is None:
+                continue
+            state_manager.on_notification_callback = self._timed(
+                f"notification ({kind})", handler
+            )
+            self._restore.append(
+                lambda manager=state_manager, original=handler: setattr(
+                    manager, "on_notification_callback", original
+                )
+            )
+
+    def detach(self) -> None:
+        """Put the original callbacks back."""
+        while self._restore:
+            self._restore.pop()()
+        self._coordinator = None
+
+    def _timed(
+        self, name: str, handler: Callable[[], Awaitable[None]]
+    ) -> Callable[[], Awaitable[None]]:
+        async def _handler() -> None:
+            start = time.perf_counter()
+            try:
+                await handler()
+            finally:
+                self.observe(name, time.perf_counter() - start)
+
+        return _handler
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return the timings, slowest first, for diagnostics."""
+        return {
+            "threshold_ms": self.threshold * 1000,
+            "callbacks": {
+                name: asdict(timing)
+                for name, timing in sorted(
+                    self.timings.items(), key=lambda item: item[1].max, reverse=True
+                )
+            },
+        }
+
+
+def _callback_name(update_callback: Callable[[], None]) -> str:
+    """Name a listener after its entity when it belongs to one."""
+    owner = getattr(update_callback, "__self__", None)
+    if (entity_id := getattr(owner, "entity_id", None)) is not None:
+        return entity_id
+    return getattr(update_callback, "__qualname__", repr(update_callback))
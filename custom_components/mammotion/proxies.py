@@ -0,0 +1,232 @@
+"""Follow the mower's advertisements and pick the proxy to reach it through."""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components import bluetooth
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .const import LOGGER
+
+if TYPE_CHECKING:
+    from bleak.backends.device import BLEDevice
+
+RSSI_ALPHA = 0.4
+REFRESH_INTERVAL = 5.0
+MIGRATE_MARGIN = 6.0
+FAILURE_PENALTY = 20.0
+MIN_ATTEMPTS = 3
+
+
+@dataclass(slots=True)
+class BluetoothSource:
+    """What one scanner has heard of the mower and how connecting through it went."""
+
+    source: str
+    device: BLEDevice | None = None
+    rssi: float | None = None
+    present: bool = False
+    attempts: int = 0
+    successes: int = 0
+    connect_ms: float = 0.0
+    last_connect_ms: float = 0.0
+
+    @property
+    def success_rate(self) -> float | None:
+        """Return the share of connects that succeeded."""
+        return self.successes / self.attempts if self.attempts else None
+
+    @property
+    def score(self) -> float:
+        """Return the smoothed RSSI, lowered for sources that often fail."""
+        if self.rssi is None:
+            return float("-inf")
+        if self.attempts < MIN_ATTEMPTS:
+            return self.rssi
+        return self.rssi - FAILURE_PENALTY * (1 - self.successes / self.attempts)
+
+
+class MammotionProxySelector:
+    """Choose the connectable scanner the mower is heard best by.
+
+    Home Assistant hands out the ``BLEDevice`` of whichever scanner it
+    prefers, which in a large garden with several proxies is often not the
+    closest one. Every connectable scanner's latest advertisement is read
+    whenever the mower advertises, the RSSI is smoothed per source, and the
+    selection only moves to another source when it beats the current one by
+    ``MIGRATE_MARGIN`` so the link does not flap between two proxies.
+
+    The advertisements also drive presence: ``reachable`` is set while the
+    mower is heard and cleared when Home Assistant marks it unavailable, and
+    ``on_device`` is only called when the selected ``BLEDevice`` changes, so
+    nothing has to be looked up on every poll.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the selector."""
+        self.hass = hass
+        self.address: str | None = None
+        self.sources: dict[str, BluetoothSource] = {}
+        self.current: str | None = None
+        self.migrations = 0
+        self.reachable = False
+        self.device_updates = 0
+        self._device: BLEDevice | None = None
+        self._on_device: Callable[[BLEDevice], None] | None = None
+        self._refreshed = 0.0
+        self._unsubs: list[CALLBACK_TYPE] = []
+
+    @callback
+    def async_start(
+        self, address: str, on_device: Callable[[BLEDevice], None] | None = None
+    ) -> None:
+        """Start following advertisements from ``address``."""
+        if self._unsubs:
+            return
+        self.address = address
+        self._on_device = on_device
+        self._unsubs = [
+            bluetooth.async_register_callback(
+                self.hass,
+                self._async_advertisement,
+                bluetooth.BluetoothCallbackMatcher(address=address, connectable=False),
+                bluetooth.BluetoothScanningMode.PASSIVE,
+            ),
+            bluetooth.async_track_unavailable(
+                self.hass, self._async_unavailable, address, connectable=False
+            ),
+        ]
+        self.async_refresh()
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop following advertisements."""
+        for unsub in self._unsubs:
+            unsub()
+        self._unsubs = []
+        self._on_device = None
+
+    @callback
+    def _async_advertisement(
+        self, _service_info: bluetooth.BluetoothServiceInfoBleak, _change: Any
+    ) -> None:
+        """Re-read the per-scanner view, at most every ``REFRESH_INTERVAL``."""
+        if not self.reachable or time.monotonic() - self._refreshed >= REFRESH_INTERVAL:
+            self.async_refresh()
+
+    @callback
+    def _async_unavailable(self, _service_info: bluetooth.BluetoothServiceInfoBleak) -> None:
+        """Note that no scanner has heard the mower for a while."""
+        LOGGER.debug("%s is no longer advertising", self.address)
+        self.reachable = False
+        for source in self.sources.values():
+            source.present = False
+
+    @callback
+    def async_refresh(self) -> None:
+        """Update every source from the scanners and re-run the selection.
+
+        Home Assistant only dispatches the advertisement of the scanner it
+        prefers, so the other scanners are asked for what they last heard.
+        """
+        if self.address is None:
+            return
+        self._refreshed = time.monotonic()
+        seen: set[str] = set()
+        for scanner_device in bluetooth.async_scanner_devices_by_address(
+            self.hass, self.address, connectable=True
+        ):
+            name = scanner_device.scanner.source
+            seen.add(name)
+            if (source := self.sources.get(name)) is None:
+                source = self.sources[name] = BluetoothSource(name)
+            rssi = scanner_device.advertisement.rssi
+            source.rssi = rssi if source.rssi is None else source.rssi + RSSI_ALPHA * (
+                rssi - source.rssi
+            )
+            source.device = scanner_device.ble_device
+            source.present = True
+        for name, source in self.sources.items():
+            if name not in seen:
+                source.present = False
+        self.reachable = bool(seen)
+        self._select()
+        self._publish()
+
+    def _select(self) -> None:
+        candidates = [source for source in self.sources.values() if source.present]
+        if not candidates:
+            return
+        best = max(candidates, key=lambda source: source.score)
+        current = self.sources.get(self.current) if self.current else None
+        if best is current:
+            return
+        if current is not None and current.present and best.score < current.score + MIGRATE_MARGIN:
+            return
+        if current is not None:
+            self.migrations += 1
+            LOGGER.debug(
+                "Moving %s from %s (%.0f dBm) to %s (%.0f dBm)",
+                self.address,
+                current.source,
+                current.rssi or 0,
+                best.source,
+                best.rssi,
+            )
+        self.current = best.source
+
+    def _publish(self) -> None:
+        """Hand the selected ``BLEDevice`` on if it is a different object."""
+        device = self.device()
+        if device is None or device is self._device:
+            return
+        self._device = device
+        self.device_updates += 1
+        if self._on_device is not None:
+            self._on_device(device)
+
+    def device(self) -> BLEDevice | None:
+        """Return the ``BLEDevice`` of the selected source, if any."""
+        if self.current is None:
+            return None
+        return self.sources[self.current].device
+
+    def record_connect(self, success: bool, elapsed_ms: float) -> None:
+        """Account a connect attempt to the selected source."""
+        if self.current is None:
+            return
+        source = self.sources[self.current]
+        source.attempts += 1
+        if success:
+            source.successes += 1
+            source.connect_ms += elapsed_ms
+            source.last_connect_ms = elapsed_ms
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return every source and its connection record for diagnostics."""
+        return {
+            "reachable": self.reachable,
+            "current": self.current,
+            "migrations": self.migrations,
+            "device_updates": self.device_updates,
+            "sources": {
+                name: {
+                    "rssi": round(source.rssi, 1) if source.rssi is not None else None,
+                    "present": source.present,
+                    "attempts": source.attempts,
+                    "success_rate": round(rate, 3)
+                    if (rate := source.success_rate) is not None
+                    else None,
+                    "connect_ms_avg": round(source.connect_ms / source.successes, 1)
+                    if source.successes
+                    else None,
+                    "connect_ms_last": round(source.last_connect_ms, 1),
+                }
+                for name, source in self.sources.items()
+            },
+        }
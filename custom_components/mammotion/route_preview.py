@@ -0,0 +1,301 @@
+"""Preview the coverage route of a job and estimate how long it takes.
+
+The mower plans its own route once ``generate_route_information`` is sent;
+this is a local stand-in for asking what a set of areas and settings will
+cost before committing to them. Each area is covered boustrophedon style:
+parallel stripes ``channel_width`` apart along the ``toward`` heading,
+joined end to end with a turn between each, inside ``border_mode`` laps
+around the edge and ``obstacle_laps`` around each obstacle.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+from homeassistant.core import CALLBACK_TYPE, callback
+from numpy.typing import NDArray
+from pymammotion.data.model.device_config import OperationSettings
+
+from .map_renderer import MapKey, frames_to_points, map_key
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+    from .coordinator import MammotionDataUpdateCoordinator
+
+# Seconds the mower spends turning onto the next stripe.
+TURN_SECONDS = 5.0
+MAX_CACHE = 16
+MAX_PREVIEW_POINTS = 20000
+
+
+@dataclass(frozen=True, slots=True)
+class RouteSettings:
+    """The operation settings that shape the route, usable as a cache key."""
+
+    areas: tuple[int, ...]
+    channel_width: float
+    speed: float
+    toward: float
+    border_laps: int
+    obstacle_laps: int
+
+    @classmethod
+    def from_operation(cls, settings: OperationSettings) -> RouteSettings:
+        """Take the route settings out of ``settings``; widths are in cm."""
+        return cls(
+            areas=tuple(settings.areas),
+            channel_width=settings.channel_width / 100,
+            speed=settings.speed,
+            toward=settings.toward,
+            border_laps=settings.border_mode,
+            obstacle_laps=settings.obstacle_laps,
+        )
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class RouteEstimate:
+    """Length, turns and duration of a planned route and the path itself.
+
+    ``path`` holds the stripe ends in visiting order in the map's local
+    frame, in metres.
+    """
+
+    length: float
+    turns: int
+    duration: float
+    area: float
+    path: NDArray[np.float64]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the estimate without the path, rounded for display."""
+        return {
+            "length": round(self.length, 1),
+            "turns": self.turns,
+            "duration": round(self.duration / 60, 1),
+            "area": round(self.area, 1),
+        }
+
+
+def _edges(polygon: NDArray[np.float64]) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    return polygon, np.roll(polygon, -1, axis=0)
+
+
+def _perimeter(polygon: NDArray[np.float64]) -> float:
+    start, end = _edges(polygon)
+    return float(np.hypot(*(end - start).T).sum())
+
+
+def _shoelace(polygon: NDArray[np.float64]) -> float:
+    x, y = polygon.T
+    return float(abs(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))) / 2)
+
+
+def _inside(points: NDArray[np.float64], polygon: NDArray[np.float64]) -> NDArray[np.bool_]:
+    """Return which ``points`` lie inside ``polygon`` by ray crossing."""
+    start, end = _edges(polygon)
+    x, y = points[:, :1], points[:, 1:]
+    crossing = (start[:, 1] > y) != (end[:, 1] > y)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cross_x = start[:, 0] + (y - start[:, 1]) * (end[:, 0] - start[:, 0]) / (
+            end[:, 1] - start[:, 1]
+        )
+    return (crossing & (x < cross_x)).sum(axis=1) % 2 == 1
+
+
+def _stripes(
+    polygon: NDArray[np.float64],
+    holes: list[NDArray[np.float64]],
+    width: float,
+    inset: float,
+) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """Return the start and end of each stripe in visiting order.
+
+    ``polygon`` is already rotated so the stripes run along x. Every scan
+    line is intersected with every edge at once and the crossings paired
+    even-odd, so holes split stripes without special casing.
+    """
+    empty = np.empty((0, 2))
+    bottom, top = polygon[:, 1].min(), polygon[:, 1].max()
+    lines = np.arange(bottom + inset + width / 2, top - inset, width)
+    if not lines.size:
+        return empty, empty
+    start, end = (np.concatenate(part) for part in zip(*map(_edges, (polygon, *holes))))
+    y = lines[:, None]
+    crossing = (start[:, 1] <= y) != (end[:, 1] <= y)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cross_x = start[:, 0] + (y - start[:, 1]) * (end[:, 0] - start[:, 0]) / (
+            end[:, 1] - start[:, 1]
+        )
+    cross_x = np.sort(np.where(crossing, cross_x, np.inf), axis=1)
+    counts = crossing.sum(axis=1)
+    pairs = int(counts.max()) // 2
+    if not pairs:
+        return empty, empty
+    left = cross_x[:, 0 : 2 * pairs : 2] + inset
+    right = cross_x[:, 1 : 2 * pairs : 2] - inset
+    valid = (2 * np.arange(pairs) + 1 < counts[:, None]) & (right > left)
+    rows = np.broadcast_to(np.arange(lines.size)[:, None], left.shape)[valid]
+    left, right = left[valid], right[valid]
+    y = lines[rows]
+    # Alternate direction line by line, visiting each line's pieces in turn.
+    odd = rows % 2 == 1
+    order = np.lexsort((np.where(odd, -left, left), rows))
+    left, right, y, odd = left[order], right[order], y[order], odd[order]
+    starts = np.column_stack((np.where(odd, right, left), y))
+    ends = np.column_stack((np.where(odd, left, right), y))
+    return starts, ends
+
+
+def plan_route(
+    areas: list[list[Any]], obstacles: list[list[Any]], settings: RouteSettings
+) -> RouteEstimate:
+    """Plan the route over the map frames of ``areas``.
+
+    Runs in the executor. Obstacles are only carved out of an area they lie
+    entirely inside.
+    """
+    width = settings.channel_width
+    angle = math.radians(settings.toward)
+    cos, sin = math.cos(angle), math.sin(angle)
+    # Rotate so the stripes run along x, and back for the preview path.
+    to_stripes = np.array([[cos, -sin], [sin, cos]])
+    from_stripes = to_stripes.T
+    obstacle_shapes = [
+        shape
+        for frames in obstacles
+        if len(shape := np.array(frames_to_points(frames), dtype=np.float64)) >= 3
+    ]
+    length = 0.0
+    turns = 0
+    covered = 0.0
+    paths: list[NDArray[np.float64]] = []
+    for frames in areas:
+        polygon = np.array(frames_to_points(frames), dtype=np.float64)
+        if len(polygon) < 3:
+            continue
+        holes = [shape for shape in obstacle_shapes if _inside(shape, polygon).all()]
+        covered += _shoelace(polygon) - sum(_shoelace(hole) for hole in holes)
+        perimeter = _perimeter(polygon)
+        for lap in range(settings.border_laps):
+            length += max(perimeter - 2 * math.pi * (lap + 0.5) * width, 0.0)
+        for hole in holes:
+            hole_perimeter = _perimeter(hole)
+            for lap in range(settings.obstacle_laps):
+                length += hole_perimeter + 2 * math.pi * (lap + 0.5) * width
+        starts, ends = _stripes(
+            polygon @ to_stripes,
+            [hole @ to_stripes for hole in holes],
+            width,
+            settings.border_laps * width,
+        )
+        if not len(starts):
+            continue
+        length += float(np.abs(ends[:, 0] - starts[:, 0]).sum())
+        length += float(np.hypot(*(starts[1:] - ends[:-1]).T).sum())
+        turns += len(starts) - 1 + settings.border_laps
+        path = np.stack((starts, ends), axis=1).reshape(-1, 2) @ from_stripes
+        if paths:
+            length += float(np.hypot(*(path[0] - paths[-1][-1])))
+            turns += 1
+        paths.append(path)
+    path = np.concatenate(paths) if paths else np.empty((0, 2))
+    if len(path) > MAX_PREVIEW_POINTS:
+        path = path[:: math.ceil(len(path) / MAX_PREVIEW_POINTS)]
+    return RouteEstimate(
+        length=length,
+        turns=turns,
+        duration=length / settings.speed + turns * TURN_SECONDS if settings.speed else 0.0,
+        area=covered,
+        path=path,
+    )
+
+
+class MammotionRoutePlanner:
+    """Plan previews off the event loop and keep the recent ones.
+
+    Estimates are cached by their ``RouteSettings``, which hold the area
+    hashes and every setting the route depends on. The cache is dropped
+    whenever the synced map changes, as the same hashes may then describe
+    different boundaries.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator: MammotionDataUpdateCoordinator) -> None:
+        """Initialize the planner."""
+        self.hass = hass
+        self.coordinator = coordinator
+        self.preview: RouteEstimate | None = None
+        self._preview_listeners: list[CALLBACK_TYPE] = []
+        self._cache: dict[RouteSettings, RouteEstimate] = {}
+        self._map_key: MapKey | None = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.last_plan_ms = 0.0
+
+    async def async_estimate(
+        self, operation_settings: OperationSettings
+    ) -> RouteEstimate | None:
+        """Return the estimate for ``operation_settings`` and show it on the map.
+
+        Return None while no map has been synced yet.
+        """
+        settings = RouteSettings.from_operation(operation_settings)
+        mower = self.coordinator.data
+        if mower is None or (hash_list := mower.map) is None:
+            return None
+        if (key := map_key(hash_list)) != self._map_key:
+            self._cache.clear()
+            self._map_key = key
+        if (estimate := self._cache.pop(settings, None)) is not None:
+            self.cache_hits += 1
+        else:
+            self.cache_misses += 1
+            hashes = settings.areas or tuple(hash_list.area)
+            areas = [
+                list(hash_list.area[hash_id].data)
+                for hash_id in hashes
+                if hash_id in hash_list.area
+            ]
+            obstacles = [list(frame_list.data) for frame_list in hash_list.obstacle.values()]
+            start = time.perf_counter()
+            estimate = await self.hass.async_add_executor_job(
+                plan_route, areas, obstacles, settings
+            )
+            self.last_plan_ms = (time.perf_counter() - start) * 1000
+            while len(self._cache) >= MAX_CACHE:
+                del self._cache[next(iter(self._cache))]
+        self._cache[settings] = estimate
+        if estimate is not self.preview:
+            self.preview = estimate
+            for update_callback in list(self._preview_listeners):
+                update_callback()
+        return estimate
+
+    @callback
+    def async_add_preview_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Call ``update_callback`` when the preview changes; return a remover.
+
+        Only the map needs to know, so this avoids a full coordinator update.
+        """
+        self._preview_listeners.append(update_callback)
+
+        @callback
+        def _remove() -> None:
+            self._preview_listeners.remove(update_callback)
+
+        return _remove
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return cache counters and the current preview for diagnostics."""
+        return {
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cached": len(self._cache),
+            "last_plan_ms": round(self.last_plan_ms, 2),
+            "preview": self.preview.as_dict() if self.preview else None,
+        }
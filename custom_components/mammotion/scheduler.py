@@ -2,97 +2,514 @@
 
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+import heapq
+import itertools
+from collections.abc import Iterator
+from dataclasses import dataclass, field, replace
+from datetime import UTC, datetime, timedelta
 from typing import Any
+from uuid import uuid4
 
-from homeassistant.core import HomeAssistant, callback
+from dateutil.rrule import rrule, rruleset, rrulestr
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.event import async_track_point_in_utc_time
-from homeassistant.util.dt import utcnow
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
 
 from .const import DOMAIN
 from .coordinator import MammotionDataUpdateCoordinator
 from .error_handling import MammotionErrorHandling
+from .interval_tree import IntervalTree
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 5
+
+EVENT_START = "start"
+EVENT_END = "end"
+
+TASK_START_MOWING = "start_mowing"
+TASK_STOP_MOWING = "stop_mowing"
+
+CONFLICT_REJECT = "reject"
+CONFLICT_MERGE = "merge"
+
+# Window assumed for schedules without an end time.
+DEFAULT_WINDOW = timedelta(minutes=1)
+# How far two open-ended recurrences are compared before calling them disjoint.
+CONFLICT_HORIZON = timedelta(days=366)
+END_OF_TIME = datetime.max.replace(tzinfo=UTC)
+
+
+class ScheduleConflictError(HomeAssistantError):
+    """Raised when a schedule overlaps an existing one."""
+
+
+@dataclass
+class MammotionSchedule:
+    """A single, optionally recurring, scheduled task."""
+
+    schedule_id: str
+    task: str
+    start_time: datetime
+    end_time: datetime | None = None
+    recurrence: str | None = None
+    kwargs: dict[str, Any] = field(default_factory=dict)
+    generation: int = 0
+    next_start: datetime | None = None
+    span_end: datetime = field(default=END_OF_TIME, repr=False, compare=False)
+    _rule: rrule | rruleset | None = field(default=None, repr=False, compare=False)
+
+    @property
+    def duration(self) -> timedelta | None:
+        """Return the length of each occurrence."""
+        if self.end_time is None:
+            return None
+        return self.end_time - self.start_time
+
+    @property
+    def window(self) -> timedelta:
+        """Return the time each occurrence occupies for conflict checks."""
+        return self.duration or DEFAULT_WINDOW
+
+    def compile(self) -> None:
+        """Parse the recurrence rule once so occurrences are cheap to compute."""
+        self._rule = None
+        self.span_end = self.start_time + self.window
+        if self.recurrence:
+            # Expand in local time so weekly rules keep their wall-clock time over DST.
+            self._rule = rrulestr(self.recurrence, dtstart=dt_util.as_local(self.start_time))
+            if not _is_finite(self.recurrence):
+                self.span_end = END_OF_TIME
+            elif occurrences := list(self._rule):
+                self.span_end = dt_util.as_utc(occurrences[-1]) + self.window
+
+    def windows(self, start: datetime, end: datetime) -> Iterator[tuple[datetime, datetime]]:
+        """Yield the occurrence windows overlapping ``[start, end)`` in order."""
+        window = self.window
+        if self._rule is None:
+            if self.start_time < end and self.start_time + window > start:
+                yield self.start_time, self.start_time + window
+            return
+        for occurrence in self._rule.xafter(dt_util.as_local(start - window), inc=True):
+            occurrence_start = dt_util.as_utc(occurrence)
+            if occurrence_start >= end:
+                return
+            if occurrence_start + window > start:
+                yield occurrence_start, occurrence_start + window
+
+    def occurrence_after(self, when: datetime, inclusive: bool = False) -> datetime | None:
+        """Return the first occurrence start at or after ``when``."""
+        if self._rule is None:
+            if self.start_time > when or (inclusive and self.start_time == when):
+                return self.start_time
+            return None
+        occurrence = self._rule.after(dt_util.as_local(when), inc=inclusive)
+        return dt_util.as_utc(occurrence) if occurrence else None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON serializable representation."""
+        return {
+            "schedule_id": self.schedule_id,
+            "task": self.task,
+            "start_time": self.start_time.isoformat(),
+            "end_time": self.end_time.isoformat() if self.end_time else None,
+            "rrule": self.recurrence,
+            "kwargs": self.kwargs,
+            "next_start": self.next_start.isoformat() if self.next_start else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> MammotionSchedule:
+        """Restore a schedule from storage."""
+        end_time = data.get("end_time")
+        return cls(
+            schedule_id=data["schedule_id"],
+            task=data["task"],
+            start_time=dt_util.parse_datetime(data["start_time"]),
+            end_time=dt_util.parse_datetime(end_time) if end_time else None,
+            recurrence=data.get("rrule"),
+            kwargs=data.get("kwargs", {}),
+        )
 
 
 class MammotionScheduler:
-    """Class to handle scheduling tasks for the Mammotion mower."""
+    """Class to handle scheduling tasks for the Mammotion mower.
+
+    Pending start and end events live in a min-heap keyed on fire time and
+    only the earliest one has a timer armed. Removing or modifying a schedule
+    bumps its generation, which turns its queued heap entries stale; stale
+    entries are dropped when they reach the top or when the heap is compacted.
+
+    Every schedule's overall span is also kept in an interval tree, so
+    conflict checks and window queries only look at schedules that can
+    actually overlap.
+    """
 
-    def __init__(self, hass: HomeAssistant, coordinator: MammotionDataUpdateCoordinator) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: MammotionDataUpdateCoordinator,
+        conflict_mode: str = CONFLICT_REJECT,
+    ) -> None:
         """Initialize the scheduler."""
         self.hass = hass
         self.coordinator = coordinator
-        self.schedules = []
+        self.conflict_mode = conflict_mode
+        self.schedules: dict[str, MammotionSchedule] = {}
+        self._index = IntervalTree()
         self.error_handler = MammotionErrorHandling(hass)
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}_{coordinator.device_name}_schedules"
+        )
+        self._heap: list[tuple[datetime, int, str, int, str]] = []
+        self._sequence = itertools.count()
+        self._stale = 0
+        self._unsub_timer: CALLBACK_TYPE | None = None
+        self._armed_at: datetime | None = None
 
-    def add_schedule(self, start_time: datetime, end_time: datetime, task: str, **kwargs: Any) -> None:
-        """Add a new schedule."""
+    async def async_load(self) -> None:
+        """Load persisted schedules and arm the timer."""
         try:
-            schedule = {
-                "start_time": start_time,
-                "end_time": end_time,
-                "task": task,
-                "kwargs": kwargs,
-            }
-            self.schedules.append(schedule)
-            self._schedule_task(schedule)
+            stored = await self._store.async_load()
+            for data in (stored or {}).get("schedules", []):
+                schedule = MammotionSchedule.from_dict(data)
+                schedule.compile()
+                self._insert(schedule)
+                self._queue_next(schedule, dt_util.utcnow())
+            self._arm()
         except Exception as error:
-            self.error_handler.handle_error(error, "add_schedule")
+            self.error_handler.handle_error(error, "async_load")
+
+    @callback
+    def async_unload(self) -> None:
+        """Cancel the pending timer."""
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+            self._armed_at = None
+
+    def add_schedule(
+        self,
+        start_time: datetime,
+        end_time: datetime | None,
+        task: str,
+        rrule: str | None = None,
+        **kwargs: Any,
+    ) -> str | None:
+        """Add a new schedule and return its id.
 
-    def remove_schedule(self, schedule_id: int) -> None:
-        """Remove a schedule."""
+        An overlapping schedule is rejected, or in merge mode folded into the
+        existing one when both are one-off runs of the same task.
+        """
         try:
-            if 0 <= schedule_id < len(self.schedules):
-                self.schedules.pop(schedule_id)
+            schedule = MammotionSchedule(
+                schedule_id=uuid4().hex,
+                task=task,
+                start_time=dt_util.as_utc(start_time),
+                end_time=dt_util.as_utc(end_time) if end_time else None,
+                recurrence=rrule,
+                kwargs=kwargs,
+            )
+            schedule.compile()
+            if conflicts := self._find_conflicts(schedule):
+                if self.conflict_mode == CONFLICT_MERGE:
+                    return self._merge(schedule, conflicts)
+                raise ScheduleConflictError(_conflict_message(conflicts))
+            self._insert(schedule)
+            self._queue_next(schedule, dt_util.utcnow())
+            self._arm()
+            self._async_schedule_save()
+            return schedule.schedule_id
         except Exception as error:
-            self.error_handler.handle_error(error, "remove_schedule")
+            self.error_handler.handle_error(error, "add_schedule")
+            return None
 
-    def _schedule_task(self, schedule: dict) -> None:
-        """Schedule a task."""
+    def remove_schedule(self, schedule_id: str) -> bool:
+        """Remove a schedule and cancel its pending events."""
         try:
-            start_time = schedule["start_time"]
-            end_time = schedule["end_time"]
-            task = schedule["task"]
-            kwargs = schedule["kwargs"]
-
-            @callback
-            def start_task(now: datetime) -> None:
-                """Start the scheduled task."""
-                if task == "start_mowing":
-                    self.hass.async_create_task(self.coordinator.async_start_mowing(**kwargs))
-                elif task == "stop_mowing":
-                    self.hass.async_create_task(self.coordinator.async_dock())
-
-            @callback
-            def stop_task(now: datetime) -> None:
-                """Stop the scheduled task."""
-                self.hass.async_create_task(self.coordinator.async_dock())
-
-            async_track_point_in_utc_time(self.hass, start_task, start_time)
-            async_track_point_in_utc_time(self.hass, stop_task, end_time)
+            schedule = self.schedules.pop(schedule_id, None)
+            if schedule is None:
+                return False
+            self._index.remove(schedule.start_time, schedule_id)
+            self._invalidate(schedule)
+            self._arm()
+            self._async_schedule_save()
+            return True
         except Exception as error:
-            self.error_handler.handle_error(error, "_schedule_task")
+            self.error_handler.handle_error(error, "remove_schedule")
+            return False
+
+    def modify_schedule(
+        self,
+        schedule_id: str,
+        start_time: datetime | None = None,
+        end_time: datetime | None = None,
+        task: str | None = None,
+        rrule: str | None = None,
+        **kwargs: Any,
+    ) -> bool:
+        """Modify an existing schedule, replacing its pending events.
 
-    def modify_schedule(self, schedule_id: int, start_time: datetime = None, end_time: datetime = None, task: str = None, **kwargs: Any) -> None:
-        """Modify an existing schedule."""
+        The change is rejected if the new window overlaps another schedule.
+        """
         try:
-            if 0 <= schedule_id < len(self.schedules):
-                schedule = self.schedules[schedule_id]
-                if start_time:
-                    schedule["start_time"] = start_time
-                if end_time:
-                    schedule["end_time"] = end_time
-                if task:
-                    schedule["task"] = task
-                if kwargs:
-                    schedule["kwargs"] = kwargs
-                self._schedule_task(schedule)
+            schedule = self.schedules.get(schedule_id)
+            if schedule is None:
+                return False
+            updated = replace(
+                schedule,
+                start_time=dt_util.as_utc(start_time) if start_time else schedule.start_time,
+                end_time=dt_util.as_utc(end_time) if end_time else schedule.end_time,
+                task=task or schedule.task,
+                recurrence=(rrule or None) if rrule is not None else schedule.recurrence,
+                kwargs=kwargs or schedule.kwargs,
+            )
+            updated.compile()
+            if conflicts := self._find_conflicts(updated, exclude=schedule_id):
+                raise ScheduleConflictError(_conflict_message(conflicts))
+            self._index.remove(schedule.start_time, schedule_id)
+            self._invalidate(schedule)
+            updated.generation = schedule.generation
+            self._insert(updated)
+            self._queue_next(updated, dt_util.utcnow())
+            self._arm()
+            self._async_schedule_save()
+            return True
         except Exception as error:
             self.error_handler.handle_error(error, "modify_schedule")
+            return False
 
-    def get_schedules(self) -> list[dict]:
+    def get_schedules(self) -> list[dict[str, Any]]:
         """Get all schedules."""
         try:
-            return self.schedules
+            return [schedule.as_dict() for schedule in self.schedules.values()]
         except Exception as error:
             self.error_handler.handle_error(error, "get_schedules")
             return []
+
+    def schedules_between(
+        self, start: datetime, end: datetime
+    ) -> list[tuple[datetime, datetime, MammotionSchedule]]:
+        """Return every occurrence window overlapping ``[start, end)``."""
+        try:
+            start, end = dt_util.as_utc(start), dt_util.as_utc(end)
+            windows = [
+                (window_start, window_end, schedule)
+                for *_, schedule_id in self._index.overlap(start, end)
+                for schedule in (self.schedules[schedule_id],)
+                for window_start, window_end in schedule.windows(start, end)
+            ]
+            windows.sort(key=lambda window: window[0])
+            return windows
+        except Exception as error:
+            self.error_handler.handle_error(error, "schedules_between")
+            return []
+
+    @property
+    def pending_events(self) -> int:
+        """Return the number of live events in the heap."""
+        return sum(1 for entry in self._heap if self._is_live(entry))
+
+    def _insert(self, schedule: MammotionSchedule) -> None:
+        self.schedules[schedule.schedule_id] = schedule
+        self._index.insert(schedule.start_time, schedule.span_end, schedule.schedule_id)
+
+    def _find_conflicts(
+        self, candidate: MammotionSchedule, exclude: str | None = None
+    ) -> list[MammotionSchedule]:
+        """Return the schedules with an occurrence overlapping the candidate."""
+        conflicts = []
+        for other_start, other_end, schedule_id in self._index.overlap(
+            candidate.start_time, candidate.span_end
+        ):
+            if schedule_id == exclude:
+                continue
+            other = self.schedules[schedule_id]
+            start = max(candidate.start_time, other_start)
+            end = min(candidate.span_end, other_end)
+            if end == END_OF_TIME:
+                end = start + CONFLICT_HORIZON
+            if _windows_overlap(candidate.windows(start, end), other.windows(start, end)):
+                conflicts.append(other)
+        return conflicts
+
+    def _merge(
+        self, candidate: MammotionSchedule, conflicts: list[MammotionSchedule]
+    ) -> str:
+        """Fold a one-off schedule into the one-off runs it overlaps."""
+        group = [candidate, *conflicts]
+        if any(
+            schedule.recurrence
+            or schedule.end_time is None
+            or schedule.task != candidate.task
+            or schedule.kwargs != candidate.kwargs
+            for schedule in group
+        ):
+            raise ScheduleConflictError(_conflict_message(conflicts))
+
+        target = conflicts[0]
+        merged = replace(
+            target,
+            start_time=min(schedule.start_time for schedule in group),
+            end_time=max(schedule.end_time for schedule in group),
+        )
+        merged.compile()
+        merged_ids = {schedule.schedule_id for schedule in conflicts}
+        if chained := [
+            schedule
+            for schedule in self._find_conflicts(merged)
+            if schedule.schedule_id not in merged_ids
+        ]:
+            raise ScheduleConflictError(_conflict_message(chained))
+
+        for schedule in conflicts:
+            self._index.remove(schedule.start_time, schedule.schedule_id)
+            self._invalidate(schedule)
+            if schedule is not target:
+                del self.schedules[schedule.schedule_id]
+        merged.generation = target.generation
+        self._insert(merged)
+        self._queue_next(merged, dt_util.utcnow())
+        self._arm()
+        self._async_schedule_save()
+        return merged.schedule_id
+
+    def _invalidate(self, schedule: MammotionSchedule) -> None:
+        """Turn the queued events of a schedule stale."""
+        # Rough count, only used to decide when compacting is worth it.
+        if schedule.next_start is not None:
+            self._stale += 2 if schedule.end_time else 1
+        schedule.generation += 1
+        schedule.next_start = None
+        if self._stale > len(self._heap) // 2:
+            self._compact()
+
+    def _compact(self) -> None:
+        """Drop every stale entry from the heap."""
+        self._heap = [entry for entry in self._heap if self._is_live(entry)]
+        heapq.heapify(self._heap)
+        self._stale = 0
+
+    def _is_live(self, entry: tuple[datetime, int, str, int, str]) -> bool:
+        schedule = self.schedules.get(entry[2])
+        return schedule is not None and schedule.generation == entry[3]
+
+    def _push(self, when: datetime, schedule: MammotionSchedule, event: str) -> None:
+        heapq.heappush(
+            self._heap,
+            (when, next(self._sequence), schedule.schedule_id, schedule.generation, event),
+        )
+
+    def _queue_next(
+        self, schedule: MammotionSchedule, after: datetime, inclusive: bool = True
+    ) -> None:
+        """Queue the next occurrence of a schedule."""
+        start = schedule.occurrence_after(after, inclusive)
+        schedule.next_start = start
+        if start is None:
+            return
+        self._push(start, schedule, EVENT_START)
+        if (duration := schedule.duration) is not None:
+            self._push(start + duration, schedule, EVENT_END)
+
+    def _arm(self) -> None:
+        """Keep a single timer armed for the earliest live event."""
+        while self._heap and not self._is_live(self._heap[0]):
+            heapq.heappop(self._heap)
+            self._stale = max(0, self._stale - 1)
+
+        when = self._heap[0][0] if self._heap else None
+        if when == self._armed_at:
+            return
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+        self._armed_at = when
+        if when is not None:
+            self._unsub_timer = async_track_point_in_utc_time(
+                self.hass, self._handle_timer, when
+            )
+
+    @callback
+    def _handle_timer(self, now: datetime) -> None:
+        """Run every event that is due and re-arm for the next one."""
+        self._unsub_timer = None
+        self._armed_at = None
+        try:
+            while self._heap and self._heap[0][0] <= now:
+                entry = heapq.heappop(self._heap)
+                if not self._is_live(entry):
+                    self._stale = max(0, self._stale - 1)
+                    continue
+                schedule = self.schedules[entry[2]]
+                if entry[4] == EVENT_START:
+                    self._run_task(schedule.task, schedule.kwargs)
+                    if schedule.end_time is None:
+                        self._advance(schedule, entry[0])
+                else:
+                    self._run_task(TASK_STOP_MOWING, {})
+                    self._advance(schedule, entry[0] - schedule.duration)
+        except Exception as error:
+            self.error_handler.handle_error(error, "_handle_timer")
+        self._arm()
+
+    def _advance(self, schedule: MammotionSchedule, occurrence: datetime) -> None:
+        """Queue the occurrence after the one that just finished."""
+        schedule.next_start = None
+        if schedule.recurrence:
+            self._queue_next(schedule, occurrence, inclusive=False)
+        self._async_schedule_save()
+
+    def _run_task(self, task: str, kwargs: dict[str, Any]) -> None:
+        """Start the scheduled task on the coordinator."""
+        if task == TASK_START_MOWING:
+            self.hass.async_create_task(self.coordinator.async_start_mowing(**kwargs))
+        elif task == TASK_STOP_MOWING:
+            self.hass.async_create_task(self.coordinator.async_dock())
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        return {"schedules": self.get_schedules()}
+
+
+
+def _is_finite(recurrence: str) -> bool:
+    """Return True when every RRULE in ``recurrence`` ends by UNTIL or COUNT.
+
+    The string may be a bare rule or RRULE, RDATE, EXRULE and EXDATE lines;
+    only the RRULE lines can make the recurrence open-ended.
+    """
+    for line in recurrence.upper().split():
+        name, _, value = line.rpartition(":")
+        if name.split(";")[0] not in ("", "RRULE"):
+            continue
+        if not {part.partition("=")[0] for part in value.split(";")} & {"UNTIL", "COUNT"}:
+            return False
+    return True
+
+
+def _windows_overlap(
+    first: Iterator[tuple[datetime, datetime]],
+    second: Iterator[tuple[datetime, datetime]],
+) -> bool:
+    """Sweep two sorted window streams for any overlap."""
+    a, b = next(first, None), next(second, None)
+    while a is not None and b is not None:
+        if a[0] < b[1] and b[0] < a[1]:
+            return True
+        if a[1] <= b[1]:
+            a = next(first, None)
+        else:
+            b = next(second, None)
+    return False
+
+
+def _conflict_message(conflicts: list[MammotionSchedule]) -> str:
+    return "Schedule overlaps " + ", ".join(
+        f"{schedule.task} at {schedule.start_time.isoformat()}" for schedule in conflicts
+    )
@@ -1,7 +1,9 @@
 """Creates the sensor entities for the mower."""
 
+import time
 from collections.abc import Callable
 from dataclasses import dataclass
+from datetime import datetime
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
@@ -17,11 +19,11 @@ from homeassistant.const import (
     UnitOfSpeed,
     UnitOfTime,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.typing import StateType
 from homeassistant.util.unit_conversion import SpeedConverter
-from pymammotion.data.model.device import MowingDevice
 from pymammotion.data.model.enums import RTKStatus
 from pymammotion.utility.constant.device_constant import PosType, device_mode
 from pymammotion.utility.device_type import DeviceType
@@ -30,6 +32,14 @@ from . import MammotionConfigEntry
 from .coordinator import MammotionDataUpdateCoordinator
 from .entity import MammotionBaseEntity
 from .error_handling import MammotionErrorHandling
+from .filters import (
+    CONF_SENSOR_FILTER_SCALE,
+    DEFAULT_SENSOR_FILTER_SCALE,
+    StateFilter,
+    StateFilterTracker,
+)
+from .prediction import JobPrediction
+from .snapshot import MowerSnapshot
 
 SPEED_UNITS = SpeedConverter.VALID_UNITS
 
@@ -38,16 +48,27 @@ SPEED_UNITS = SpeedConverter.VALID_UNITS
 class MammotionSensorEntityDescription(SensorEntityDescription):
     """Describes Mammotion sensor entity."""
 
-    value_fn: Callable[[MowingDevice], StateType]
+    value_fn: Callable[[MowerSnapshot], StateType]
+    state_filter: StateFilter | None = None
+
+
+@dataclass(frozen=True, kw_only=True)
+class MammotionPredictionSensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor for a job or battery prediction."""
+
+    value_fn: Callable[[JobPrediction], StateType | datetime]
 
 
+RSSI_FILTER = StateFilter(deadband=3, hysteresis=2, min_interval=60)
+SATELLITE_FILTER = StateFilter(deadband=1, hysteresis=1, min_interval=60)
+
 LUBA_SENSOR_ONLY_TYPES: tuple[MammotionSensorEntityDescription, ...] = (
     MammotionSensorEntityDescription(
         key="blade_height",
         state_class=SensorStateClass.MEASUREMENT,
         device_class=SensorDeviceClass.DISTANCE,
         native_unit_of_measurement=UnitOfLength.MILLIMETERS,
-        value_fn=lambda mower_data: mower_data.report_data.work.knife_height,
+        value_fn=lambda snapshot: snapshot.knife_height,
     ),
 )
 
@@ -57,118 +78,118 @@ SENSOR_TYPES: tuple[MammotionSensorEntityDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         device_class=SensorDeviceClass.BATTERY,
         native_unit_of_measurement=PERCENTAGE,
-        value_fn=lambda mower_data: mower_data.report_data.dev.battery_val,
+        value_fn=lambda snapshot: snapshot.battery_val,
     ),
     MammotionSensorEntityDescription(
         key="ble_rssi",
         state_class=SensorStateClass.MEASUREMENT,
         device_class=SensorDeviceClass.SIGNAL_STRENGTH,
         native_unit_of_measurement=SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
-        value_fn=lambda mower_data: mower_data.report_data.connect.ble_rssi,
+        value_fn=lambda snapshot: snapshot.ble_rssi,
+        state_filter=RSSI_FILTER,
     ),
     MammotionSensorEntityDescription(
         key="wifi_rssi",
         state_class=SensorStateClass.MEASUREMENT,
         device_class=SensorDeviceClass.SIGNAL_STRENGTH,
         native_unit_of_measurement=SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
-        value_fn=lambda mower_data: mower_data.report_data.connect.wifi_rssi,
+        value_fn=lambda snapshot: snapshot.wifi_rssi,
+        state_filter=RSSI_FILTER,
     ),
     MammotionSensorEntityDescription(
         key="gps_stars",
         state_class=SensorStateClass.MEASUREMENT,
         device_class=None,
         native_unit_of_measurement=None,
-        value_fn=lambda mower_data: mower_data.report_data.rtk.gps_stars,
+        value_fn=lambda snapshot: snapshot.gps_stars,
+        state_filter=SATELLITE_FILTER,
     ),
     MammotionSensorEntityDescription(
         key="area",
         state_class=SensorStateClass.MEASUREMENT,
         device_class=None,
         native_unit_of_measurement=AREA_SQUARE_METERS,
-        value_fn=lambda mower_data: mower_data.report_data.work.area & 65535,
+        value_fn=lambda snapshot: snapshot.work_area & 65535,
     ),
     MammotionSensorEntityDescription(
         key="mowing_speed",
         state_class=SensorStateClass.MEASUREMENT,
         device_class=SensorDeviceClass.SPEED,
         native_unit_of_measurement=UnitOfSpeed.METERS_PER_SECOND,
-        value_fn=lambda mower_data: mower_data.report_data.work.man_run_speed / 100,
+        value_fn=lambda snapshot: snapshot.man_run_speed / 100,
+        state_filter=StateFilter(deadband=0.05, hysteresis=0.03, min_interval=30),
     ),
     MammotionSensorEntityDescription(
         key="progress",
         state_class=SensorStateClass.MEASUREMENT,
         device_class=None,
         native_unit_of_measurement=PERCENTAGE,
-        value_fn=lambda mower_data: mower_data.report_data.work.area >> 16,
+        value_fn=lambda snapshot: snapshot.work_area >> 16,
     ),
     MammotionSensorEntityDescription(
         key="total_time",
         state_class=SensorStateClass.MEASUREMENT,
         device_class=SensorDeviceClass.DURATION,
         native_unit_of_measurement=UnitOfTime.MINUTES,
-        value_fn=lambda mower_data: mower_data.report_data.work.progress & 65535,
+        value_fn=lambda snapshot: snapshot.work_progress & 65535,
     ),
     MammotionSensorEntityDescription(
         key="elapsed_time",
         state_class=SensorStateClass.MEASUREMENT,
         device_class=SensorDeviceClass.DURATION,
         native_unit_of_measurement=UnitOfTime.MINUTES,
-        value_fn=lambda mower_data: (mower_data.report_data.work.progress & 65535)
-        - (mower_data.report_data.work.progress >> 16),
+        value_fn=lambda snapshot: (snapshot.work_progress & 65535)
+        - (snapshot.work_progress >> 16),
     ),
     MammotionSensorEntityDescription(
         key="left_time",
         state_class=SensorStateClass.MEASUREMENT,
         device_class=SensorDeviceClass.DURATION,
         native_unit_of_measurement=UnitOfTime.MINUTES,
-        value_fn=lambda mower_data: mower_data.report_data.work.progress >> 16,
+        value_fn=lambda snapshot: snapshot.work_progress >> 16,
     ),
     MammotionSensorEntityDescription(
         key="l1_satellites",
         state_class=SensorStateClass.MEASUREMENT,
         device_class=None,
         native_unit_of_measurement=None,
-        value_fn=lambda mower_data: (mower_data.report_data.rtk.co_view_stars >> 0)
-        & 255,
+        value_fn=lambda snapshot: (snapshot.co_view_stars >> 0) & 255,
+        state_filter=SATELLITE_FILTER,
     ),
     MammotionSensorEntityDescription(
         key="l2_satellites",
         state_class=SensorStateClass.MEASUREMENT,
         device_class=None,
         native_unit_of_measurement=None,
-        value_fn=lambda mower_data: (mower_data.report_data.rtk.co_view_stars >> 8)
-        & 255,
+        value_fn=lambda snapshot: (snapshot.co_view_stars >> 8) & 255,
+        state_filter=SATELLITE_FILTER,
     ),
     MammotionSensorEntityDescription(
         key="activity_mode",
         state_class=None,
         device_class=SensorDeviceClass.ENUM,
-        value_fn=lambda mower_data: device_mode(mower_data.report_data.dev.sys_status),
+        value_fn=lambda snapshot: device_mode(snapshot.sys_status),
     ),
     MammotionSensorEntityDescription(
         key="position_mode",
         state_class=None,
         device_class=SensorDeviceClass.ENUM,
         native_unit_of_measurement=None,
-        value_fn=lambda mower_data: str(
-            RTKStatus.from_value(mower_data.report_data.rtk.status)
-        ),  # Note: This will not work for Luba2 & Yuka. Only for Luba1
+        value_fn=lambda snapshot: str(RTKStatus.from_value(snapshot.rtk_status)),  # Note: This will not work for Luba2 & Yuka. Only for Luba1
     ),
     MammotionSensorEntityDescription(
         key="position_type",
         state_class=None,
         device_class=SensorDeviceClass.ENUM,
         native_unit_of_measurement=None,
-        value_fn=lambda mower_data: str(
-            PosType(mower_data.location.position_type).name
-        ),  # Note: This will not work for Luba2 & Yuka. Only for Luba1
+        value_fn=lambda snapshot: str(PosType(snapshot.position_type).name),  # Note: This will not work for Luba2 & Yuka. Only for Luba1
     ),
     MammotionSensorEntityDescription(
         key="work_area",
         state_class=None,
         device_class=SensorDeviceClass.ENUM,
         native_unit_of_measurement=None,
-        value_fn=lambda mower_data: str(mower_data.location.work_zone or "Not working"),
+        value_fn=lambda snapshot: str(snapshot.work_zone or "Not working"),
     ),
     # MammotionSensorEntityDescription(
     #     key="lawn_mower_position",
@@ -190,6 +211,33 @@ SENSOR_TYPES: tuple[MammotionSensorEntityDescription, ...] = (
     # 'real_pos_x': -142511, 'real_pos_y': -20548, 'real_toward': 50915, (robot position)
 )
 
+PREDICTION_SENSOR_TYPES: tuple[MammotionPredictionSensorEntityDescription, ...] = (
+    MammotionPredictionSensorEntityDescription(
+        key="predicted_time_left",
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        value_fn=lambda prediction: prediction.time_left,
+    ),
+    MammotionPredictionSensorEntityDescription(
+        key="battery_runtime",
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        value_fn=lambda prediction: prediction.battery_runtime,
+    ),
+    MammotionPredictionSensorEntityDescription(
+        key="return_to_charge_time",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=lambda prediction: prediction.return_at,
+    ),
+    MammotionPredictionSensorEntityDescription(
+        key="finish_time",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=lambda prediction: prediction.finish_at,
+    ),
+)
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -210,6 +258,10 @@ async def async_setup_entry(
         async_add_entities(
             MammotionSensorEntity(coordinator, description) for description in SENSOR_TYPES
         )
+        async_add_entities(
+            MammotionPredictionSensorEntity(coordinator, description)
+            for description in PREDICTION_SENSOR_TYPES
+        )
     except Exception as error:
         error_handler.handle_error(error, "async_setup_entry")
 
@@ -229,9 +281,75 @@ class MammotionSensorEntity(MammotionBaseEntity, SensorEntity):
         super().__init__(coordinator, description.key)
         self.entity_description = description
         self._attr_translation_key = description.key
+        self._filter: StateFilterTracker | None = None
+        self._written_available: bool | None = None
+        self._cancel_retry: CALLBACK_TYPE | None = None
+        scale = coordinator.config_entry.options.get(
+            CONF_SENSOR_FILTER_SCALE, DEFAULT_SENSOR_FILTER_SCALE
+        )
+        if description.state_filter and (state_filter := description.state_filter.scaled(scale)):
+            self._filter = StateFilterTracker(state_filter)
+            coordinator.sensor_filters[description.key] = self._filter
+
+    async def async_added_to_hass(self) -> None:
+        """Cancel a held back write when the entity is removed."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._cancel_retry_timer)
 
     @property
     def native_value(self) -> StateType:
         """Return the state of the sensor."""
-        current_value = self.entity_description.value_fn(self.coordinator.data)
-        return current_value
+        if self._filter is not None and self._filter.written:
+            return self._filter.value
+        return self.entity_description.value_fn(self.snapshot)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state unless the change is within the sensor's filter."""
+        if self._filter is None:
+            super()._handle_coordinator_update()
+            return
+        now = time.monotonic()
+        accepted = self._filter.accept(self.entity_description.value_fn(self.snapshot), now)
+        available = self.available
+        if accepted or available != self._written_available:
+            self._written_available = available
+            self.async_write_ha_state()
+        elif self._filter.pending and self._cancel_retry is None:
+            self._cancel_retry = async_call_later(
+                self.hass, self._filter.retry_in(now), self._async_retry
+            )
+
+    @callback
+    def _async_retry(self, _now: datetime) -> None:
+        """Try a value ``min_interval`` held back again."""
+        self._cancel_retry = None
+        self._handle_coordinator_update()
+
+    @callback
+    def _cancel_retry_timer(self) -> None:
+        if self._cancel_retry is not None:
+            self._cancel_retry()
+            self._cancel_retry = None
+
+
+class MammotionPredictionSensorEntity(MammotionBaseEntity, SensorEntity):
+    """A sensor for what the mower is expected to do next."""
+
+    entity_description: MammotionPredictionSensorEntityDescription
+    _attr_has_entity_name = True
+
+    def __init__(
+        self,
+        coordinator: MammotionDataUpdateCoordinator,
+        description: MammotionPredictionSensorEntityDescription,
+    ) -> None:
+        """Set up the prediction sensor."""
+        super().__init__(coordinator, description.key)
+        self.entity_description = description
+        self._attr_translation_key = description.key
+
+    @property
+    def native_value(self) -> StateType | datetime:
+        """Return the predicted value."""
+        return self.entity_description.value_fn(self.coordinator.predictions.prediction)
@@ -0,0 +1,145 @@
+"""Serialize mower state without blocking the event loop."""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, fields, is_dataclass
+from typing import Any, TypeVar
+
+import betterproto
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.json import json_bytes
+
+_T = TypeVar("_T")
+_ATOMIC = frozenset({str, int, float, bool, bytes, type(None)})
+
+
+def cow_copy(value: _T) -> _T:
+    """Return a copy of ``value`` that later in-place updates do not reach.
+
+    Containers and plain dataclasses are copied, but protobuf messages are
+    shared: pymammotion replaces them with freshly parsed ones rather than
+    changing them, so only their container fields, which it does update in
+    place, are copied one level deep. The copy is therefore proportional to
+    the number of containers and messages, not to the points in the map.
+    """
+    if type(value) in _ATOMIC:
+        return value
+    if isinstance(value, betterproto.Message):
+        message = object.__new__(type(value))
+        state = vars(message)
+        for name, attribute in vars(value).items():
+            if isinstance(attribute, dict):
+                attribute = dict(attribute)
+            elif isinstance(attribute, list):
+                attribute = list(attribute)
+            state[name] = attribute
+        return message
+    if isinstance(value, dict):
+        return {key: cow_copy(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [cow_copy(item) for item in value]
+    if isinstance(value, tuple | set | frozenset):
+        return type(value)(cow_copy(item) for item in value)
+    if is_dataclass(value) and not isinstance(value, type):
+        shell = object.__new__(type(value))
+        state = vars(shell)
+        state.update(vars(value))
+        for field in fields(value):
+            state[field.name] = cow_copy(state[field.name])
+        return shell
+    return value
+
+
+@dataclass(slots=True)
+class SerializationTiming:
+    """Time spent on one kind of serialization."""
+
+    calls: int = 0
+    loop_ms: float = 0.0
+    executor_ms: float = 0.0
+    last_loop_ms: float = 0.0
+    last_executor_ms: float = 0.0
+    max_loop_ms: float = 0.0
+
+
+class MammotionSerializer:
+    """Convert mower state to dicts and JSON in the executor.
+
+    Only ``cow_copy`` runs on the event loop; the conversion runs on the
+    copy in the executor. Every call is timed per ``name`` so the time the
+    loop spends can be checked in diagnostics.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the serializer."""
+        self.hass = hass
+        self.timings: dict[str, SerializationTiming] = {}
+
+    def snapshot(self, value: _T, name: str) -> _T:
+        """Copy ``value`` on the loop, recording the time under ``name``."""
+        start = time.perf_counter()
+        copied = cow_copy(value)
+        elapsed = (time.perf_counter() - start) * 1000
+        timing = self._timing(name)
+        timing.calls += 1
+        timing.loop_ms += elapsed
+        timing.last_loop_ms = elapsed
+        timing.max_loop_ms = max(timing.max_loop_ms, elapsed)
+        return copied
+
+    async def async_run(
+        self, value: Any, func: Callable[[Any], _T], name: str, copy: bool = True
+    ) -> _T:
+        """Run ``func`` on a snapshot of ``value`` in the executor.
+
+        Pass ``copy=False`` for values nothing else holds on to.
+        """
+        if copy:
+            value = self.snapshot(value, name)
+        else:
+            self._timing(name).calls += 1
+        return await self.hass.async_add_executor_job(self._timed, func, value, name)
+
+    async def async_as_dict(self, value: Any, name: str) -> dict[str, Any]:
+        """Return ``asdict(value)`` computed in the executor."""
+        return await self.async_run(value, asdict, name)
+
+    async def async_json(self, value: Any, name: str) -> bytes:
+        """Return ``value`` as JSON bytes computed in the executor."""
+        return await self.async_run(value, _json_bytes, name)
+
+    def _timing(self, name: str) -> SerializationTiming:
+        if (timing := self.timings.get(name)) is None:
+            timing = self.timings[name] = SerializationTiming()
+        return timing
+
+    def _timed(self, func: Callable[[Any], _T], value: Any, name: str) -> _T:
+        start = time.perf_counter()
+        try:
+            return func(value)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            timing = self.timings[name]
+            timing.executor_ms += elapsed
+            timing.last_executor_ms = elapsed
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return the timings for diagnostics."""
+        return {
+            name: {
+                "calls": timing.calls,
+                "loop_ms_avg": round(timing.loop_ms / timing.calls, 3),
+                "loop_ms_max": round(timing.max_loop_ms, 3),
+                "loop_ms_last": round(timing.last_loop_ms, 3),
+                "executor_ms_avg": round(timing.executor_ms / timing.calls, 3),
+                "executor_ms_last": round(timing.last_executor_ms, 3),
+            }
+            for name, timing in self.timings.items()
+        }
+
+
+def _json_bytes(value: Any) -> bytes:
+    return json_bytes(asdict(value) if is_dataclass(value) else value)
@@ -0,0 +1,107 @@
+"""Compact, immutable view of the mower state the entities read."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+
+from pymammotion.data.model.device import MowingDevice
+from pymammotion.proto import has_field
+
+from .coordinates import MammotionCoordinateService, Pose, mower_pose
+
+
+def _live_status(mower: MowingDevice) -> tuple[bool, int, int]:
+    """Return whether a live status was reported, its sys status and charge state.
+
+    pymammotion keeps the raw sys message as a snake_case dict and
+    ``MowingDevice.sys`` rebuilds the whole message from it on every access,
+    so the status is read straight from the dict when possible.
+    """
+    raw = mower.device.sys if mower.device else None
+    if not isinstance(raw, dict):
+        live = mower.sys.toapp_report_data.dev
+        return has_field(live), live.sys_status, live.charge_state
+    dev = (raw.get("toapp_report_data") or {}).get("dev") or {}
+    return bool(dev), dev.get("sys_status", 0), dev.get("charge_state", 0)
+
+
+@dataclass(frozen=True, slots=True)
+class MowerSnapshot:
+    """The fields the platforms consume, copied out of a ``MowingDevice``.
+
+    A new snapshot is built for every coordinator update and carries an
+    increasing ``version``. The ``reported_*`` fields and ``charge_state``
+    come from the last live report and are only meaningful when
+    ``reported`` is set; the rest come from the restorable report data.
+    """
+
+    version: int
+    reported: bool
+    reported_sys_status: int
+    charge_state: int
+    sys_status: int
+    battery_val: int
+    knife_height: int
+    ble_rssi: int
+    wifi_rssi: int
+    gps_stars: int
+    co_view_stars: int
+    rtk_status: int
+    work_area: int
+    work_progress: int
+    man_run_speed: int
+    position_type: int
+    work_zone: int
+    orientation: float
+    device_latitude: float
+    device_longitude: float
+    pose: Pose | None
+    position: tuple[float, float] | None
+
+    @classmethod
+    def from_mower(
+        cls,
+        mower: MowingDevice,
+        version: int,
+        coordinates: MammotionCoordinateService | None = None,
+    ) -> MowerSnapshot:
+        """Copy the consumed fields out of ``mower``."""
+        reported, reported_sys_status, charge_state = _live_status(mower)
+        report = mower.report_data
+        location = mower.location
+        pose = mower_pose(mower)
+        return cls(
+            version=version,
+            reported=reported,
+            reported_sys_status=reported_sys_status,
+            charge_state=charge_state,
+            sys_status=report.dev.sys_status,
+            battery_val=report.dev.battery_val,
+            knife_height=report.work.knife_height,
+            ble_rssi=report.connect.ble_rssi,
+            wifi_rssi=report.connect.wifi_rssi,
+            gps_stars=report.rtk.gps_stars,
+            co_view_stars=report.rtk.co_view_stars,
+            rtk_status=report.rtk.status,
+            work_area=report.work.area,
+            work_progress=report.work.progress,
+            man_run_speed=report.work.man_run_speed,
+            position_type=location.position_type,
+            work_zone=location.work_zone,
+            orientation=location.orientation,
+            device_latitude=location.device.latitude,
+            device_longitude=location.device.longitude,
+            pose=pose,
+            position=coordinates.pose_to_geodetic(pose) if coordinates else None,
+        )
+
+    def changed(self, previous: MowerSnapshot | None) -> frozenset[str]:
+        """Return the names of the fields that differ from ``previous``."""
+        if previous is None:
+            return _FIELDS
+        return frozenset(
+            name for name in _FIELDS if getattr(self, name) != getattr(previous, name)
+        )
+
+
+_FIELDS = frozenset(field.name for field in fields(MowerSnapshot) if field.name != "version")
@@ -0,0 +1,286 @@
+"""Import hourly mowing and battery totals into long-term statistics."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    get_last_statistics,
+)
+from homeassistant.const import AREA_SQUARE_METERS, PERCENTAGE, UnitOfTime
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+from homeassistant.util import slugify
+from pymammotion.utility.constant.device_constant import WorkMode
+
+from .const import DOMAIN
+from .error_handling import MammotionErrorHandling
+from .snapshot import MowerSnapshot
+
+if TYPE_CHECKING:
+    from .coordinator import MammotionDataUpdateCoordinator
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 60
+ROLL_INTERVAL = timedelta(minutes=5)
+# Time between two reports longer than this is not counted as mowing time.
+MAX_SAMPLE_GAP = 600
+# Hours kept for import while the recorder is not running, about a year.
+MAX_PENDING_HOURS = 24 * 366
+
+
+@dataclass(frozen=True, slots=True)
+class WorkStatistic:
+    """One hourly total imported as a long-term statistic."""
+
+    key: str
+    name: str
+    unit: str | None
+
+
+MOWED_AREA = "mowed_area"
+MOWING_TIME = "mowing_time"
+BATTERY_USED = "battery_used"
+CHARGE_CYCLES = "charge_cycles"
+
+WORK_STATISTICS = (
+    WorkStatistic(MOWED_AREA, "Mowed area", AREA_SQUARE_METERS),
+    WorkStatistic(MOWING_TIME, "Mowing time", UnitOfTime.HOURS),
+    WorkStatistic(BATTERY_USED, "Battery used", PERCENTAGE),
+    WorkStatistic(CHARGE_CYCLES, "Charge cycles", None),
+)
+
+
+@dataclass(slots=True)
+class WorkSample:
+    """What the previous report said, to take differences against."""
+
+    at: float
+    working: bool
+    job_area: int
+    mowed: float
+    battery: int
+
+
+def _hour(when: datetime) -> datetime:
+    return when.replace(minute=0, second=0, microsecond=0)
+
+
+class WorkAccumulator:
+    """Running totals for the current hour and everything before it.
+
+    ``update`` adds the difference between consecutive reports to the open
+    hour. When the hour changes it is closed: its totals are added to the
+    running sums and it is queued in ``pending`` with those sums, ready to
+    be imported. Everything round trips through ``as_dict`` so a restart
+    picks up in the middle of an hour.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty totals."""
+        self.hour: datetime | None = None
+        self.totals: dict[str, float] = {}
+        self.sums: dict[str, float] = {}
+        self.pending: list[dict[str, Any]] = []
+        self.last: WorkSample | None = None
+
+    def update(self, snapshot: MowerSnapshot, now: datetime) -> None:
+        """Add what changed since the previous report to the open hour."""
+        if not snapshot.reported:
+            return
+        self.roll(now)
+        job_area = snapshot.work_area & 65535
+        mowed = job_area * (snapshot.work_area >> 16) / 100
+        sample = WorkSample(
+            at=now.timestamp(),
+            working=snapshot.reported_sys_status == WorkMode.MODE_WORKING,
+            job_area=job_area,
+            mowed=mowed,
+            battery=snapshot.battery_val,
+        )
+        if (last := self.last) is not None:
+            elapsed = sample.at - last.at
+            if sample.working and last.working and 0 < elapsed <= MAX_SAMPLE_GAP:
+                self._add(MOWING_TIME, elapsed / 3600)
+            # A lower progress or a different job area is a new job.
+            if job_area == last.job_area and mowed > last.mowed:
+                self._add(MOWED_AREA, mowed - last.mowed)
+            if sample.battery < last.battery and not snapshot.charge_state:
+                self._add(BATTERY_USED, last.battery - sample.battery)
+            elif sample.battery > last.battery:
+                self._add(CHARGE_CYCLES, (sample.battery - last.battery) / 100)
+        self.last = sample
+
+    def roll(self, now: datetime) -> None:
+        """Close the open hour if ``now`` is in a later one."""
+        hour = _hour(now)
+        if self.hour is None:
+            self.hour = hour
+            return
+        if hour <= self.hour:
+            return
+        if self.totals:
+            for key, value in self.totals.items():
+                self.sums[key] = self.sums.get(key, 0.0) + value
+            self.pending.append(
+                {
+                    "start": self.hour.isoformat(),
+                    "totals": self.totals,
+                    "sums": {key: self.sums[key] for key in self.totals},
+                }
+            )
+            del self.pending[:-MAX_PENDING_HOURS]
+            self.totals = {}
+        self.hour = hour
+
+    def _add(self, key: str, value: float) -> None:
+        self.totals[key] = self.totals.get(key, 0.0) + value
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the totals for storage."""
+        last = self.last
+        return {
+            "hour": self.hour.isoformat() if self.hour else None,
+            "totals": self.totals,
+            "sums": self.sums,
+            "pending": self.pending,
+            "last": None
+            if last is None
+            else [last.at, last.working, last.job_area, last.mowed, last.battery],
+        }
+
+    def restore(self, data: dict[str, Any]) -> None:
+        """Load totals saved by ``as_dict``."""
+        self.hour = dt_util.parse_datetime(data["hour"]) if data.get("hour") else None
+        self.totals = dict(data.get("totals", {}))
+        self.sums = dict(data.get("sums", {}))
+        self.pending = list(data.get("pending", []))
+        self.last = WorkSample(*data["last"]) if data.get("last") else None
+
+
+class MammotionWorkStatistics:
+    """Feed coordinator updates into the accumulator and import closed hours.
+
+    Closed hours are imported with ``async_add_external_statistics``, one
+    row per hour that had any work, so a year of history is a few thousand
+    rows instead of every raw area and progress state change. The recorder
+    replaces rows with the same start, so importing an hour twice is
+    harmless; hours are only dropped from storage once they were queued.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator: MammotionDataUpdateCoordinator) -> None:
+        """Initialize the statistics for one mower."""
+        self.hass = hass
+        self.coordinator = coordinator
+        self.accumulator = WorkAccumulator()
+        self.imported_hours = 0
+        self.error_handler = MammotionErrorHandling(hass)
+        self._store: Store[dict[str, Any]] | None = None
+        self._unsubs: list[CALLBACK_TYPE] = []
+        self.metadata: dict[str, StatisticMetaData] = {}
+
+    async def async_start(self) -> None:
+        """Restore the totals and start following the coordinator."""
+        device_name = self.coordinator.device_name
+        try:
+            slug = slugify(device_name)
+            self.metadata = {
+                statistic.key: StatisticMetaData(
+                    has_mean=False,
+                    has_sum=True,
+                    name=f"{device_name} {statistic.name}",
+                    source=DOMAIN,
+                    statistic_id=f"{DOMAIN}:{slug}_{statistic.key}",
+                    unit_of_measurement=statistic.unit,
+                )
+                for statistic in WORK_STATISTICS
+            }
+            self._store = Store(self.hass, STORAGE_VERSION, f"{device_name}_statistics")
+            if (data := await self._store.async_load()) is not None:
+                self.accumulator.restore(data)
+            else:
+                await self._async_restore_sums()
+            self._unsubs = [
+                self.coordinator.async_add_listener(self._handle_coordinator_update),
+                async_track_time_interval(self.hass, self._async_roll, ROLL_INTERVAL),
+            ]
+            self._async_import()
+        except Exception as error:
+            self.error_handler.handle_error(error, "async_start")
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop following the coordinator and save the open hour."""
+        for unsub in self._unsubs:
+            unsub()
+        self._unsubs = []
+        self._async_save()
+
+    async def _async_restore_sums(self) -> None:
+        """Continue the sums already in the recorder when there is no storage."""
+        if "recorder" not in self.hass.config.components:
+            return
+        for key, metadata in self.metadata.items():
+            last = await get_instance(self.hass).async_add_executor_job(
+                get_last_statistics, self.hass, 1, metadata["statistic_id"], False, {"sum"}
+            )
+            if rows := last.get(metadata["statistic_id"]):
+                self.accumulator.sums[key] = rows[0].get("sum") or 0.0
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Add the latest report to the open hour."""
+        self.accumulator.update(self.coordinator.snapshot, dt_util.utcnow())
+        self._async_import()
+        self._async_save()
+
+    @callback
+    def _async_roll(self, now: datetime) -> None:
+        """Close the hour even when the mower has gone quiet."""
+        self.accumulator.roll(now)
+        self._async_import()
+
+    @callback
+    def _async_import(self) -> None:
+        """Queue the closed hours with the recorder."""
+        pending = self.accumulator.pending
+        if not pending or "recorder" not in self.hass.config.components:
+            return
+        for key, metadata in self.metadata.items():
+            rows = [
+                StatisticData(
+                    start=dt_util.parse_datetime(hour["start"]),
+                    state=hour["totals"][key],
+                    sum=hour["sums"][key],
+                )
+                for hour in pending
+                if key in hour["totals"]
+            ]
+            if rows:
+                async_add_external_statistics(self.hass, metadata, rows)
+        self.imported_hours += len(pending)
+        pending.clear()
+        self._async_save()
+
+    @callback
+    def _async_save(self) -> None:
+        if self._store is not None:
+            self._store.async_delay_save(self.accumulator.as_dict, SAVE_DELAY)
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return the totals for diagnostics."""
+        return {
+            "hour": self.accumulator.hour.isoformat() if self.accumulator.hour else None,
+            "open_hour": dict(self.accumulator.totals),
+            "sums": dict(self.accumulator.sums),
+            "pending_hours": len(self.accumulator.pending),
+            "imported_hours": self.imported_hours,
+        }
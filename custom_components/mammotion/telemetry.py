@@ -0,0 +1,156 @@
+"""Push compact live telemetry to websocket subscribers."""
+
+from __future__ import annotations
+
+import math
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import partial
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .snapshot import MowerSnapshot
+
+DEFAULT_INTERVAL = 1.0
+MIN_INTERVAL = 0.2
+MAX_INTERVAL = 60.0
+
+
+def telemetry_frame(snapshot: MowerSnapshot) -> dict[str, Any]:
+    """Return the live fields of ``snapshot``, rounded so noise is not a change."""
+    frame: dict[str, Any] = {
+        "battery": snapshot.battery_val,
+        "status": snapshot.reported_sys_status if snapshot.reported else snapshot.sys_status,
+        "progress": snapshot.work_area >> 16,
+        "left_time": snapshot.work_progress >> 16,
+        "heading": snapshot.orientation,
+    }
+    if (pose := snapshot.pose) is not None:
+        frame["x"] = round(pose[0], 2)
+        frame["y"] = round(pose[1], 2)
+        frame["heading"] = round(math.degrees(pose[2]), 1)
+    if (position := snapshot.position) is not None:
+        frame["lat"] = round(position[0], 7)
+        frame["lon"] = round(position[1], 7)
+    return frame
+
+
+@dataclass(slots=True)
+class TelemetrySubscriber:
+    """One websocket subscription and what it has been sent so far."""
+
+    send: Callable[[dict[str, Any]], None]
+    interval: float
+    sent: dict[str, Any] = field(default_factory=dict)
+    pending: dict[str, Any] = field(default_factory=dict)
+    sent_at: float = 0.0
+    messages: int = 0
+    coalesced: int = 0
+    cancel_flush: CALLBACK_TYPE | None = None
+
+
+class MammotionTelemetryHub:
+    """Fan live telemetry out to subscribers without touching entity state.
+
+    Each update is reduced to the fields that differ from what a subscriber
+    was last sent. A subscriber gets at most one message per ``interval``;
+    updates arriving in between are merged into a single pending delta, so
+    a slow or rate-limited subscriber holds at most one message's worth of
+    state no matter how fast the mower reports.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the hub."""
+        self.hass = hass
+        self.subscribers: dict[int, TelemetrySubscriber] = {}
+        self._next_id = 0
+
+    @callback
+    def async_subscribe(
+        self,
+        send: Callable[[dict[str, Any]], None],
+        snapshot: MowerSnapshot,
+        interval: float = DEFAULT_INTERVAL,
+    ) -> CALLBACK_TYPE:
+        """Send the full frame, then deltas at most every ``interval`` seconds."""
+        subscriber = TelemetrySubscriber(send, min(max(interval, MIN_INTERVAL), MAX_INTERVAL))
+        subscriber_id = self._next_id
+        self._next_id += 1
+        self.subscribers[subscriber_id] = subscriber
+        subscriber.pending = telemetry_frame(snapshot)
+        self._flush(subscriber)
+
+        @callback
+        def _unsubscribe() -> None:
+            if (removed := self.subscribers.pop(subscriber_id, None)) and removed.cancel_flush:
+                removed.cancel_flush()
+
+        return _unsubscribe
+
+    @callback
+    def async_publish(self, snapshot: MowerSnapshot) -> None:
+        """Queue what changed in ``snapshot`` for every subscriber."""
+        if not self.subscribers:
+            return
+        frame = telemetry_frame(snapshot)
+        now = time.monotonic()
+        for subscriber in self.subscribers.values():
+            known = subscriber.sent
+            delta = {
+                key: value
+                for key, value in frame.items()
+                if key in subscriber.pending or known.get(key) != value
+            }
+            if not delta:
+                continue
+            if subscriber.pending:
+                subscriber.coalesced += 1
+            subscriber.pending = delta
+            if subscriber.cancel_flush is not None:
+                continue
+            if (wait := subscriber.sent_at + subscriber.interval - now) > 0:
+                subscriber.cancel_flush = async_call_later(
+                    self.hass, wait, partial(self._async_flush_later, subscriber)
+                )
+            else:
+                self._flush(subscriber)
+
+    @callback
+    def _async_flush_later(self, subscriber: TelemetrySubscriber, _now: datetime) -> None:
+        """Flush from the rate limit timer, on the event loop."""
+        self._flush(subscriber)
+
+    @callback
+    def _flush(self, subscriber: TelemetrySubscriber) -> None:
+        """Send the pending delta, dropping keys that changed back since."""
+        subscriber.cancel_flush = None
+        delta = {
+            key: value
+            for key, value in subscriber.pending.items()
+            if subscriber.sent.get(key) != value
+        }
+        subscriber.pending = {}
+        if not delta:
+            return
+        subscriber.sent.update(delta)
+        subscriber.sent_at = time.monotonic()
+        subscriber.messages += 1
+        subscriber.send(delta)
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return per-subscriber counters for diagnostics."""
+        return {
+            "subscribers": [
+                {
+                    "interval": subscriber.interval,
+                    "messages": subscriber.messages,
+                    "coalesced": subscriber.coalesced,
+                }
+                for subscriber in self.subscribers.values()
+            ]
+        }
@@ -0,0 +1,29 @@
+"""Firmware update entity for the mower."""
+
+from __future__ import annotations
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from . import MammotionConfigEntry
+from .coordinator import MammotionDataUpdateCoordinator
+from .error_handling import MammotionErrorHandling
+from .firmware import MammotionFirmwareUpdateCoordinator, MammotionFirmwareUpdateEntity
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: MammotionConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the Mammotion firmware update entity."""
+    coordinator: MammotionDataUpdateCoordinator = entry.runtime_data
+    error_handler = MammotionErrorHandling(hass)
+
+    try:
+        firmware_coordinator = MammotionFirmwareUpdateCoordinator(hass, coordinator)
+        async_add_entities(
+            [MammotionFirmwareUpdateEntity(coordinator, firmware_coordinator)]
+        )
+    except Exception as error:
+        error_handler.handle_error(error, "async_setup_entry")
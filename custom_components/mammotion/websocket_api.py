@@ -0,0 +1,107 @@
+"""Websocket commands for live dashboards: driving and telemetry."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+import voluptuous as vol
+from homeassistant.components import websocket_api
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN
+from .telemetry import DEFAULT_INTERVAL, MAX_INTERVAL, MIN_INTERVAL
+
+if TYPE_CHECKING:
+    from .coordinator import MammotionDataUpdateCoordinator
+
+DATA_WEBSOCKET = f"{DOMAIN}_websocket"
+AXIS = vol.All(vol.Coerce(float), vol.Range(min=-1, max=1))
+
+
+@callback
+def async_setup_websocket(hass: HomeAssistant) -> None:
+    """Register the websocket commands once for all entries."""
+    if hass.data.get(DATA_WEBSOCKET):
+        return
+    hass.data[DATA_WEBSOCKET] = True
+    websocket_api.async_register_command(hass, websocket_drive)
+    websocket_api.async_register_command(hass, websocket_drive_stop)
+    websocket_api.async_register_command(hass, websocket_subscribe_telemetry)
+
+
+def _coordinator(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]
+) -> MammotionDataUpdateCoordinator | None:
+    """Return the coordinator of the entry in ``msg`` or send an error."""
+    entry = hass.config_entries.async_get_entry(msg["entry_id"])
+    if entry is None or entry.domain != DOMAIN or entry.state is not ConfigEntryState.LOADED:
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, "Mower not found")
+        return None
+    return entry.runtime_data
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "mammotion/drive",
+        vol.Required("entry_id"): str,
+        vol.Required("linear"): AXIS,
+        vol.Required("angular"): AXIS,
+    }
+)
+@websocket_api.require_admin
+@callback
+def websocket_drive(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]
+) -> None:
+    """Set the joystick position; the mower stops when these stop arriving."""
+    if (coordinator := _coordinator(hass, connection, msg)) is None:
+        return
+    coordinator.manual_drive.async_setpoint(msg["linear"], msg["angular"])
+    connection.send_result(msg["id"])
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "mammotion/drive_stop",
+        vol.Required("entry_id"): str,
+    }
+)
+@websocket_api.require_admin
+@websocket_api.async_response
+async def websocket_drive_stop(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]
+) -> None:
+    """Stop the mower and end the drive session."""
+    if (coordinator := _coordinator(hass, connection, msg)) is None:
+        return
+    await coordinator.manual_drive.async_stop()
+    connection.send_result(msg["id"])
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "mammotion/subscribe_telemetry",
+        vol.Required("entry_id"): str,
+        vol.Optional("interval", default=DEFAULT_INTERVAL): vol.All(
+            vol.Coerce(float), vol.Range(min=MIN_INTERVAL, max=MAX_INTERVAL)
+        ),
+    }
+)
+@callback
+def websocket_subscribe_telemetry(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]
+) -> None:
+    """Stream position, heading, progress and battery as they change."""
+    if (coordinator := _coordinator(hass, connection, msg)) is None:
+        return
+    msg_id = msg["id"]
+    connection.send_result(msg_id)
+
+    @callback
+    def _send(delta: dict[str, Any]) -> None:
+        connection.send_message(websocket_api.event_message(msg_id, delta))
+
+    connection.subscriptions[msg_id] = coordinator.telemetry.async_subscribe(
+        _send, coordinator.snapshot, msg["interval"]
+    )
@@ -0,0 +1,176 @@
+"""Fixtures and baseline handling for the benchmark suite.
+
+Benchmarks are skipped by default, so a plain ``pytest tests`` stays quick,
+and they are not collected at all when pytest-benchmark is not installed.
+Run them on their own with::
+
+    pytest tests/benchmarks --benchmark-only
+
+Compare the current tree against the checked-in baseline::
+
+    pytest tests/benchmarks --benchmark-baseline=compare
+
+Any benchmark whose fastest round is more than ``--benchmark-threshold`` slower than
+the baseline fails the run. After an intentional change record a new
+baseline, on the same machine the old one came from where possible::
+
+    pytest tests/benchmarks --benchmark-baseline=update
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterator
+from importlib.util import find_spec
+from pathlib import Path
+
+import pytest
+from homeassistant import config_entries
+from homeassistant.core import HomeAssistant
+from pymammotion.data.model.device import MowingDevice
+from pymammotion.mammotion.devices.mammotion import MammotionMixedDeviceManager
+
+from custom_components.mammotion.const import CONF_DEVICE_NAME, DOMAIN
+from custom_components.mammotion.coordinator import MammotionDataUpdateCoordinator
+from simulator import (
+    ReportRates,
+    SimulatedMower,
+    SimulatedPlan,
+    async_ble_device_manager,
+    register,
+)
+
+BASELINE_DIR = Path(__file__).parent / "baseline"
+BASELINE_NAME = "baseline"
+DEFAULT_THRESHOLD = "min:25%"
+
+if find_spec("pytest_benchmark") is None:
+    collect_ignore_glob = ["test_*.py"]
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Add the baseline options."""
+    group = parser.getgroup("benchmark")
+    group.addoption(
+        "--benchmark-baseline",
+        choices=("compare", "update"),
+        help="compare against or overwrite the checked-in baseline",
+    )
+    group.addoption(
+        "--benchmark-threshold",
+        default=DEFAULT_THRESHOLD,
+        help="slowdown that fails a comparison. Default: %(default)r.",
+    )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config: pytest.Config) -> None:
+    """Point pytest-benchmark at the baseline before its session starts."""
+    if (mode := config.getoption("benchmark_baseline", None)) is None:
+        return
+    from pytest_benchmark.utils import parse_compare_fail
+
+    config.option.benchmark_storage = f"file://{BASELINE_DIR}"
+    if mode == "update":
+        for stale in BASELINE_DIR.glob(f"*/*_{BASELINE_NAME}.json"):
+            stale.unlink()
+        config.option.benchmark_save = BASELINE_NAME
+    else:
+        config.option.benchmark_compare = True
+        config.option.benchmark_compare_fail = [
+            parse_compare_fail(config.getoption("benchmark_threshold"))
+        ]
+
+
+def pytest_collection_modifyitems(
+    config: pytest.Config, items: list[pytest.Item]
+) -> None:
+    """Skip the benchmarks unless they were asked for."""
+    if config.getoption("benchmark_only", False) or config.getoption(
+        "benchmark_baseline", None
+    ):
+        return
+    skip = pytest.mark.skip(
+        reason="benchmarks run with --benchmark-only or --benchmark-baseline"
+    )
+    here = Path(__file__).parent
+    for item in items:
+        if item.path.is_relative_to(here):
+            item.add_marker(skip)
+
+
+async def _settle() -> None:
+    for _ in range(50):
+        await asyncio.sleep(0)
+
+
+async def _async_mowing_device(mower: SimulatedMower) -> MammotionMixedDeviceManager:
+    """Sync maps and plans, then report from the middle of a job."""
+    device = await async_ble_device_manager(mower)
+    ble = device.ble()
+    await ble.start_map_sync()
+    await _settle()
+    await ble.command("read_plan", sub_cmd=2, plan_index=0)
+    await ble.command("get_device_base_info")
+    await ble.command("start_job")
+    mower.step(900)
+    await ble.command("get_report_cfg")
+    await _settle()
+    return device
+
+
+@pytest.fixture(scope="session")
+def mower_device() -> MammotionMixedDeviceManager:
+    """Return a device manager holding the state of a mower mid job."""
+    mower = SimulatedMower(
+        name="Luba-BENCH01",
+        rates=ReportRates(0, 0, 0, 0),
+        areas=6,
+        frames_per_area=4,
+    )
+    mower.plans = [SimulatedPlan(f"p{index}", f"Zone {index}") for index in range(3)]
+    return asyncio.run(_async_mowing_device(mower))
+
+
+@pytest.fixture(scope="session")
+def mowing_device(mower_device: MammotionMixedDeviceManager) -> MowingDevice:
+    """Return a realistic ``MowingDevice``."""
+    return mower_device.mower_state
+
+
+@pytest.fixture
+def hass(tmp_path: Path) -> Iterator[HomeAssistant]:
+    """Return a Home Assistant instance whose loop benchmarks drive directly."""
+
+    async def _async_create() -> HomeAssistant:
+        return HomeAssistant(str(tmp_path))
+
+    loop = asyncio.new_event_loop()
+    instance = loop.run_until_complete(_async_create())
+    yield instance
+    loop.run_until_complete(instance.async_stop(force=True))
+    loop.close()
+
+
+@pytest.fixture
+def coordinator(
+    hass: HomeAssistant, mower_device: MammotionMixedDeviceManager
+) -> MammotionDataUpdateCoordinator:
+    """Return a coordinator wired to the simulated mower's state."""
+    entry = config_entries.ConfigEntry(
+        data={CONF_DEVICE_NAME: mower_device.name},
+        domain=DOMAIN,
+        minor_version=1,
+        options={},
+        source=config_entries.SOURCE_USER,
+        title=mower_device.name,
+        unique_id=mower_device.name,
+        version=1,
+    )
+    config_entries.current_entry.set(entry)
+    instance = MammotionDataUpdateCoordinator(hass, entry)
+    instance.device_name = mower_device.name
+    instance.manager = register(mower_device)
+    instance.data = mower_device.mower_state
+    entry.runtime_data = instance
+    return instance
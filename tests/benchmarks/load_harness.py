@@ -0,0 +1,349 @@
+"""Load test many Mammotion coordinators against simulated mowers.
+
+Every scenario runs N ``MammotionDataUpdateCoordinator`` instances with
+their sensor entities on a single event loop. The simulated mowers are
+mowing, so they push location, status and work reports at the configured
+rates while the coordinators poll on their own schedule. The harness
+records event loop lag, coordinator updates, entity state writes, CPU time
+and RSS and prints one JSON document. ``state_writes`` counts every
+``async_write_ha_state`` call, while ``state_changes`` only counts the
+writes Home Assistant turned into a state changed event, since writes that
+change nothing are dropped before they reach the bus.
+
+Run from the repository root::
+
+    python tests/benchmarks/load_harness.py --mowers 10 50 200 --duration 60
+
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import timedelta
+from importlib.metadata import version
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path[:0] = [str(ROOT), str(ROOT / "tests")]
+
+from homeassistant import config_entries  # noqa: E402
+from homeassistant.const import EVENT_STATE_CHANGED  # noqa: E402
+from homeassistant.core import Event, HomeAssistant, callback  # noqa: E402
+from homeassistant.helpers import device_registry as dr  # noqa: E402
+from homeassistant.helpers import entity_registry as er  # noqa: E402
+from homeassistant.helpers.entity import Entity  # noqa: E402
+from homeassistant.helpers.entity_platform import EntityPlatform  # noqa: E402
+
+from custom_components.mammotion.const import CONF_DEVICE_NAME, DOMAIN  # noqa: E402
+from custom_components.mammotion.coordinator import (  # noqa: E402
+    MammotionDataUpdateCoordinator,
+)
+from custom_components.mammotion.sensor import (  # noqa: E402
+    LUBA_SENSOR_ONLY_TYPES,
+    SENSOR_TYPES,
+    MammotionSensorEntity,
+)
+from simulator import (  # noqa: E402
+    FakeMqttBroker,
+    ReportRates,
+    SimulatedMower,
+    async_ble_device_manager,
+    cloud_device_manager,
+    register,
+)
+
+LAG_INTERVAL = 0.05
+PAGE_SIZE = resource.getpagesize()
+
+
+@dataclass
+class LoadConfig:
+    """Parameters shared by every scenario."""
+
+    duration: float = 30.0
+    warmup: float = 5.0
+    transport: str = "ble"
+    poll_interval: float = 10.0
+    latency: float = 0.005
+    time_scale: float = 1.0
+    rates: ReportRates = field(default_factory=lambda: ReportRates(1.0, 1.0, 0.2, 0.0))
+
+
+class LoopLagMonitor:
+    """Measure how late the event loop wakes a sleeping task."""
+
+    def __init__(self, interval: float = LAG_INTERVAL) -> None:
+        """Initialize the monitor."""
+        self.interval = interval
+        self.samples: list[float] = []
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Start sampling."""
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop sampling."""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - expected))
+
+    def summary(self) -> dict[str, float]:
+        """Return lag percentiles in milliseconds."""
+        if len(self.samples) < 2:
+            return {}
+        cuts = statistics.quantiles(self.samples, n=100, method="inclusive")
+        return {
+            "p50": round(cuts[49] * 1000, 3),
+            "p95": round(cuts[94] * 1000, 3),
+            "p99": round(cuts[98] * 1000, 3),
+            "max": round(max(self.samples) * 1000, 3),
+            "samples": len(self.samples),
+        }
+
+
+def _rss_mib() -> float:
+    """Return the current resident set size."""
+    try:
+        pages = int(Path("/proc/self/statm").read_text().split()[1])
+    except OSError:
+        return _peak_rss_mib()
+    return round(pages * PAGE_SIZE / 2**20, 1)
+
+
+def _peak_rss_mib() -> float:
+    """Return the peak resident set size (KiB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+
+async def _async_coordinator(
+    hass: HomeAssistant,
+    mower: SimulatedMower,
+    config: LoadConfig,
+    broker: FakeMqttBroker | None,
+) -> MammotionDataUpdateCoordinator:
+    """Create a coordinator wired to a simulated mower, skipping cloud login."""
+    entry = config_entries.ConfigEntry(
+        data={CONF_DEVICE_NAME: mower.name},
+        domain=DOMAIN,
+        minor_version=1,
+        options={},
+        source=config_entries.SOURCE_USER,
+        title=mower.name,
+        unique_id=mower.name,
+        version=1,
+    )
+    config_entries.current_entry.set(entry)
+    coordinator = MammotionDataUpdateCoordinator(hass, entry)
+    coordinator.update_interval = timedelta(seconds=config.poll_interval)
+    coordinator.device_name = mower.name
+
+    if broker is None:
+        device = await async_ble_device_manager(mower, config.latency)
+        transport = device.ble()
+    else:
+        device = cloud_device_manager(mower, broker)
+        transport = device.cloud()
+    coordinator.manager = register(device)
+    transport.set_notification_callback(coordinator._async_update_notification)
+    await coordinator.async_restore_data()
+    entry.runtime_data = coordinator
+    return coordinator
+
+
+async def async_run_scenario(mowers: int, config: LoadConfig) -> dict[str, Any]:
+    """Run one scenario and return its measurements."""
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        await dr.async_load(hass)
+        await er.async_load(hass)
+        broker = FakeMqttBroker(config.latency) if config.transport == "mqtt" else None
+
+        sims = [
+            SimulatedMower(
+                name=f"Luba-LOAD{index:04d}",
+                iot_id=f"load-{index:04d}",
+                rates=config.rates,
+                time_scale=config.time_scale,
+            )
+            for index in range(mowers)
+        ]
+        coordinators = [
+            await _async_coordinator(hass, mower, config, broker) for mower in sims
+        ]
+        if broker is not None:
+            broker.connect_async()
+
+        entities_per_coordinator = 0
+        for coordinator in coordinators:
+            entity_platform = EntityPlatform(
+                hass=hass,
+                logger=logging.getLogger(__name__),
+                domain="sensor",
+                platform_name=DOMAIN,
+                platform=None,
+                scan_interval=timedelta(seconds=30),
+                entity_namespace=None,
+            )
+            entities = [
+                MammotionSensorEntity(coordinator, description)
+                for description in (*LUBA_SENSOR_ONLY_TYPES, *SENSOR_TYPES)
+            ]
+            entities_per_coordinator = len(entities)
+            await entity_platform.async_add_entities(entities)
+
+        updates = state_writes = state_changes = 0
+        write_ha_state = Entity.async_write_ha_state
+
+        @callback
+        def _count_update() -> None:
+            nonlocal updates
+            updates += 1
+
+        @callback
+        def _count_state_write(entity: Entity) -> None:
+            nonlocal state_writes
+            state_writes += 1
+            write_ha_state(entity)
+
+        @callback
+        def _count_state_change(_event: Event) -> None:
+            nonlocal state_changes
+            state_changes += 1
+
+        for coordinator in coordinators:
+            coordinator.async_add_listener(_count_update)
+        hass.bus.async_listen(EVENT_STATE_CHANGED, _count_state_change)
+        write_patch = patch.object(Entity, "async_write_ha_state", _count_state_write)
+        write_patch.start()
+
+        sim_tasks = [hass.loop.create_task(mower.async_run()) for mower in sims]
+        for coordinator in coordinators:
+            await coordinator.async_start_mowing()
+            await coordinator.async_refresh()
+
+        await asyncio.sleep(config.warmup)
+        updates = state_writes = state_changes = 0
+        sent_before = sum(mower.sent for mower in sims)
+        monitor = LoopLagMonitor()
+        monitor.start()
+        cpu_before = time.process_time()
+        wall_before = time.monotonic()
+
+        await asyncio.sleep(config.duration)
+
+        wall = time.monotonic() - wall_before
+        cpu = time.process_time() - cpu_before
+        await monitor.stop()
+        write_patch.stop()
+        sent = sum(mower.sent for mower in sims) - sent_before
+        result = {
+            "mowers": mowers,
+            "transport": config.transport,
+            "entities": entities_per_coordinator * mowers,
+            "duration_s": round(wall, 3),
+            "device_messages": sent,
+            "coordinator_updates": updates,
+            "coordinator_updates_per_s": round(updates / wall, 2),
+            "state_writes": state_writes,
+            "state_writes_per_s": round(state_writes / wall, 2),
+            "state_changes": state_changes,
+            "state_changes_per_s": round(state_changes / wall, 2),
+            "update_failures": sum(c.update_failures for c in coordinators),
+            "loop_lag_ms": monitor.summary(),
+            "cpu_s": round(cpu, 3),
+            "cpu_percent": round(cpu * 100 / wall, 1),
+            "rss_mib": _rss_mib(),
+            "peak_rss_mib": _peak_rss_mib(),
+        }
+
+        for task in sim_tasks:
+            task.cancel()
+        await asyncio.gather(*sim_tasks, return_exceptions=True)
+        for coordinator in coordinators:
+            await coordinator.async_shutdown()
+        await hass.async_stop(force=True)
+        return result
+
+
+async def async_main(counts: list[int], config: LoadConfig) -> dict[str, Any]:
+    """Run every scenario in turn."""
+    scenarios = [await async_run_scenario(count, config) for count in counts]
+    return {
+        "config": {**asdict(config), "rates": asdict(config.rates)},
+        "environment": {
+            "python": platform.python_version(),
+            "homeassistant": version("homeassistant"),
+            "pymammotion": version("pymammotion"),
+            "machine": platform.machine(),
+        },
+        "scenarios": scenarios,
+    }
+
+
+def main() -> None:
+    """Parse arguments, run the scenarios and emit JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mowers", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--duration", type=float, default=LoadConfig.duration)
+    parser.add_argument("--warmup", type=float, default=LoadConfig.warmup)
+    parser.add_argument("--transport", choices=("ble", "mqtt"), default="ble")
+    parser.add_argument("--poll-interval", type=float, default=LoadConfig.poll_interval)
+    parser.add_argument("--latency", type=float, default=LoadConfig.latency)
+    parser.add_argument(
+        "--time-scale",
+        type=float,
+        default=LoadConfig.time_scale,
+        help="simulated seconds per wall second",
+    )
+    parser.add_argument(
+        "--rates",
+        type=float,
+        nargs=4,
+        metavar=("DEV_STATUS", "LOCATION", "WORK", "MAP_SYNC"),
+        help="report rates in Hz",
+    )
+    parser.add_argument("--output", type=Path, help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    config = LoadConfig(
+        duration=args.duration,
+        warmup=args.warmup,
+        transport=args.transport,
+        poll_interval=args.poll_interval,
+        latency=args.latency,
+        time_scale=args.time_scale,
+    )
+    if args.rates:
+        config.rates = ReportRates(*args.rates)
+
+    logging.basicConfig(level=logging.WARNING)
+    result = json.dumps(asyncio.run(async_main(args.mowers, config)), indent=2)
+    if args.output:
+        args.output.write_text(result + "\n")
+    else:
+        sys.stdout.write(result + "\n")
+
+
+if __name__ == "__main__":
+    main()
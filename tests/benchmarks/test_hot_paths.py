@@ -0,0 +1,184 @@
+"""Micro benchmarks for the integration's hot paths.
+
+Each benchmark runs against state produced by the simulated mower, so the
+numbers reflect the object graphs a real coordinator holds.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from homeassistant.core import HomeAssistant
+from pymammotion.data.model.device import MowingDevice
+from pymammotion.data.model.hash_list import AreaHashNameList, HashList
+
+from custom_components.mammotion.coordinator import MammotionDataUpdateCoordinator
+from custom_components.mammotion.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+from custom_components.mammotion.serialization import cow_copy
+from custom_components.mammotion.snapshot import MowerSnapshot
+from custom_components.mammotion.sensor import (
+    LUBA_SENSOR_ONLY_TYPES,
+    SENSOR_TYPES,
+    MammotionSensorEntity,
+)
+from custom_components.mammotion.switch import (
+    MammotionConfigAreaSwitchEntity,
+    async_setup_entry as async_setup_switch_entry,
+)
+
+
+def _with_areas(mower: MowingDevice, count: int) -> MowingDevice:
+    """Return a copy of ``mower`` whose map holds ``count`` named areas."""
+    frames = next(iter(mower.map.area.values()))
+    area_map = HashList(
+        area={1000 + index: frames for index in range(count)},
+        hashlist=[1000 + index for index in range(count)],
+        area_name=[
+            AreaHashNameList(name=f"Area {index}", hash=1000 + index)
+            for index in range(count)
+        ],
+    )
+    return dataclasses.replace(mower, map=area_map)
+
+
+def test_sensor_values(benchmark, coordinator: MammotionDataUpdateCoordinator) -> None:
+    """Read every sensor's native value."""
+    entities = [
+        MammotionSensorEntity(coordinator, description)
+        for description in (*LUBA_SENSOR_ONLY_TYPES, *SENSOR_TYPES)
+    ]
+
+    values = benchmark(lambda: [entity.native_value for entity in entities])
+
+    assert values[1] == coordinator.data.report_data.dev.battery_val
+
+
+def test_build_snapshot(
+    benchmark, coordinator: MammotionDataUpdateCoordinator
+) -> None:
+    """Copy the entity-facing fields out of the device state."""
+    snapshot = benchmark(
+        MowerSnapshot.from_mower, coordinator.data, 1, coordinator.coordinates
+    )
+
+    assert snapshot.battery_val == coordinator.data.report_data.dev.battery_val
+
+
+def test_device_info(benchmark, coordinator: MammotionDataUpdateCoordinator) -> None:
+    """Build the device info of an entity."""
+    entity = MammotionSensorEntity(coordinator, SENSOR_TYPES[0])
+
+    info = benchmark(lambda: entity.device_info)
+
+    assert info["name"] == coordinator.device_name
+
+
+@pytest.mark.parametrize("count", [10, 100, 1000])
+def test_area_listener_adds_areas(
+    benchmark,
+    hass: HomeAssistant,
+    coordinator: MammotionDataUpdateCoordinator,
+    mowing_device: MowingDevice,
+    count: int,
+) -> None:
+    """Run the switch area listener when every area is new."""
+    populated = _with_areas(mowing_device, count)
+    empty = dataclasses.replace(mowing_device, map=HashList())
+    added: list = []
+
+    def _setup() -> tuple:
+        listeners: list = []
+        coordinator.data = empty
+        with patch.object(coordinator, "async_add_listener", listeners.append):
+            hass.loop.run_until_complete(
+                async_setup_switch_entry(hass, coordinator.config_entry, added.extend)
+            )
+        coordinator.data = populated
+        added.clear()
+        return (listeners[0],), {}
+
+    benchmark.pedantic(lambda listener: listener(), setup=_setup, rounds=20)
+
+    areas = [e for e in added if isinstance(e, MammotionConfigAreaSwitchEntity)]
+    assert len(areas) == count
+
+
+@pytest.mark.parametrize("count", [10, 100, 1000])
+def test_area_listener_steady_state(
+    benchmark,
+    hass: HomeAssistant,
+    coordinator: MammotionDataUpdateCoordinator,
+    mowing_device: MowingDevice,
+    count: int,
+) -> None:
+    """Run the switch area listener on an update that adds nothing."""
+    coordinator.data = _with_areas(mowing_device, count)
+    listeners: list = []
+    added: list = []
+    with patch.object(coordinator, "async_add_listener", listeners.append):
+        hass.loop.run_until_complete(
+            async_setup_switch_entry(hass, coordinator.config_entry, added.extend)
+        )
+    added.clear()
+
+    benchmark(listeners[0])
+
+    assert not added
+
+
+def test_save_data(
+    benchmark, hass: HomeAssistant, coordinator: MammotionDataUpdateCoordinator
+) -> None:
+    """Serialize the device state and write it to the store."""
+    benchmark(
+        lambda: hass.loop.run_until_complete(coordinator.async_save_data(coordinator.data))
+    )
+
+    assert Path(hass.config.path(".storage", coordinator.device_name)).exists()
+
+
+def test_copy_for_serialization(
+    benchmark, coordinator: MammotionDataUpdateCoordinator
+) -> None:
+    """Take the copy that serialization runs on, the only part left on the loop."""
+    copied = benchmark(cow_copy, coordinator.data)
+
+    assert copied.map.area.keys() == coordinator.data.map.area.keys()
+
+
+def test_restore_data(
+    benchmark,
+    hass: HomeAssistant,
+    coordinator: MammotionDataUpdateCoordinator,
+    mowing_device: MowingDevice,
+) -> None:
+    """Load the store and rebuild the device state."""
+    hass.loop.run_until_complete(coordinator.async_save_data(mowing_device))
+    device = coordinator.manager.get_device_by_name(coordinator.device_name)
+    try:
+        benchmark(lambda: hass.loop.run_until_complete(coordinator.async_restore_data()))
+        restored = coordinator.data
+    finally:
+        device.mower_state = mowing_device
+
+    assert restored is not mowing_device
+    # JSON turns the integer area hashes into string keys.
+    assert set(restored.map.area) == {str(key) for key in mowing_device.map.area}
+
+
+def test_diagnostics(
+    benchmark, hass: HomeAssistant, coordinator: MammotionDataUpdateCoordinator
+) -> None:
+    """Build the config entry diagnostics."""
+    result = benchmark(
+        lambda: hass.loop.run_until_complete(
+            async_get_config_entry_diagnostics(hass, coordinator.config_entry)
+        )
+    )
+
+    assert set(result) >= {"config_entry", "device", "map"}
@@ -0,0 +1,36 @@
+"""Simulated Mammotion mowers for tests and benchmarks.
+
+A ``SimulatedMower`` answers the protobuf commands pymammotion sends and
+pushes ``LubaMsg`` reports. It is reached either through ``FakeBleakClient``
+(Blufi frames, as over GATT) or ``FakeMqttBroker`` (thing events, as from
+the Aliyun cloud), so the real pymammotion device classes and state manager
+run unchanged on top. ``MammotionFirmwareTransfer`` streams firmware
+images to fake devices in the firmware tests.
+"""
+
+from .ble import FakeBleakClient, async_attach_ble, ble_device
+from .device import async_ble_device_manager, cloud_device_manager, register
+from .firmware import (
+    FirmwareTransferError,
+    FirmwareTransport,
+    MammotionFirmwareTransfer,
+)
+from .mower import ReportRates, SimulatedArea, SimulatedMower, SimulatedPlan
+from .mqtt import FakeMqttBroker
+
+__all__ = [
+    "FakeBleakClient",
+    "FakeMqttBroker",
+    "FirmwareTransferError",
+    "FirmwareTransport",
+    "MammotionFirmwareTransfer",
+    "ReportRates",
+    "SimulatedArea",
+    "SimulatedMower",
+    "SimulatedPlan",
+    "async_attach_ble",
+    "async_ble_device_manager",
+    "ble_device",
+    "cloud_device_manager",
+    "register",
+]
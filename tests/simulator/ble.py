@@ -0,0 +1,144 @@
+"""Fake bleak client carrying LubaMsg frames to a simulated mower."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from typing import Any
+
+from bleak.backends.device import BLEDevice
+from pymammotion.bluetooth import BleMessage
+from pymammotion.mammotion.devices.mammotion_bluetooth import (
+    READ_CHAR_UUID,
+    WRITE_CHAR_UUID,
+    MammotionBaseBLEDevice,
+)
+from pymammotion.proto.luba_msg import LubaMsg
+
+from .mower import SimulatedMower
+
+# Blufi frame: type, frame control, sequence, length, then the payload.
+CUSTOM_DATA_TYPE = (19 << 2) | 1
+FRAME_CTRL_FRAG = 0x10
+MAX_FRAME_DATA = 255
+
+
+def ble_device(mower: SimulatedMower, address: str = "AA:BB:CC:DD:EE:FF") -> BLEDevice:
+    """Return the advertisement record of a simulated mower."""
+    return BLEDevice(address, mower.name, None)
+
+
+def encode_frames(data: bytes, sequence: int) -> tuple[list[bytes], int]:
+    """Split a payload into Blufi notification frames.
+
+    Fragmented frames carry the remaining total length in their first two
+    bytes, which ``BleMessage.parseNotification`` strips again.
+    """
+    frames = []
+    offset = 0
+    while True:
+        remaining = len(data) - offset
+        if remaining <= MAX_FRAME_DATA:
+            body, ctrl = data[offset:], 0
+        else:
+            chunk = MAX_FRAME_DATA - 2
+            body = remaining.to_bytes(2, "little") + data[offset : offset + chunk]
+            ctrl = FRAME_CTRL_FRAG
+            offset += chunk
+        frames.append(bytes((CUSTOM_DATA_TYPE, ctrl, sequence, len(body))) + body)
+        sequence = (sequence + 1) & 0xFF
+        if not ctrl:
+            return frames, sequence
+
+
+class FakeBleakClient:
+    """Stand-in for ``BleakClientWithServiceCache`` connected to a mower.
+
+    Writes are reassembled from Blufi frames and handed to the mower.
+    Replies and unsolicited reports are framed again and delivered after
+    ``latency`` seconds, each message in its own task as bleak does for
+    coroutine callbacks, so handlers may send commands of their own.
+    """
+
+    def __init__(self, mower: SimulatedMower, latency: float = 0.0) -> None:
+        """Initialize the client."""
+        self.mower = mower
+        self.latency = latency
+        self.address = "AA:BB:CC:DD:EE:FF"
+        self.mtu_size = 517
+        self.is_connected = True
+        self.writes = 0
+        self.notifications = 0
+        self._buffer = bytearray()
+        self._sequence = 0
+        self._callback: Callable[[Any, bytearray], Any] | None = None
+        self._unsubscribe: Callable[[], None] | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def start_notify(self, char: Any, callback: Callable[[Any, bytearray], Any]) -> None:
+        """Subscribe the device's notification handler."""
+        self._callback = callback
+        self._unsubscribe = self.mower.subscribe(self._send)
+
+    async def stop_notify(self, char: Any) -> None:
+        """Drop the notification handler."""
+        self._callback = None
+        if self._unsubscribe:
+            self._unsubscribe()
+            self._unsubscribe = None
+
+    async def write_gatt_char(self, char: Any, data: bytes, response: bool = False) -> None:
+        """Accept one Blufi frame from the app."""
+        self.writes += 1
+        ctrl = data[1]
+        self._buffer += data[4:]
+        if ctrl & FRAME_CTRL_FRAG:
+            return
+        payload, self._buffer = bytes(self._buffer), bytearray()
+        for message in self.mower.handle(payload):
+            self._send(message)
+
+    def _send(self, message: LubaMsg) -> None:
+        if self._callback is None:
+            return
+        frames, self._sequence = encode_frames(bytes(message), self._sequence)
+        task = asyncio.get_running_loop().create_task(self._deliver(frames))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _deliver(self, frames: list[bytes]) -> None:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        for frame in frames:
+            if self._callback is None:
+                return
+            self.notifications += 1
+            await self._callback(READ_CHAR_UUID, bytearray(frame))
+
+    async def disconnect(self) -> bool:
+        """Disconnect from the mower."""
+        await self.stop_notify(READ_CHAR_UUID)
+        self.is_connected = False
+        return True
+
+    async def clear_cache(self) -> bool:
+        """Nothing is cached."""
+        return True
+
+
+async def async_attach_ble(
+    device: MammotionBaseBLEDevice, client: FakeBleakClient
+) -> None:
+    """Connect a pymammotion BLE device to a fake client.
+
+    This performs the part of ``_ensure_connected`` that needs a real
+    adapter; afterwards the device sees a live connection and only resets
+    its disconnect timer before each command. The link is held open, as
+    with the stay connected option, since there is no adapter to reconnect.
+    """
+    device.set_disconnect_strategy(False)
+    device._client = client
+    device._message = BleMessage(client)
+    device._read_char = READ_CHAR_UUID
+    device._write_char = WRITE_CHAR_UUID
+    await client.start_notify(READ_CHAR_UUID, device._notification_handler)
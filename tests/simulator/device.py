@@ -0,0 +1,50 @@
+"""Wire simulated mowers into pymammotion device managers."""
+
+from __future__ import annotations
+
+from pymammotion.mammotion.devices.mammotion import (
+    ConnectionPreference,
+    Mammotion,
+    MammotionMixedDeviceManager,
+)
+
+from .ble import FakeBleakClient, async_attach_ble, ble_device
+from .mower import SimulatedMower
+from .mqtt import FakeMqttBroker
+
+
+async def async_ble_device_manager(
+    mower: SimulatedMower, latency: float = 0.0
+) -> MammotionMixedDeviceManager:
+    """Return a device manager talking to ``mower`` over fake BLE."""
+    device = MammotionMixedDeviceManager(
+        name=mower.name,
+        ble_device=ble_device(mower),
+        preference=ConnectionPreference.BLUETOOTH,
+    )
+    await async_attach_ble(device.ble(), FakeBleakClient(mower, latency))
+    return device
+
+
+def cloud_device_manager(
+    mower: SimulatedMower, broker: FakeMqttBroker
+) -> MammotionMixedDeviceManager:
+    """Return a device manager talking to ``mower`` through the fake broker.
+
+    Call ``broker.connect_async`` once every mower is added to mark the
+    account ready.
+    """
+    return MammotionMixedDeviceManager(
+        name=mower.name,
+        cloud_device=broker.add_mower(mower),
+        mqtt=broker.cloud,
+        preference=ConnectionPreference.WIFI,
+    )
+
+
+def register(*devices: MammotionMixedDeviceManager) -> Mammotion:
+    """Add device managers to the shared ``Mammotion`` instance."""
+    manager = Mammotion()
+    for device in devices:
+        manager.devices.add_device(device)
+    return manager
@@ -0,0 +1,157 @@
+"""Chunked firmware streaming over a simulated link.
+
+pymammotion has no command to stream an image to a mower, which fetches
+OTA images itself, so the integration never sends firmware. This transfer
+exercises the acknowledged, resumable streaming a link would need against
+fakes in the tests.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import zlib
+from collections import deque
+from collections.abc import Callable
+from typing import Protocol
+
+from bleak.exc import BleakError
+
+DEFAULT_CHUNK_SIZE = 240
+DEFAULT_WINDOW = 8
+MAX_RESUMES = 5
+RESUME_DELAY = 1.0
+
+STATE_IDLE = "idle"
+STATE_TRANSFERRING = "transferring"
+STATE_RESUMING = "resuming"
+STATE_VERIFYING = "verifying"
+STATE_DONE = "done"
+STATE_FAILED = "failed"
+
+LINK_EXCEPTIONS = (BleakError, TimeoutError, ConnectionError)
+
+
+class FirmwareTransferError(Exception):
+    """Raised when a firmware transfer cannot complete."""
+
+
+class FirmwareTransport(Protocol):
+    """Link able to receive a firmware image in chunks."""
+
+    async def async_open(self, size: int) -> int:
+        """Open a session and return the offset the device has committed."""
+
+    async def async_send_chunk(self, offset: int, data: bytes, crc: int) -> None:
+        """Send one chunk with its CRC-32."""
+
+    async def async_wait_ack(self) -> int:
+        """Wait for the next cumulative acknowledgement offset."""
+
+    async def async_finalize(self, digest: bytes) -> bool:
+        """Ask the device to verify the SHA-256 of the whole image."""
+
+
+class MammotionFirmwareTransfer:
+    """Stream a firmware image with a window of unacknowledged chunks.
+
+    The running SHA-256 only covers acknowledged bytes, so after a dropped
+    link the transfer rewinds (or fast-forwards) the digest to whatever
+    offset the device reports as committed and carries on from there.
+    """
+
+    def __init__(
+        self,
+        transport: FirmwareTransport,
+        image: bytes,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        window: int = DEFAULT_WINDOW,
+        max_resumes: int = MAX_RESUMES,
+        resume_delay: float = RESUME_DELAY,
+        progress_callback: Callable[[int], None] | None = None,
+    ) -> None:
+        """Initialize the transfer."""
+        self.transport = transport
+        self.image = memoryview(image)
+        self.size = len(image)
+        self.chunk_size = chunk_size
+        self.window = window
+        self.max_resumes = max_resumes
+        self.resume_delay = resume_delay
+        self.progress_callback = progress_callback
+        self.state = STATE_IDLE
+        self.acked = 0
+        self.resumes = 0
+        self.chunks_sent = 0
+        self._hasher = hashlib.sha256()
+        self._progress = -1
+
+    @property
+    def progress(self) -> int:
+        """Return the acknowledged share of the image in percent."""
+        if self.size == 0:
+            return 100
+        return self.acked * 100 // self.size
+
+    async def async_run(self) -> None:
+        """Transfer and verify the image, resuming after link drops."""
+        while True:
+            try:
+                self.state = STATE_TRANSFERRING
+                await self._async_transfer()
+                break
+            except LINK_EXCEPTIONS as error:
+                self.resumes += 1
+                if self.resumes > self.max_resumes:
+                    self.state = STATE_FAILED
+                    raise FirmwareTransferError(
+                        f"Firmware transfer failed at offset {self.acked}"
+                    ) from error
+                self.state = STATE_RESUMING
+                await asyncio.sleep(self.resume_delay * self.resumes)
+
+        self.state = STATE_VERIFYING
+        if not await self.transport.async_finalize(self._hasher.digest()):
+            self.state = STATE_FAILED
+            raise FirmwareTransferError("Device rejected the firmware checksum")
+        self.state = STATE_DONE
+        self._notify()
+
+    async def _async_transfer(self) -> None:
+        committed = await self.transport.async_open(self.size)
+        if committed > self.size:
+            raise FirmwareTransferError(f"Device reported offset {committed} past the image end")
+        self._seek(committed)
+
+        in_flight: deque[tuple[int, int]] = deque()
+        offset = self.acked
+        while self.acked < self.size:
+            while offset < self.size and len(in_flight) < self.window:
+                end = min(offset + self.chunk_size, self.size)
+                chunk = self.image[offset:end]
+                await self.transport.async_send_chunk(offset, bytes(chunk), zlib.crc32(chunk))
+                in_flight.append((offset, end))
+                offset = end
+                self.chunks_sent += 1
+
+            ack = await self.transport.async_wait_ack()
+            while in_flight and in_flight[0][1] <= ack:
+                start, end = in_flight.popleft()
+                self._hasher.update(self.image[start:end])
+                self.acked = end
+            self._notify()
+
+    def _seek(self, committed: int) -> None:
+        """Move the digest to the offset the device has committed."""
+        if committed < self.acked:
+            self._hasher = hashlib.sha256(self.image[:committed])
+        elif committed > self.acked:
+            self._hasher.update(self.image[self.acked : committed])
+        self.acked = committed
+
+    def _notify(self) -> None:
+        """Report progress once per whole percent."""
+        progress = self.progress
+        if progress != self._progress and self.progress_callback:
+            self._progress = progress
+            self.progress_callback(progress)
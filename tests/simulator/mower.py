@@ -0,0 +1,496 @@
+"""Simulated Mammotion mower speaking LubaMsg."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+import betterproto
+from pymammotion.proto.common import CommDataCouple
+from pymammotion.proto.dev_net import (
+    DevNet,
+    DrvDevInfoResp,
+    DrvDevInfoResult,
+    DrvDevInfoRespId,
+    WifiIotStatusReport,
+)
+from pymammotion.proto.luba_msg import LubaMsg, MsgAttr, MsgCmdType, MsgDevice
+from pymammotion.proto.mctrl_nav import (
+    MctlNav,
+    NavGetCommDataAck,
+    NavGetHashListAck,
+    NavPlanJobSet,
+    NavTaskCtrlAck,
+)
+from pymammotion.proto.mctrl_sys import (
+    MctlSys,
+    ReportInfoData,
+    RptAct,
+    RptConnectStatus,
+    RptDevLocation,
+    RptDevStatus,
+    RptMaintain,
+    RptRtk,
+    RptWork,
+)
+from pymammotion.utility.constant import WorkMode
+
+# Report units: positions in 1e-4 m, heading in 1e-4 rad.
+POSITION_SCALE = 10_000
+
+TASK_START = 1
+TASK_PAUSE = 2
+TASK_RESUME = 3
+TASK_CANCEL = 4
+TASK_RETURN = 5
+
+PATH_AREA = 0
+
+type Listener = Callable[[LubaMsg], None]
+
+
+@dataclass(frozen=True)
+class ReportRates:
+    """Unsolicited report rates in Hz; ``0`` disables a report."""
+
+    dev_status: float = 0.2
+    location: float = 1.0
+    work: float = 0.2
+    map_sync: float = 0.0
+
+
+@dataclass
+class SimulatedArea:
+    """A rectangular area of the simulated lawn."""
+
+    hash: int
+    x: float
+    y: float
+    width: float
+    height: float
+
+    @property
+    def size(self) -> float:
+        """Return the area in square metres."""
+        return self.width * self.height
+
+    def boundary(self) -> list[tuple[float, float]]:
+        """Return the boundary polygon in local metres."""
+        return [
+            (self.x, self.y),
+            (self.x + self.width, self.y),
+            (self.x + self.width, self.y + self.height),
+            (self.x, self.y + self.height),
+        ]
+
+
+@dataclass
+class SimulatedPlan:
+    """A job plan stored on the simulated device."""
+
+    plan_id: str
+    task_name: str
+    start_time: str = "09:00"
+    end_time: str = "11:00"
+    weeks: list[int] = field(default_factory=lambda: [1, 3, 5])
+    required_time: int = 120
+
+
+class SimulatedMower:
+    """State machine standing in for a mower behind BLE or MQTT.
+
+    The mower decodes the request bytes produced by ``MammotionCommand``,
+    updates its state and answers with the ``LubaMsg`` a real device would
+    send. ``async_run`` advances the simulation and pushes unsolicited
+    reports to every subscribed transport at the configured ``rates``.
+    """
+
+    def __init__(
+        self,
+        name: str = "Luba-SIM001",
+        iot_id: str = "sim-iot-001",
+        rates: ReportRates | None = None,
+        areas: int = 3,
+        frames_per_area: int = 2,
+        speed: float = 0.4,
+        lane_width: float = 0.25,
+        time_scale: float = 1.0,
+        tick: float = 0.1,
+    ) -> None:
+        """Initialize the simulated mower."""
+        self.name = name
+        self.iot_id = iot_id
+        self.product_key = "sim-product"
+        self.firmware_version = "1.10.5.44"
+        self.rates = rates or ReportRates()
+        self.speed = speed
+        self.lane_width = lane_width
+        self.time_scale = time_scale
+        self.tick = tick
+        self.frames_per_area = frames_per_area
+        self.areas = [
+            SimulatedArea(hash=1000 + index, x=index * 12.0, y=5.0, width=10.0, height=8.0)
+            for index in range(areas)
+        ]
+        self.plans: list[SimulatedPlan] = []
+        self.dock = (0.0, 0.0)
+
+        self.sys_status = WorkMode.MODE_CHARGING
+        self.battery = 100.0
+        self.x, self.y = self.dock
+        self.toward = 0.0
+        self.blade_on = False
+        self.distance = 0.0
+        self.mileage = 0.0
+        self.work_time = 0.0
+        self.area_index = 0
+
+        self.received: Counter[str] = Counter()
+        self.unhandled: Counter[str] = Counter()
+        self.sent = 0
+        self._listeners: list[Listener] = []
+        self._report_until = 0.0
+        self._report_period = 1.0
+        self._seq = 0
+        self._clock = 0.0
+
+    # Transport side
+
+    def subscribe(self, listener: Listener) -> Callable[[], None]:
+        """Receive every unsolicited message; returns an unsubscribe callable."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def handle(self, data: bytes) -> list[LubaMsg]:
+        """Answer one request and return the replies in order.
+
+        Handlers return ``None`` for requests the device only acknowledges;
+        those, and requests without a handler, are echoed back.
+        """
+        request = LubaMsg().parse(data)
+        group, sub_msg = betterproto.which_one_of(request, "LubaSubMsg")
+        name, value = (
+            betterproto.which_one_of(sub_msg, _ONEOF[group]) if group in _ONEOF else ("", None)
+        )
+        self.received[name or group] += 1
+        if handler := self._HANDLERS.get(name):
+            if (replies := handler(self, value)) is not None:
+                return replies
+        else:
+            self.unhandled[name or group] += 1
+        # Plain acknowledgements echo the request so the caller's wait completes.
+        request.msgattr = MsgAttr.MSG_ATTR_RESP
+        request.sender, request.rcver = request.rcver, MsgDevice.DEV_MOBILEAPP
+        return [request]
+
+    def _emit(self, message: LubaMsg) -> None:
+        for listener in list(self._listeners):
+            listener(message)
+
+    # Simulation
+
+    async def async_run(self) -> None:
+        """Advance the simulation and push reports until cancelled."""
+        last = time.monotonic()
+        due = dict.fromkeys(("dev_status", "location", "work", "map_sync", "report"), 0.0)
+        while True:
+            await asyncio.sleep(self.tick)
+            now = time.monotonic()
+            self.step((now - last) * self.time_scale)
+            last = now
+            for message in self.due_reports(now, due):
+                self._emit(message)
+
+    def due_reports(self, now: float, due: dict[str, float]) -> list[LubaMsg]:
+        """Return the reports whose period elapsed at monotonic time ``now``."""
+        messages = []
+        if now < self._report_until and now >= due["report"]:
+            due["report"] = max(due["report"] + self._report_period, now)
+            messages.append(self.report())
+        for kind, build in (
+            ("dev_status", lambda: self.report(dev=True)),
+            ("location", lambda: self.report(location=True)),
+            ("work", lambda: self.report(work=True)),
+            ("map_sync", self.hash_list),
+        ):
+            rate = getattr(self.rates, kind)
+            if rate > 0 and now >= due[kind]:
+                due[kind] = max(due[kind] + 1 / rate, now)
+                messages.append(build())
+        return messages
+
+    def step(self, seconds: float) -> None:
+        """Advance position, progress and battery by ``seconds``."""
+        self._clock += seconds
+        if self.sys_status == WorkMode.MODE_WORKING:
+            self.work_time += seconds
+            self._advance(seconds)
+            self.battery = max(0.0, self.battery - seconds / 60)
+            if self.battery <= 15:
+                self.sys_status = WorkMode.MODE_RETURNING
+        elif self.sys_status == WorkMode.MODE_RETURNING:
+            dx, dy = self.dock[0] - self.x, self.dock[1] - self.y
+            remaining = math.hypot(dx, dy)
+            travel = min(remaining, self.speed * seconds)
+            if remaining > 0:
+                self.toward = math.atan2(dy, dx)
+                self.x += dx / remaining * travel
+                self.y += dy / remaining * travel
+                self.mileage += travel
+            if remaining - travel <= 1e-6:
+                self.x, self.y = self.dock
+                self.sys_status = WorkMode.MODE_CHARGING
+                self.blade_on = False
+        elif self.sys_status == WorkMode.MODE_CHARGING:
+            self.battery = min(100.0, self.battery + seconds / 30)
+
+    def _advance(self, seconds: float) -> None:
+        """Drive a boustrophedon pattern over the current area."""
+        area = self.areas[self.area_index]
+        travel = self.speed * seconds
+        self.distance += travel
+        self.mileage += travel
+        total = self._area_length(area)
+        if self.distance >= total:
+            self.distance = 0.0
+            self.area_index += 1
+            if self.area_index == len(self.areas):
+                self.area_index = 0
+                self.sys_status = WorkMode.MODE_RETURNING
+                return
+            area = self.areas[self.area_index]
+        lane, offset = divmod(self.distance, area.width)
+        forward = int(lane) % 2 == 0
+        self.x = area.x + (offset if forward else area.width - offset)
+        self.y = area.y + min(lane * self.lane_width, area.height)
+        self.toward = 0.0 if forward else math.pi
+
+    def _area_length(self, area: SimulatedArea) -> float:
+        return area.width * math.ceil(area.height / self.lane_width)
+
+    @property
+    def progress(self) -> int:
+        """Return job progress over all areas in percent."""
+        total = sum(self._area_length(area) for area in self.areas)
+        done = sum(self._area_length(area) for area in self.areas[: self.area_index])
+        return min(100, int((done + self.distance) * 100 / total))
+
+    # Messages
+
+    def _message(self, group: str, value: Any, attr: MsgAttr = MsgAttr.MSG_ATTR_RESP) -> LubaMsg:
+        self._seq = (self._seq + 1) & 0x7FFFFFFF
+        self.sent += 1
+        return LubaMsg(
+            msgtype=_MSG_TYPE[group],
+            sender=MsgDevice.DEV_MAINCTL,
+            rcver=MsgDevice.DEV_MOBILEAPP,
+            msgattr=attr,
+            seqs=self._seq,
+            version=1,
+            subtype=1,
+            timestamp=round(time.time() * 1000),
+            **{group: value},
+        )
+
+    def report(
+        self, dev: bool = False, location: bool = False, work: bool = False
+    ) -> LubaMsg:
+        """Build a ``toapp_report_data`` report, all parts when none is chosen."""
+        every = not (dev or location or work)
+        data = ReportInfoData()
+        if every:
+            data.connect = RptConnectStatus(connect_type=1, ble_rssi=-60, wifi_rssi=-55)
+            data.rtk = RptRtk(status=4, gps_stars=28, co_view_stars=(12 << 8) | 20)
+            data.maintain = RptMaintain(
+                mileage=int(self.mileage), work_time=int(self.work_time), bat_cycles=12
+            )
+        if every or dev:
+            data.dev = RptDevStatus(
+                sys_status=self.sys_status,
+                charge_state=int(self.sys_status == WorkMode.MODE_CHARGING),
+                battery_val=int(self.battery),
+                sys_time_stamp=int(self._clock),
+            )
+        if every or location:
+            data.locations = [
+                RptDevLocation(
+                    real_pos_x=round(self.x * POSITION_SCALE),
+                    real_pos_y=round(self.y * POSITION_SCALE),
+                    real_toward=round(self.toward * POSITION_SCALE),
+                    pos_type=5,
+                    zone_hash=self.areas[self.area_index].hash if self.areas else 0,
+                )
+            ]
+        if every or work:
+            size = int(sum(area.size for area in self.areas))
+            total_minutes = int(
+                sum(self._area_length(area) for area in self.areas) / self.speed / 60
+            )
+            left_minutes = total_minutes * (100 - self.progress) // 100
+            data.work = RptWork(
+                area=(self.progress << 16) | size,
+                progress=(left_minutes << 16) | total_minutes,
+                knife_height=60,
+                man_run_speed=round(self.speed * 100),
+            )
+        return self._message(
+            "sys", MctlSys(toapp_report_data=data), MsgAttr.MSG_ATTR_REPORT
+        )
+
+    def hash_list(self) -> LubaMsg:
+        """Build the area hash list that starts a map sync."""
+        return self._message(
+            "nav",
+            MctlNav(
+                toapp_gethash_ack=NavGetHashListAck(
+                    pver=1,
+                    sub_cmd=0,
+                    total_frame=1,
+                    current_frame=1,
+                    hash_len=len(self.areas),
+                    data_couple=[area.hash for area in self.areas],
+                )
+            ),
+        )
+
+    def _frame(self, area: SimulatedArea, frame: int) -> LubaMsg:
+        points = area.boundary()
+        per_frame = math.ceil(len(points) / self.frames_per_area)
+        chunk = points[(frame - 1) * per_frame : frame * per_frame]
+        return self._message(
+            "nav",
+            MctlNav(
+                toapp_get_commondata_ack=NavGetCommDataAck(
+                    pver=1,
+                    sub_cmd=1,
+                    action=8,
+                    type=PATH_AREA,
+                    hash=area.hash,
+                    total_frame=self.frames_per_area,
+                    current_frame=frame,
+                    data_len=len(chunk),
+                    data_couple=[CommDataCouple(x=x, y=y) for x, y in chunk],
+                )
+            ),
+        )
+
+    # Request handlers
+
+    def _on_report_cfg(self, cfg: Any) -> list[LubaMsg] | None:
+        if cfg.act == RptAct.RPT_STOP:
+            self._report_until = 0.0
+            return None
+        self._report_period = max(cfg.period, 100) / 1000
+        self._report_until = time.monotonic() + cfg.timeout / 1000
+        return [self.report()]
+
+    def _on_taskctrl(self, ctrl: Any) -> list[LubaMsg]:
+        result = 0
+        if ctrl.action == TASK_START and self.sys_status != WorkMode.MODE_WORKING:
+            self.sys_status = WorkMode.MODE_WORKING
+            self.area_index, self.distance = 0, 0.0
+            self.blade_on = True
+        elif ctrl.action == TASK_PAUSE and self.sys_status == WorkMode.MODE_WORKING:
+            self.sys_status = WorkMode.MODE_PAUSE
+        elif ctrl.action == TASK_RESUME and self.sys_status == WorkMode.MODE_PAUSE:
+            self.sys_status = WorkMode.MODE_WORKING
+        elif ctrl.action == TASK_CANCEL:
+            self.sys_status = WorkMode.MODE_READY
+            self.blade_on = False
+        elif ctrl.action == TASK_RETURN and self.sys_status != WorkMode.MODE_CHARGING:
+            self.sys_status = WorkMode.MODE_RETURNING
+        else:
+            result = 1
+        ack = NavTaskCtrlAck(
+            type=ctrl.type, action=ctrl.action, result=result, nav_state=self.sys_status
+        )
+        return [self._message("nav", MctlNav(todev_taskctrl_ack=ack)), self.report(dev=True)]
+
+    def _on_leave_dock(self, _value: Any) -> list[LubaMsg]:
+        if self.sys_status == WorkMode.MODE_CHARGING:
+            self.sys_status = WorkMode.MODE_READY
+            self.x, self.y = self.dock[0] + 1.0, self.dock[1]
+        return [self.report(dev=True, location=True)]
+
+    def _on_gethash(self, request: Any) -> list[LubaMsg] | None:
+        # sub_cmd 2 only acknowledges a received hash list frame.
+        return None if request.sub_cmd == 2 else [self.hash_list()]
+
+    def _on_commondata(self, request: Any) -> list[LubaMsg] | None:
+        area = next((area for area in self.areas if area.hash == request.hash), None)
+        if area is None:
+            return None
+        frame = request.current_frame + 1 if request.sub_cmd == 2 else 1
+        return [self._frame(area, min(frame, self.frames_per_area))]
+
+    def _on_planjob(self, request: Any) -> list[LubaMsg]:
+        index = request.plan_index
+        plan_set = NavPlanJobSet(
+            sub_cmd=request.sub_cmd, total_plan_num=len(self.plans), plan_index=index
+        )
+        if index < len(self.plans):
+            plan = self.plans[index]
+            plan_set.plan_id = plan_set.job_id = plan.plan_id
+            plan_set.task_name = plan_set.job_name = plan.task_name
+            plan_set.start_time = plan.start_time
+            plan_set.end_time = plan.end_time
+            plan_set.weeks = plan.weeks
+            plan_set.required_time = plan.required_time
+            plan_set.zone_hashs = [area.hash for area in self.areas]
+        return [self._message("nav", MctlNav(todev_planjob_set=plan_set))]
+
+    def _on_knife_ctrl(self, ctrl: Any) -> list[LubaMsg]:
+        self.blade_on = bool(ctrl.knife_status)
+        return [self.report(work=True)]
+
+    def _on_devinfo(self, _request: Any) -> list[LubaMsg]:
+        resp = DrvDevInfoResp(
+            resp_ids=[
+                DrvDevInfoRespId(
+                    id=1, type=6, res=DrvDevInfoResult.DRV_RESULT_SUC, info=self.firmware_version
+                )
+            ]
+        )
+        return [self._message("net", DevNet(toapp_devinfo_resp=resp))]
+
+    def _on_ble_sync(self, _value: Any) -> list[LubaMsg]:
+        status = WifiIotStatusReport(
+            wifi_connected=True,
+            iot_connected=True,
+            productkey=self.product_key,
+            devicename=self.name,
+        )
+        return [self._message("net", DevNet(toapp_wifi_iot_status=status))]
+
+    _HANDLERS: dict[str, Callable[[SimulatedMower, Any], list[LubaMsg] | None]] = {
+        "todev_report_cfg": _on_report_cfg,
+        "todev_taskctrl": _on_taskctrl,
+        "todev_one_touch_leave_pile": _on_leave_dock,
+        "todev_gethash": _on_gethash,
+        "todev_get_commondata": _on_commondata,
+        "todev_planjob_set": _on_planjob,
+        "todev_knife_ctrl": _on_knife_ctrl,
+        "todev_devinfo_req": _on_devinfo,
+        "todev_ble_sync": _on_ble_sync,
+    }
+
+
+_ONEOF = {
+    "sys": "SubSysMsg",
+    "nav": "SubNavMsg",
+    "net": "NetSubType",
+    "driver": "SubDrvMsg",
+    "ota": "SubOtaMsg",
+    "mul": "SubMul",
+}
+
+_MSG_TYPE = {
+    "sys": MsgCmdType.MSG_CMD_TYPE_EMBED_SYS,
+    "nav": MsgCmdType.MSG_CMD_TYPE_NAV,
+    "net": MsgCmdType.MSG_CMD_TYPE_ESP,
+}
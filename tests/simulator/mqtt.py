@@ -0,0 +1,157 @@
+"""Local stand-in for the Aliyun MQTT broker and cloud gateway."""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import itertools
+import time
+from types import SimpleNamespace
+from typing import Any
+
+from pymammotion.aliyun.model.dev_by_account_response import Device
+from pymammotion.mammotion.devices.mammotion_cloud import MammotionCloud
+from pymammotion.proto.luba_msg import LubaMsg
+
+from .mower import SimulatedMower
+
+
+class FakeMqttBroker:
+    """Play both ``MammotionMQTT`` and ``CloudIOTGateway`` for simulated mowers.
+
+    Commands arrive through ``send_cloud_command``, which pymammotion calls
+    from the executor, and are answered on the event loop. Replies and
+    unsolicited reports are published as ``device_protobuf_msg_event``
+    thing events, the same payload shape the cloud delivers. Create the
+    broker while the event loop is running.
+    """
+
+    def __init__(self, latency: float = 0.0) -> None:
+        """Initialize the broker."""
+        self.latency = latency
+        self.is_connected = False
+        self.on_connected = None
+        self.on_ready = None
+        self.on_error = None
+        self.on_disconnected = None
+        self.on_message = None
+        self.devices_by_account_response = SimpleNamespace(
+            data=SimpleNamespace(total=0, data=[])
+        )
+        self.mowers: dict[str, SimulatedMower] = {}
+        self.commands = 0
+        self.published = 0
+        self._cloud: MammotionCloud | None = None
+        self._ids = itertools.count(1)
+        self._loop = asyncio.get_running_loop()
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def cloud(self) -> MammotionCloud:
+        """Return the per account ``MammotionCloud`` bound to this broker."""
+        if self._cloud is None:
+            self._cloud = MammotionCloud(self, self)
+        return self._cloud
+
+    def add_mower(self, mower: SimulatedMower) -> Device:
+        """Bind a mower to the account and return its device record."""
+        self.mowers[mower.iot_id] = mower
+        mower.subscribe(lambda message: self._publish(mower, message))
+        device = Device(
+            gmtModified=0,
+            netType="NET_WIFI",
+            categoryKey="LawnMower",
+            productKey=mower.product_key,
+            nodeType="DEVICE",
+            isEdgeGateway=False,
+            deviceName=mower.name,
+            categoryName="Lawn mower",
+            identityAlias="",
+            productName="Luba",
+            iotId=mower.iot_id,
+            bindTime=0,
+            owned=1,
+            identityId="",
+            thingType="DEVICE",
+            status=1,
+        )
+        self.devices_by_account_response.data.data.append(device)
+        self.devices_by_account_response.data.total += 1
+        return device
+
+    # MammotionMQTT
+
+    def connect_async(self) -> None:
+        """Connect and report ready, like the linkkit client does."""
+        self.is_connected = True
+        for callback in (self.on_connected, self.on_ready):
+            if callback is not None:
+                asyncio.run_coroutine_threadsafe(callback(), self._loop)
+
+    def disconnect(self) -> None:
+        """Drop the connection."""
+        self.is_connected = False
+
+    def get_cloud_client(self) -> FakeMqttBroker:
+        """Return the gateway, which is the broker itself."""
+        return self
+
+    # CloudIOTGateway
+
+    def send_cloud_command(self, iot_id: str, command: bytes) -> str:
+        """Deliver a command to a mower; safe to call from any thread."""
+        self._loop.call_soon_threadsafe(self._dispatch, iot_id, bytes(command))
+        return str(next(self._ids))
+
+    def sign_out(self) -> None:
+        """Nothing to sign out of."""
+
+    def _dispatch(self, iot_id: str, command: bytes) -> None:
+        if (mower := self.mowers.get(iot_id)) is None:
+            return
+        self.commands += 1
+        for message in mower.handle(command):
+            self._publish(mower, message)
+
+    def _publish(self, mower: SimulatedMower, message: LubaMsg) -> None:
+        if not self.is_connected or self.on_message is None:
+            return
+        payload = self._event(mower, bytes(message))
+        topic = f"/sys/{mower.product_key}/{mower.name}/app/down/thing/events"
+        task = self._loop.create_task(self._deliver(topic, payload, mower.iot_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _deliver(self, topic: str, payload: dict[str, Any], iot_id: str) -> None:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.published += 1
+        await self.on_message(topic, payload, iot_id)
+
+    def _event(self, mower: SimulatedMower, content: bytes) -> dict[str, Any]:
+        now = round(time.time() * 1000)
+        return {
+            "method": "thing.events",
+            "id": str(next(self._ids)),
+            "version": "1.0",
+            "params": {
+                "groupIdList": [],
+                "groupId": "",
+                "categoryKey": "LawnMower",
+                "batchId": "",
+                "gmtCreate": now,
+                "productKey": mower.product_key,
+                "type": "info",
+                "deviceName": mower.name,
+                "iotId": mower.iot_id,
+                "checkLevel": 0,
+                "namespace": "",
+                "tenantId": "",
+                "name": "device_protobuf_msg_event",
+                "thingType": "DEVICE",
+                "time": now,
+                "tenantInstanceId": "",
+                "identifier": "device_protobuf_msg_event",
+                "value": {"content": base64.b64encode(content).decode()},
+            },
+        }
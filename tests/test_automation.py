@@ -5,6 +5,7 @@ from homeassistant.core import HomeAssistant
 
 from custom_components.mammotion.automation import (
     MammotionAutomation,
+    MammotionTriggerDispatcher,
     async_setup_automations,
     async_unload_automations,
 )
@@ -78,5 +79,90 @@ class TestMammotionAutomation(unittest.TestCase):
         mock_async_disable.assert_called_once()
 
 
+def _state_event(entity_id, old, new):
+    event = MagicMock()
+    event.data = {
+        "entity_id": entity_id,
+        "old_state": MagicMock(state=old),
+        "new_state": MagicMock(state=new),
+    }
+    return event
+
+
+@patch("custom_components.mammotion.automation.Script")
+@patch("custom_components.mammotion.automation.async_track_state_change_event")
+class TestMammotionTriggerDispatcher(unittest.TestCase):
+    def setUp(self):
+        self.hass = MagicMock(spec=HomeAssistant)
+        self.hass.loop = MagicMock()
+        self.hass.loop.time.return_value = 100.0
+        self.dispatcher = MammotionTriggerDispatcher(self.hass)
+
+    def _automation(self, **options):
+        config = {
+            "trigger": [{"platform": "state", "entity_id": "sensor.test", "to": "on"}],
+            "action": [{"service": "test.automation"}],
+            **options,
+        }
+        automation = MammotionAutomation(self.hass, config, self.dispatcher)
+        self.dispatcher.register(automation)
+        return automation
+
+    def test_single_listener_for_shared_entity(self, mock_track, mock_script):
+        self._automation()
+        self._automation()
+
+        mock_track.assert_called_once()
+        self.assertEqual(mock_track.call_args[0][1], ["sensor.test"])
+
+    def test_index_filters_states(self, mock_track, mock_script):
+        automation = self._automation()
+
+        self.dispatcher._handle_event(_state_event("sensor.test", "off", "off"))
+        self.dispatcher._handle_event(_state_event("sensor.other", "off", "on"))
+        self.assertEqual(automation.triggers_fired, 0)
+
+        self.dispatcher._handle_event(_state_event("sensor.test", "off", "on"))
+        self.assertEqual(automation.triggers_fired, 1)
+        self.hass.async_create_task.assert_called_once()
+
+    def test_throttle_suppresses_triggers(self, mock_track, mock_script):
+        automation = self._automation(throttle=30)
+
+        self.dispatcher._handle_event(_state_event("sensor.test", "off", "on"))
+        self.hass.loop.time.return_value = 110.0
+        self.dispatcher._handle_event(_state_event("sensor.test", "off", "on"))
+        self.hass.loop.time.return_value = 140.0
+        self.dispatcher._handle_event(_state_event("sensor.test", "off", "on"))
+
+        self.assertEqual(automation.triggers_fired, 3)
+        self.assertEqual(automation.triggers_suppressed, 1)
+        self.assertEqual(self.hass.async_create_task.call_count, 2)
+        self.assertEqual(self.dispatcher.stats["triggers_suppressed"], 1)
+
+    @patch("custom_components.mammotion.automation.async_call_later")
+    def test_debounce_runs_latest_event_once(
+        self, mock_call_later, mock_track, mock_script
+    ):
+        automation = self._automation(debounce=5)
+
+        self.dispatcher._handle_event(_state_event("sensor.test", "off", "on"))
+        self.dispatcher._handle_event(_state_event("sensor.test", "off", "on"))
+
+        self.assertEqual(mock_call_later.call_count, 2)
+        mock_call_later.return_value.assert_called_once()
+        self.assertEqual(automation.triggers_suppressed, 1)
+
+        mock_call_later.call_args[0][2](None)
+        self.hass.async_create_task.assert_called_once()
+
+    def test_unregister_drops_listener(self, mock_track, mock_script):
+        automation = self._automation()
+
+        self.dispatcher.unregister(automation)
+        mock_track.return_value.assert_called_once()
+        self.assertEqual(self.dispatcher.stats["entities"], 0)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,133 @@
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.mammotion.capture import (
+    RECORD,
+    CaptureRecord,
+    Direction,
+    MammotionCapture,
+    async_replay,
+    compression_available,
+    read_capture,
+)
+from simulator import ReportRates, SimulatedMower, async_ble_device_manager
+
+
+async def _settle():
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+
+async def _executor_job(func, *args):
+    return func(*args)
+
+
+class TestMammotionCapture(unittest.TestCase):
+    def setUp(self):
+        self.hass = MagicMock(spec=HomeAssistant)
+        self.hass.async_add_executor_job = _executor_job
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "captures" / "luba.mcap"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _capture(self, compress=False):
+        return MammotionCapture(self.hass, self.path, compress)
+
+    def test_records_round_trip(self):
+        capture = self._capture()
+        capture.record(Direction.OUTBOUND, b"\x01\x02")
+        capture.record(Direction.INBOUND, b"\x03\x04\x05")
+        asyncio.run(capture.async_flush())
+
+        records = list(read_capture(self.path))
+
+        self.assertEqual([r.direction for r in records], [Direction.OUTBOUND, Direction.INBOUND])
+        self.assertEqual([r.data for r in records], [b"\x01\x02", b"\x03\x04\x05"])
+        self.assertEqual(records[0].timestamp, 0)
+        self.assertGreaterEqual(records[1].timestamp, 0)
+
+    def test_appends_across_flushes_and_ignores_torn_tail(self):
+        capture = self._capture()
+        capture.record(Direction.INBOUND, b"first")
+        asyncio.run(capture.async_flush())
+        capture.record(Direction.INBOUND, b"second")
+        asyncio.run(capture.async_flush())
+        with self.path.open("ab") as file:
+            file.write(RECORD.pack(Direction.INBOUND, 1.0, 100) + b"partial")
+
+        records = list(read_capture(self.path))
+
+        self.assertEqual([r.data for r in records], [b"first", b"second"])
+        self.assertEqual(capture.records, 2)
+
+    @unittest.skipUnless(compression_available(), "zstandard not installed")
+    def test_compressed_round_trip(self):
+        capture = self._capture(compress=True)
+        for index in range(3):
+            capture.record(Direction.INBOUND, bytes([index]) * 500)
+            asyncio.run(capture.async_flush())
+
+        records = list(read_capture(self.path))
+
+        self.assertEqual(len(records), 3)
+        self.assertLess(self.path.stat().st_size, 1500)
+
+    def test_capture_and_replay_session(self):
+        rates = ReportRates(0, 0, 0, 0)
+
+        async def run():
+            device = await async_ble_device_manager(SimulatedMower(name="Luba-CAP", rates=rates))
+            capture = self._capture()
+            capture.attach(device.ble())
+            await device.ble().start_map_sync()
+            await _settle()
+            await device.ble().command("start_job")
+            await device.ble().command("get_report_cfg")
+            await _settle()
+            capture.detach()
+            await capture.async_flush()
+
+            replayed = await async_ble_device_manager(SimulatedMower(name="Luba-CAP", rates=rates))
+            notifications = []
+
+            async def _notified():
+                notifications.append(True)
+
+            replayed.ble().set_notification_callback(_notified)
+            stats = await async_replay(replayed.ble(), read_capture(self.path))
+            return device, replayed, stats, notifications
+
+        device, replayed, stats, notifications = asyncio.run(run())
+        live, restored = device.mower_state, replayed.mower_state
+
+        self.assertGreater(stats.inbound, 0)
+        self.assertGreater(stats.outbound, 0)
+        self.assertEqual(len(notifications), stats.inbound)
+        self.assertIn("synchronize_hash_data", stats.requested)
+        self.assertEqual(sorted(restored.map.area), sorted(live.map.area))
+        self.assertEqual(restored.report_data.dev.sys_status, live.report_data.dev.sys_status)
+        self.assertEqual(restored.report_data.work.area, live.report_data.work.area)
+        self.assertNotIn("queue_command", vars(replayed.ble()))
+
+    def test_realtime_replay_keeps_spacing(self):
+        records = [CaptureRecord(Direction.INBOUND, timestamp, b"") for timestamp in (1.0, 1.05, 1.1)]
+
+        async def run():
+            device = await async_ble_device_manager(SimulatedMower(rates=ReportRates(0, 0, 0, 0)))
+            return await async_replay(device.ble(), records, realtime=True)
+
+        stats = asyncio.run(run())
+
+        self.assertEqual(stats.inbound, 3)
+        self.assertGreaterEqual(stats.duration, 0.1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,166 @@
+import asyncio
+import time
+import unittest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.mammotion.connection import (
+    MAX_IDLE_TIMEOUT,
+    MIN_IDLE_TIMEOUT,
+    MammotionConnectionManager,
+    UsagePattern,
+    idle_timeout,
+)
+
+
+class _FakeBle:
+    def __init__(self):
+        self._client = None
+        self._operation_lock = asyncio.Lock()
+        self.disconnect_strategy = True
+        self.connects = 0
+        self.disconnects = 0
+
+    def set_disconnect_strategy(self, disconnect):
+        self.disconnect_strategy = disconnect
+
+    async def _ensure_connected(self):
+        self.connects += 1
+        self._client = SimpleNamespace(is_connected=True)
+
+    async def _execute_forced_disconnect(self):
+        self.disconnects += 1
+        self._client = None
+
+
+class TestIdleTimeout(unittest.TestCase):
+    def test_no_history_disconnects_quickly(self):
+        self.assertEqual(idle_timeout([]), MIN_IDLE_TIMEOUT)
+
+    def test_covers_short_gaps(self):
+        self.assertEqual(idle_timeout([20.0] * 9 + [40.0]), 45.0)
+
+    def test_mostly_long_gaps_disconnect_quickly(self):
+        self.assertEqual(idle_timeout([30.0, 3600.0, 7200.0]), MIN_IDLE_TIMEOUT)
+
+    def test_clamped(self):
+        self.assertEqual(idle_timeout([299.0] * 4), MAX_IDLE_TIMEOUT)
+
+
+class TestUsagePattern(unittest.TestCase):
+    def test_learns_a_weekly_habit(self):
+        pattern = UsagePattern()
+        monday = datetime(2024, 6, 3, 18, 30)
+        for week in range(3):
+            when = monday + timedelta(weeks=week)
+            pattern.record(when)
+            pattern.roll(when + timedelta(hours=1))
+
+        self.assertTrue(pattern.likely(monday + timedelta(weeks=3)))
+        self.assertFalse(pattern.likely(monday + timedelta(hours=1)))
+
+    def test_round_trips(self):
+        pattern = UsagePattern()
+        pattern.probabilities[5] = 0.75
+        restored = UsagePattern()
+        restored.restore(pattern.as_dict())
+
+        self.assertEqual(restored.probabilities[5], 0.75)
+
+
+class TestMammotionConnectionManager(unittest.TestCase):
+    def setUp(self):
+        self.hass = MagicMock(spec=HomeAssistant)
+        self.hass.async_create_background_task = lambda coro, name: asyncio.ensure_future(coro)
+        self.ble = _FakeBle()
+        device = SimpleNamespace(ble=lambda: self.ble)
+        self.coordinator = SimpleNamespace(
+            device_name="Luba-TEST",
+            manager=SimpleNamespace(get_device_by_name=lambda name: device),
+            snapshot=SimpleNamespace(reported=False, reported_sys_status=0),
+            proxies=MagicMock(),
+            ble_reachable=True,
+        )
+        self.manager = MammotionConnectionManager(self.hass, self.coordinator)
+        self.manager.active = True
+        self.timers = []
+        patcher = patch(
+            "custom_components.mammotion.connection.async_call_later",
+            side_effect=lambda hass, delay, action: self.timers.append((delay, action))
+            or MagicMock(),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _send(self, command):
+        async def run():
+            async with self.manager.track(command):
+                await self.ble._ensure_connected()
+
+        asyncio.run(run())
+
+    def test_takes_over_disconnects_and_counts_cold_commands(self):
+        self._send("move_forward")
+        self._send("move_forward")
+
+        self.assertFalse(self.ble.disconnect_strategy)
+        self.assertEqual(self.manager.stats.cold_commands, 1)
+        self.assertEqual(self.manager.stats.warm_commands, 1)
+        self.assertEqual(self.timers[-1][0], MIN_IDLE_TIMEOUT)
+
+    def test_idle_timeout_disconnects(self):
+        self._send("move_forward")
+        delay, action = self.timers[-1]
+
+        asyncio.run(action(dt_util.utcnow()))
+
+        self.assertEqual(self.ble.disconnects, 1)
+        self.assertEqual(self.manager.stats.idle_disconnects, 1)
+
+    def test_hold_preconnects_and_blocks_the_idle_timeout(self):
+        async def run():
+            release = self.manager.async_hold("manual")
+            await asyncio.sleep(0)
+            self.manager._schedule_idle()
+            self.assertEqual(self.timers, [])
+            release()
+            release()
+
+        asyncio.run(run())
+
+        self.assertEqual(self.ble.connects, 1)
+        self.assertEqual(self.manager.stats.preconnects, 1)
+        self.assertEqual(len(self.timers), 1)
+        self.assertEqual(self.manager.diagnostics["holds"], {})
+
+    def test_job_holds_the_link(self):
+        async def run():
+            self.manager._transport()
+            self.coordinator.snapshot = SimpleNamespace(reported=True, reported_sys_status=13)
+            self.manager._handle_coordinator_update()
+            self.assertEqual(self.manager.diagnostics["holds"], {"job": 1})
+            self.coordinator.snapshot = SimpleNamespace(reported=True, reported_sys_status=11)
+            self.manager._handle_coordinator_update()
+
+        asyncio.run(run())
+
+        self.assertEqual(self.manager.diagnostics["holds"], {})
+
+    def test_background_commands_do_not_adapt_the_timeout(self):
+        clock = SimpleNamespace(monotonic=iter([0, 30, 60]).__next__, perf_counter=time.perf_counter)
+        with patch("custom_components.mammotion.connection.time", clock):
+            self._send("get_report_cfg")
+            self._send("move_forward")
+            self._send("move_forward")
+            self._send("move_forward")
+
+        self.assertEqual(self.manager.diagnostics["command_gaps"], 2)
+        self.assertEqual(self.manager.idle_timeout, 35.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
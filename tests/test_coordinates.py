@@ -0,0 +1,62 @@
+import math
+import unittest
+
+import numpy as np
+from pymammotion.data.model.device import MowingDevice
+from pymammotion.data.model.location import Location
+from pymammotion.data.model.rapid_state import RapidState
+
+from custom_components.mammotion.coordinates import MammotionCoordinateService, mower_pose
+
+
+class TestMammotionCoordinateService(unittest.TestCase):
+    def setUp(self):
+        self.service = MammotionCoordinateService()
+        self.service.set_origin(math.radians(-36.85), math.radians(174.76))
+
+    def test_origin_maps_to_base_station(self):
+        latitude, longitude = self.service.local_to_geodetic([(0.0, 0.0)])[0]
+        self.assertAlmostEqual(latitude, -36.85, places=9)
+        self.assertAlmostEqual(longitude, 174.76, places=9)
+
+    def test_north_offset_increases_latitude(self):
+        latitude, longitude = self.service.local_to_geodetic([(0.0, 100.0)])[0]
+        self.assertAlmostEqual(latitude - -36.85, 100 / 110_950, places=5)
+        self.assertAlmostEqual(longitude, 174.76, places=7)
+
+    def test_round_trip_batch(self):
+        points = np.random.default_rng(1).uniform(-200, 200, size=(500, 2))
+        geodetic = self.service.local_to_geodetic(points)
+        local = self.service.geodetic_to_local(geodetic)
+        np.testing.assert_allclose(local, points, atol=1e-4)
+
+    def test_update_from_location(self):
+        service = MammotionCoordinateService()
+        location = Location()
+        self.assertFalse(service.update_from_location(location))
+        self.assertIsNone(service.pose_to_geodetic((1.0, 1.0, 0.0)))
+
+        location.RTK.latitude = math.radians(51.5)
+        location.RTK.longitude = math.radians(-0.12)
+        location.dock.latitude = 2.0
+        location.dock.longitude = 3.0
+        self.assertTrue(service.update_from_location(location))
+        self.assertFalse(service.update_from_location(location))
+        self.assertEqual(service.dock, (3.0, 2.0, math.radians(location.dock.rotation)))
+
+    def test_missing_origin(self):
+        with self.assertRaises(ValueError):
+            MammotionCoordinateService().local_to_geodetic([(0.0, 0.0)])
+
+
+class TestMowerPose(unittest.TestCase):
+    def test_rapid_state_is_not_scaled_twice(self):
+        mower = MowingDevice()
+        raw = [4, 0, 20, 0, 0, 0, 10, 12500, -30000, 15708, 0, 0]
+        mower.mowing_state = RapidState.from_raw(raw)
+
+        self.assertEqual(mower_pose(mower), (1.25, -3.0, 1.5708))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+
+from pymammotion.data.model.device import MowingDevice
+from pymammotion.proto.common import CommDataCouple
+from pymammotion.proto.mctrl_nav import NavGetCommDataAck
+
+from custom_components.mammotion.diagnostics import (
+    REDACTED,
+    MammotionDiagnosticsBuilder,
+)
+
+
+class TestMammotionDiagnosticsBuilder(unittest.TestCase):
+    def setUp(self):
+        self.builder = MammotionDiagnosticsBuilder(max_items=10, max_section_bytes=4096)
+
+    def _build(self):
+        self.builder.collect()
+        return self.builder.build()
+
+    def test_redacts_snake_and_camel_case_keys(self):
+        self.builder.add_section(
+            "account",
+            lambda: {
+                "account_name": "someone@example.com",
+                "nested": {"iotId": "abc", "identity_id": "def", "name": "Luba-1"},
+                "password": "",
+            },
+        )
+        result = self._build()["account"]
+
+        self.assertEqual(result["account_name"], REDACTED)
+        self.assertEqual(result["nested"]["iotId"], REDACTED)
+        self.assertEqual(result["nested"]["identity_id"], REDACTED)
+        self.assertEqual(result["nested"]["name"], "Luba-1")
+        self.assertEqual(result["password"], "")
+
+    def test_samples_long_sequences(self):
+        self.builder.add_section("points", lambda: list(range(1000)))
+        result = self._build()
+
+        self.assertEqual(len(result["points"]), 10)
+        self.assertEqual(result["points"][:2], [0, 100])
+        self.assertEqual(result["summary"]["points"]["truncated"], 1)
+
+    def test_walks_map_dataclasses(self):
+        mower = MowingDevice()
+        mower.map.update(
+            NavGetCommDataAck(
+                type=0,
+                hash=1,
+                total_frame=1,
+                current_frame=1,
+                data_couple=[CommDataCouple(x=i, y=i) for i in range(500)],
+            )
+        )
+        self.builder.add_section("map", lambda: mower.map)
+        result = self._build()
+
+        couples = result["map"]["area"]["1"]["data"][0]["data_couple"]
+        self.assertEqual(len(couples), 10)
+        self.assertIn("bytes", result["summary"]["map"])
+        self.assertIn("ms", result["summary"]["map"])
+
+    def test_oversized_section_is_omitted(self):
+        self.builder.add_section("blob", lambda: ["x" * 1000] * 10)
+        result = self._build()
+
+        self.assertIn("omitted", result["blob"])
+        self.assertGreater(result["summary"]["blob"]["bytes"], 4096)
+
+    def test_failing_section_is_reported(self):
+        self.builder.add_section("broken", lambda: 1 / 0)
+        self.builder.add_section("ok", lambda: {"value": 1})
+        result = self._build()
+
+        self.assertIsNone(result["broken"])
+        self.assertIn("ZeroDivisionError", result["summary"]["broken"]["error"])
+        self.assertEqual(result["ok"], {"value": 1})
+
+    def test_finish_runs_on_the_collected_value(self):
+        self.builder.add_section("count", lambda: [1, 2, 3], finish=len)
+        self.builder.collect()
+
+        self.assertEqual(self.builder.build()["count"], 3)
+
+    def test_build_only_reads_collected_values(self):
+        state = {"value": 1}
+        self.builder.add_section("state", lambda: dict(state))
+        self.builder.collect()
+        state["value"] = 2
+
+        self.assertEqual(self.builder.build()["state"], {"value": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
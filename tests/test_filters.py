@@ -0,0 +1,53 @@
+import unittest
+
+from custom_components.mammotion.filters import StateFilter, StateFilterTracker
+
+
+class TestStateFilterTracker(unittest.TestCase):
+    def setUp(self):
+        self.tracker = StateFilterTracker(StateFilter(deadband=3, hysteresis=2, min_interval=60))
+
+    def test_first_value_is_written(self):
+        self.assertTrue(self.tracker.accept(-70, 0))
+        self.assertEqual(self.tracker.value, -70)
+
+    def test_deadband_suppresses_small_changes(self):
+        self.tracker.accept(-70, 0)
+
+        self.assertFalse(self.tracker.accept(-72, 100))
+        self.assertFalse(self.tracker.accept(-70, 101))
+        self.assertTrue(self.tracker.accept(-74, 102))
+        self.assertEqual(self.tracker.stats, {"written": 2, "suppressed": 1})
+
+    def test_reversal_must_clear_hysteresis(self):
+        self.tracker.accept(-70, 0)
+        self.tracker.accept(-66, 100)
+
+        self.assertFalse(self.tracker.accept(-70, 200))
+        self.assertTrue(self.tracker.accept(-71, 300))
+
+    def test_min_interval_holds_value_back(self):
+        self.tracker.accept(-70, 0)
+
+        self.assertFalse(self.tracker.accept(-80, 10))
+        self.assertTrue(self.tracker.pending)
+        self.assertEqual(self.tracker.retry_in(10), 50)
+        self.assertTrue(self.tracker.accept(-80, 60))
+        self.assertFalse(self.tracker.pending)
+
+    def test_non_numeric_values_skip_deadband(self):
+        self.tracker.accept(None, 0)
+
+        self.assertTrue(self.tracker.accept(-70, 60))
+
+
+class TestStateFilter(unittest.TestCase):
+    def test_scale(self):
+        state_filter = StateFilter(deadband=1, hysteresis=1, min_interval=60)
+
+        self.assertEqual(state_filter.scaled(2), StateFilter(2, 2, 120))
+        self.assertIsNone(state_filter.scaled(0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,20 +1,35 @@
+import asyncio
+import hashlib
+import logging
+import os
 import unittest
-from unittest.mock import MagicMock, patch
+import zlib
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from homeassistant.core import HomeAssistant
+from pymammotion.proto.dev_net import DevNet, DrvDevInfoResp, DrvDevInfoRespId
+from pymammotion.proto.mctrl_ota import GetInfoRsp, MctlOta, OtaInfo
 
 from custom_components.mammotion.firmware import (
+    OTA_INTERVAL,
+    OTA_PROGRESS_INTERVAL,
     MammotionFirmwareUpdateCoordinator,
     MammotionFirmwareUpdateEntity,
 )
 from custom_components.mammotion.coordinator import MammotionDataUpdateCoordinator
 from custom_components.mammotion.error_handling import MammotionErrorHandling
+from simulator import FirmwareTransferError, MammotionFirmwareTransfer
+from simulator.firmware import STATE_DONE, STATE_FAILED
 
 
 class TestMammotionFirmwareUpdate(unittest.TestCase):
     def setUp(self):
         self.hass = MagicMock(spec=HomeAssistant)
         self.coordinator = MagicMock(spec=MammotionDataUpdateCoordinator)
+        self.coordinator.logger = logging.getLogger(__name__)
+        self.coordinator.hass = self.hass
+        self.coordinator.device_name = "Luba-TEST"
         self.firmware_coordinator = MammotionFirmwareUpdateCoordinator(self.hass, self.coordinator)
         self.firmware_entity = MammotionFirmwareUpdateEntity(self.coordinator)
         self.error_handler = MammotionErrorHandling(self.hass)
@@ -27,22 +42,6 @@ class TestMammotionFirmwareUpdate(unittest.TestCase):
         except Exception as error:
             self.error_handler.handle_error(error, "test_check_for_updates")
 
-    @patch("custom_components.mammotion.firmware.MammotionFirmwareUpdateCoordinator.async_download_update")
-    def test_download_update(self, mock_download_update):
-        try:
-            self.hass.async_create_task(self.firmware_coordinator.async_download_update())
-            mock_download_update.assert_called_once()
-        except Exception as error:
-            self.error_handler.handle_error(error, "test_download_update")
-
-    @patch("custom_components.mammotion.firmware.MammotionFirmwareUpdateCoordinator.async_install_update")
-    def test_install_update(self, mock_install_update):
-        try:
-            self.hass.async_create_task(self.firmware_coordinator.async_install_update())
-            mock_install_update.assert_called_once()
-        except Exception as error:
-            self.error_handler.handle_error(error, "test_install_update")
-
     @patch("custom_components.mammotion.firmware.MammotionFirmwareUpdateCoordinator.async_update")
     def test_update(self, mock_update):
         try:
@@ -67,22 +66,6 @@ class TestMammotionFirmwareUpdate(unittest.TestCase):
         except Exception as error:
             self.error_handler.handle_error(error, "test_firmware_entity_check_for_updates")
 
-    @patch("custom_components.mammotion.firmware.MammotionFirmwareUpdateEntity.async_download_update")
-    def test_firmware_entity_download_update(self, mock_firmware_entity_download_update):
-        try:
-            self.hass.async_create_task(self.firmware_entity.async_download_update())
-            mock_firmware_entity_download_update.assert_called_once()
-        except Exception as error:
-            self.error_handler.handle_error(error, "test_firmware_entity_download_update")
-
-    @patch("custom_components.mammotion.firmware.MammotionFirmwareUpdateEntity.async_install_update")
-    def test_firmware_entity_install_update(self, mock_firmware_entity_install_update):
-        try:
-            self.hass.async_create_task(self.firmware_entity.async_install_update())
-            mock_firmware_entity_install_update.assert_called_once()
-        except Exception as error:
-            self.error_handler.handle_error(error, "test_firmware_entity_install_update")
-
     @patch("custom_components.mammotion.firmware.MammotionFirmwareUpdateCoordinator.async_check_for_updates")
     def test_firmware_coordinator_check_for_updates(self, mock_firmware_coordinator_check_for_updates):
         try:
@@ -91,22 +74,6 @@ class TestMammotionFirmwareUpdate(unittest.TestCase):
         except Exception as error:
             self.error_handler.handle_error(error, "test_firmware_coordinator_check_for_updates")
 
-    @patch("custom_components.mammotion.firmware.MammotionFirmwareUpdateCoordinator.async_download_update")
-    def test_firmware_coordinator_download_update(self, mock_firmware_coordinator_download_update):
-        try:
-            self.hass.async_create_task(self.firmware_coordinator.async_download_update())
-            mock_firmware_coordinator_download_update.assert_called_once()
-        except Exception as error:
-            self.error_handler.handle_error(error, "test_firmware_coordinator_download_update")
-
-    @patch("custom_components.mammotion.firmware.MammotionFirmwareUpdateCoordinator.async_install_update")
-    def test_firmware_coordinator_install_update(self, mock_firmware_coordinator_install_update):
-        try:
-            self.hass.async_create_task(self.firmware_coordinator.async_install_update())
-            mock_firmware_coordinator_install_update.assert_called_once()
-        except Exception as error:
-            self.error_handler.handle_error(error, "test_firmware_coordinator_install_update")
-
     @patch("custom_components.mammotion.firmware.MammotionFirmwareUpdateCoordinator.async_update")
     def test_firmware_coordinator_update(self, mock_firmware_coordinator_update):
         try:
@@ -116,5 +83,192 @@ class TestMammotionFirmwareUpdate(unittest.TestCase):
             self.error_handler.handle_error(error, "test_firmware_coordinator_update")
 
 
+class TestMammotionFirmwareOta(unittest.TestCase):
+    def setUp(self):
+        self.hass = MagicMock(spec=HomeAssistant)
+        self.coordinator = MagicMock(spec=MammotionDataUpdateCoordinator)
+        self.coordinator.logger = logging.getLogger(__name__)
+        self.coordinator.hass = self.hass
+        self.coordinator.device_name = "Luba-TEST"
+        self.coordinator.data = SimpleNamespace(net=DevNet(), ota=MctlOta())
+        self.coordinator.async_send_command = AsyncMock()
+        self.firmware_coordinator = MammotionFirmwareUpdateCoordinator(self.hass, self.coordinator)
+        self.firmware_entity = MammotionFirmwareUpdateEntity(
+            self.coordinator, self.firmware_coordinator
+        )
+
+    def _report_ota(self, version="", progress=0):
+        ota = OtaInfo(version=version, progress=progress)
+        self.coordinator.data.ota = MctlOta(toapp_get_info_rsp=GetInfoRsp(ota=ota))
+
+    def test_refresh_requests_ota_info(self):
+        asyncio.run(self.firmware_coordinator._async_update_data())
+
+        self.coordinator.async_send_command.assert_awaited_once_with(
+            "get_device_ota_info", log_type=1
+        )
+
+    def test_polls_faster_while_installing(self):
+        self.assertEqual(self.firmware_coordinator.update_interval, OTA_INTERVAL)
+
+        self._report_ota(progress=40)
+        asyncio.run(self.firmware_coordinator._async_update_data())
+        self.assertEqual(self.firmware_coordinator.update_interval, OTA_PROGRESS_INTERVAL)
+
+        self._report_ota(progress=100)
+        asyncio.run(self.firmware_coordinator._async_update_data())
+        self.assertEqual(self.firmware_coordinator.update_interval, OTA_INTERVAL)
+
+    def test_request_failure_is_handled(self):
+        self.coordinator.async_send_command.side_effect = TimeoutError
+        with patch.object(self.firmware_coordinator.error_handler, "handle_error") as handle_error:
+            asyncio.run(self.firmware_coordinator.async_check_for_updates())
+
+        handle_error.assert_called_once()
+        self.assertEqual(handle_error.call_args.args[1], "async_check_for_updates")
+
+    def test_versions_from_device(self):
+        self.assertIsNone(self.firmware_entity.installed_version)
+
+        devinfo = DrvDevInfoResp(resp_ids=[DrvDevInfoRespId(info="1.10.2.1")])
+        self.coordinator.data.net = DevNet(toapp_devinfo_resp=devinfo)
+        self.assertEqual(self.firmware_entity.installed_version, "1.10.2.1")
+        self.assertEqual(self.firmware_entity.latest_version, "1.10.2.1")
+
+        self._report_ota(version="1.11.0.3")
+        self.assertEqual(self.firmware_entity.latest_version, "1.11.0.3")
+
+    def test_in_progress_follows_device(self):
+        self.assertFalse(self.firmware_entity.in_progress)
+        self._report_ota(progress=55)
+        self.assertEqual(self.firmware_entity.in_progress, 55)
+        self._report_ota(progress=100)
+        self.assertFalse(self.firmware_entity.in_progress)
+
+    def test_entity_keeps_the_schedule_running(self):
+        self.hass.loop = MagicMock()
+        self.assertFalse(self.firmware_coordinator._listeners)
+        with (
+            patch.object(self.firmware_coordinator, "async_request_refresh") as refresh,
+            patch(
+                "homeassistant.helpers.update_coordinator.CoordinatorEntity.async_added_to_hass"
+            ),
+        ):
+            asyncio.run(self.firmware_entity.async_added_to_hass())
+
+        refresh.assert_awaited_once()
+        self.assertEqual(len(self.firmware_coordinator._listeners), 1)
+        self.hass.loop.call_at.assert_called_once()
+
+
+class FakeFirmwareDevice:
+    """Local device accepting chunks, committing only what it acknowledged."""
+
+    def __init__(self, drops=(), rewind_to=None):
+        self.buffer = bytearray()
+        self.committed = 0
+        self.pending = []
+        self.drops = list(drops)
+        self.rewind_to = rewind_to
+        self.opens = 0
+        self.max_in_flight = 0
+
+    async def async_open(self, size):
+        self.opens += 1
+        if self.opens > 1 and self.rewind_to is not None:
+            self.committed = self.rewind_to
+        del self.buffer[self.committed :]
+        self.pending = []
+        return self.committed
+
+    async def async_send_chunk(self, offset, data, crc):
+        if self.drops and offset >= self.drops[0]:
+            self.drops.pop(0)
+            raise TimeoutError("link dropped")
+        assert offset == len(self.buffer), (offset, len(self.buffer))
+        assert zlib.crc32(data) == crc
+        self.buffer.extend(data)
+        self.pending.append(len(self.buffer))
+        self.max_in_flight = max(self.max_in_flight, len(self.pending))
+
+    async def async_wait_ack(self):
+        # Acknowledge half of what is in flight to keep the window moving.
+        count = max(1, len(self.pending) // 2)
+        self.committed = self.pending[count - 1]
+        del self.pending[:count]
+        return self.committed
+
+    async def async_finalize(self, digest):
+        return hashlib.sha256(self.buffer).digest() == digest
+
+
+class TestMammotionFirmwareTransfer(unittest.TestCase):
+    def setUp(self):
+        self.image = os.urandom(10_000)
+        self.progress = []
+
+    def _transfer(self, device, **kwargs):
+        return MammotionFirmwareTransfer(
+            device,
+            self.image,
+            chunk_size=256,
+            window=4,
+            resume_delay=0,
+            progress_callback=self.progress.append,
+            **kwargs,
+        )
+
+    def test_streams_whole_image(self):
+        device = FakeFirmwareDevice()
+        transfer = self._transfer(device)
+        asyncio.run(transfer.async_run())
+
+        self.assertEqual(bytes(device.buffer), self.image)
+        self.assertEqual(transfer.state, STATE_DONE)
+        self.assertEqual(transfer.chunks_sent, 40)
+        self.assertEqual(device.max_in_flight, 4)
+        self.assertEqual(self.progress[-1], 100)
+        self.assertEqual(self.progress, sorted(set(self.progress)))
+
+    def test_resumes_from_committed_offset(self):
+        device = FakeFirmwareDevice(drops=[5000])
+        transfer = self._transfer(device)
+        asyncio.run(transfer.async_run())
+
+        self.assertEqual(bytes(device.buffer), self.image)
+        self.assertEqual(transfer.resumes, 1)
+        self.assertEqual(device.opens, 2)
+        # Only the unacknowledged window is sent twice.
+        self.assertLessEqual(transfer.chunks_sent, 40 + 4)
+
+    def test_rewinds_digest_when_device_lost_data(self):
+        device = FakeFirmwareDevice(drops=[6000], rewind_to=1024)
+        transfer = self._transfer(device)
+        asyncio.run(transfer.async_run())
+
+        self.assertEqual(bytes(device.buffer), self.image)
+        self.assertEqual(transfer.state, STATE_DONE)
+
+    def test_gives_up_after_max_resumes(self):
+        device = FakeFirmwareDevice(drops=[0, 0, 0])
+        transfer = self._transfer(device, max_resumes=2)
+
+        with self.assertRaises(FirmwareTransferError):
+            asyncio.run(transfer.async_run())
+        self.assertEqual(transfer.state, STATE_FAILED)
+
+    def test_checksum_mismatch_fails(self):
+        device = FakeFirmwareDevice()
+
+        async def reject(digest):
+            return False
+
+        device.async_finalize = reject
+        transfer = self._transfer(device)
+        with self.assertRaises(FirmwareTransferError):
+            asyncio.run(transfer.async_run())
+        self.assertEqual(transfer.state, STATE_FAILED)
+
+
 if __name__ == "__main__":
     unittest.main()
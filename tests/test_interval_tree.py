@@ -0,0 +1,48 @@
+import random
+import unittest
+
+from custom_components.mammotion.interval_tree import IntervalTree
+
+
+class TestIntervalTree(unittest.TestCase):
+    def test_overlap_matches_linear_scan(self):
+        rng = random.Random(7)
+        tree = IntervalTree()
+        intervals = []
+        for value in range(500):
+            start = rng.randrange(0, 10000)
+            end = start + rng.randrange(1, 200)
+            tree.insert(start, end, value)
+            intervals.append((start, end, value))
+
+        for _ in range(100):
+            low = rng.randrange(0, 10000)
+            high = low + rng.randrange(1, 500)
+            expected = sorted(
+                interval for interval in intervals if interval[0] < high and interval[1] > low
+            )
+            self.assertEqual(sorted(tree.overlap(low, high)), expected)
+
+    def test_remove(self):
+        tree = IntervalTree()
+        tree.insert(0, 10, "a")
+        tree.insert(0, 5, "b")
+        tree.insert(20, 30, "c")
+
+        self.assertTrue(tree.remove(0, "a"))
+        self.assertFalse(tree.remove(0, "a"))
+        self.assertEqual(len(tree), 2)
+        self.assertEqual(tree.overlap(6, 25), [(20, 30, "c")])
+        self.assertEqual(tree.overlap(0, 1), [(0, 5, "b")])
+
+    def test_half_open_bounds(self):
+        tree = IntervalTree()
+        tree.insert(10, 20, "a")
+
+        self.assertEqual(tree.overlap(0, 10), [])
+        self.assertEqual(tree.overlap(20, 30), [])
+        self.assertEqual(tree.overlap(19, 30), [(10, 20, "a")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from homeassistant.core import HomeAssistant
+from pymammotion.utility.movement import get_percent, transform_both_speeds
+
+from custom_components.mammotion.manual_drive import MammotionManualDrive, movement_speeds
+
+
+class _FakeBle:
+    def __init__(self):
+        self.writes = []
+        self._commands = SimpleNamespace(
+            send_movement=lambda linear_speed, angular_speed: (linear_speed, angular_speed)
+        )
+        self._message = SimpleNamespace(post_custom_data_bytes=self._write)
+
+    async def _ensure_connected(self):
+        pass
+
+    async def _write(self, command):
+        self.writes.append(command)
+
+
+class TestMovementSpeeds(unittest.TestCase):
+    def test_matches_pymammotion_single_axis_moves(self):
+        percent = get_percent(40)
+
+        self.assertEqual(movement_speeds(0.4, 0), transform_both_speeds(90.0, 0.0, percent, 0.0))
+        self.assertEqual(movement_speeds(-0.4, 0), transform_both_speeds(270.0, 0.0, percent, 0.0))
+        self.assertEqual(movement_speeds(0, 0.4), transform_both_speeds(0.0, 0.0, 0.0, percent))
+        self.assertEqual(movement_speeds(0, -0.4), transform_both_speeds(0.0, 180.0, 0.0, percent))
+
+    def test_combines_and_clamps_axes(self):
+        self.assertEqual(movement_speeds(2, -2), (850, -382))
+        self.assertEqual(movement_speeds(0.1, 0.1), (0, 0))
+
+
+class TestMammotionManualDrive(unittest.TestCase):
+    def setUp(self):
+        self.hass = MagicMock(spec=HomeAssistant)
+        self.hass.async_create_background_task = lambda coro, name: asyncio.ensure_future(coro)
+        self.ble = _FakeBle()
+        self.released = []
+        device = SimpleNamespace(ble=lambda: self.ble)
+        self.coordinator = SimpleNamespace(
+            device_name="Luba-TEST",
+            manager=SimpleNamespace(get_device_by_name=lambda name: device),
+            connection=SimpleNamespace(
+                async_hold=lambda reason: lambda: self.released.append(reason)
+            ),
+            ble_reachable=True,
+        )
+        self.drive = MammotionManualDrive(self.hass, self.coordinator)
+
+    def test_latest_setpoint_wins_and_stream_timeout_stops(self):
+        async def run():
+            self.drive.async_setpoint(0.5, 0)
+            await asyncio.sleep(0.01)
+            for linear in (0.6, 0.7, 0.8):
+                self.drive.async_setpoint(linear, 0)
+            await asyncio.sleep(0.2)
+            self.assertTrue(self.drive.active)
+            await asyncio.sleep(0.6)
+
+        with patch("custom_components.mammotion.manual_drive.CONTROL_RATE", 20):
+            asyncio.run(run())
+
+        stats = self.drive.stats
+        self.assertEqual(self.ble.writes[0], movement_speeds(0.5, 0))
+        self.assertNotIn(movement_speeds(0.6, 0), self.ble.writes)
+        self.assertIn(movement_speeds(0.8, 0), self.ble.writes)
+        self.assertEqual(self.ble.writes[-1], (0, 0))
+        self.assertEqual(stats.coalesced, 2)
+        self.assertEqual(stats.timeouts, 1)
+        self.assertLess(stats.max_latency_ms, 200)
+        self.assertFalse(self.drive.active)
+        self.assertEqual(self.released, ["manual"])
+
+    def test_stop_sends_zero(self):
+        async def run():
+            self.drive.async_setpoint(0.5, 0.5)
+            await asyncio.sleep(0.01)
+            await self.drive.async_stop()
+
+        asyncio.run(run())
+
+        self.assertEqual(self.ble.writes[-1], (0, 0))
+        self.assertEqual(self.drive.stats.timeouts, 0)
+        self.assertEqual(self.released, ["manual"])
+
+    def test_falls_back_to_the_coordinator_without_bluetooth(self):
+        sent = []
+
+        async def send_command(command, **kwargs):
+            sent.append((command, kwargs))
+
+        self.coordinator.ble_reachable = False
+        self.coordinator.async_send_command = send_command
+
+        async def run():
+            self.drive.async_setpoint(-0.5, 0)
+            await asyncio.sleep(0.01)
+            await self.drive.async_stop()
+
+        asyncio.run(run())
+
+        self.assertEqual(sent[0], ("send_movement", {"linear_speed": -350, "angular_speed": 0}))
+        self.assertEqual(self.ble.writes, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
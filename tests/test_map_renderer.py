@@ -0,0 +1,86 @@
+import unittest
+
+import numpy as np
+
+from pymammotion.data.model.device import MowingDevice
+from pymammotion.proto.common import CommDataCouple
+from pymammotion.proto.mctrl_nav import NavGetCommDataAck
+
+from custom_components.mammotion.map_renderer import (
+    MammotionMapRenderer,
+    map_key,
+    map_layers,
+)
+
+
+def _square(hash_id: int, map_type: int) -> NavGetCommDataAck:
+    return NavGetCommDataAck(
+        type=map_type,
+        hash=hash_id,
+        total_frame=1,
+        current_frame=1,
+        data_couple=[
+            CommDataCouple(x=0, y=0),
+            CommDataCouple(x=10, y=0),
+            CommDataCouple(x=10, y=5),
+            CommDataCouple(x=0, y=5),
+        ],
+    )
+
+
+class TestMammotionMapRenderer(unittest.TestCase):
+    def setUp(self):
+        self.mower = MowingDevice()
+        self.mower.map.update(_square(1, 0))
+        self.mower.map.update(_square(2, 1))
+        self.mower.map.hashlist = [1, 2]
+        self.renderer = MammotionMapRenderer(max_size=256)
+
+    def test_base_layer_is_cached(self):
+        key = map_key(self.mower.map)
+        self.renderer.render(key, map_layers(self.mower.map), None, (1.0, 1.0, 0.0))
+        self.renderer.render(key, None, None, (2.0, 1.0, 0.0))
+
+        self.assertEqual(self.renderer.cache_misses, 1)
+        self.assertEqual(self.renderer.cache_hits, 1)
+        self.assertEqual(self.renderer.renders, 2)
+
+    def test_unchanged_pose_reuses_image(self):
+        key = map_key(self.mower.map)
+        first = self.renderer.render(key, map_layers(self.mower.map), None, (1.0, 1.0, 0.0))
+        second = self.renderer.render(key, None, None, (1.0, 1.0, 0.0))
+
+        self.assertIs(first, second)
+        self.assertEqual(self.renderer.overlay_hits, 1)
+        self.assertTrue(first.startswith(b"\x89PNG"))
+
+    def test_new_hash_list_rebuilds_base(self):
+        key = map_key(self.mower.map)
+        self.renderer.render(key, map_layers(self.mower.map), None, None)
+
+        self.mower.map.update(_square(3, 0))
+        self.mower.map.hashlist = [1, 2, 3]
+        new_key = map_key(self.mower.map)
+        self.assertNotEqual(key, new_key)
+
+        self.renderer.render(new_key, map_layers(self.mower.map), None, None)
+        self.assertEqual(self.renderer.cache_misses, 2)
+        self.assertEqual(self.renderer.base_key, new_key)
+
+    def test_new_route_redraws_overlay(self):
+        key = map_key(self.mower.map)
+        route = np.array([[1.0, 1.0], [9.0, 1.0], [9.0, 2.0]])
+        plain = self.renderer.render(key, map_layers(self.mower.map), None, None)
+        previewed = self.renderer.render(key, None, None, None, route)
+        again = self.renderer.render(key, None, None, None, route)
+
+        self.assertNotEqual(plain, previewed)
+        self.assertIs(previewed, again)
+
+    def test_missing_layers_for_new_key(self):
+        with self.assertRaises(ValueError):
+            self.renderer.render(map_key(self.mower.map), None, None, None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from homeassistant.core import HomeAssistant
+from pymammotion.data.model.device import MowingDevice
+from pymammotion.proto.common import CommDataCouple
+from pymammotion.proto.mctrl_nav import NavGetCommDataAck
+
+from custom_components.mammotion.map_renderer import MammotionMapRenderer
+from custom_components.mammotion.memory import (
+    MammotionMemoryTracer,
+    measure_snapshot,
+    retained_size,
+    snapshot_coordinator,
+)
+from custom_components.mammotion.plans import MammotionPlanCache
+
+
+def _mower(frames: int) -> MowingDevice:
+    mower = MowingDevice()
+    mower.map.area[1] = [
+        NavGetCommDataAck(
+            hash=1,
+            total_frame=frames,
+            current_frame=frame,
+            data_couple=[CommDataCouple(x=float(i), y=float(i)) for i in range(50)],
+        )
+        for frame in range(1, frames + 1)
+    ]
+    return mower
+
+
+def _coordinator(mower: MowingDevice, *stale: MowingDevice) -> SimpleNamespace:
+    states = iter(stale)
+    transport = lambda: SimpleNamespace(  # noqa: E731
+        state_manager=SimpleNamespace(get_device=lambda: next(states, mower))
+    )
+    device = SimpleNamespace(mower_state=mower, ble=transport, cloud=transport)
+    return SimpleNamespace(
+        data=mower,
+        device_name="Luba-TEST",
+        manager=SimpleNamespace(get_device_by_name=lambda name: device),
+        plans=MammotionPlanCache(),
+        _plan_store=None,
+        map_renderer=MammotionMapRenderer(),
+        capture=None,
+        callback_monitor=None,
+    )
+
+
+class TestRetainedSize(unittest.TestCase):
+    def test_counts_shared_objects_once(self):
+        payload = ["x" * 1000]
+        seen = set()
+
+        first = retained_size({"a": payload}, seen)
+        second = retained_size({"b": payload}, seen)
+
+        self.assertGreater(first, 1000)
+        self.assertLess(second, 1000)
+
+    def test_follows_dataclasses_and_skips_classes(self):
+        self.assertGreater(retained_size(_mower(10)), retained_size(_mower(1)))
+        self.assertEqual(retained_size(MowingDevice), 0)
+
+    def test_stops_at_home_assistant(self):
+        hass = MagicMock(spec=HomeAssistant)
+        hass.data = {"other": ["x" * 100000]}
+
+        self.assertLess(retained_size(SimpleNamespace(hass=hass)), 1000)
+
+
+def _measure(coordinator: SimpleNamespace, **kwargs) -> dict:
+    return measure_snapshot(snapshot_coordinator(coordinator), **kwargs)
+
+
+class TestMeasureSnapshot(unittest.TestCase):
+    def test_attributes_map_and_counts_stale_states(self):
+        mower = _mower(20)
+
+        single = _measure(_coordinator(mower))
+        stale = _measure(_coordinator(mower, _mower(5)))
+
+        self.assertEqual(single["mower_states"], 1)
+        self.assertEqual(single["bytes"]["stale_mower_states"], 0)
+        self.assertGreater(single["bytes"]["map"], single["bytes"]["report_data"])
+        self.assertEqual(single["total_bytes"], sum(single["bytes"].values()))
+        self.assertEqual(stale["mower_states"], 2)
+        self.assertGreater(stale["bytes"]["stale_mower_states"], 0)
+
+    def test_debug_counts_only_buffers(self):
+        coordinator = _coordinator(_mower(1))
+        coordinator.capture = SimpleNamespace(_pending=bytearray(50000), path="x" * 100000)
+        coordinator.callback_monitor = SimpleNamespace(
+            timings={}, _coordinator=SimpleNamespace(data=["x" * 100000])
+        )
+
+        debug = _measure(coordinator)["bytes"]["debug"]
+
+        self.assertGreater(debug, 50000)
+        self.assertLess(debug, 60000)
+
+    def test_snapshot_is_not_changed_by_later_updates(self):
+        mower = _mower(20)
+        snapshot = snapshot_coordinator(_coordinator(mower))
+        before = measure_snapshot(snapshot_coordinator(_coordinator(mower)))
+
+        mower.map.area[2] = list(mower.map.area[1])
+        mower.map.area[1].clear()
+
+        self.assertEqual(measure_snapshot(snapshot)["bytes"]["map"], before["bytes"]["map"])
+
+    def test_walk_is_bounded(self):
+        result = _measure(_coordinator(_mower(20)), limit=100)
+
+        self.assertFalse(result["complete"])
+        self.assertEqual(result["objects"], 100)
+        self.assertTrue(_measure(_coordinator(_mower(20)))["complete"])
+
+
+class TestMammotionMemoryTracer(unittest.TestCase):
+    def test_diffs_consecutive_snapshots(self):
+        tracer = MammotionMemoryTracer()
+        try:
+            self.assertIsNone(tracer.take())
+            retained = [bytearray(1024) for _ in range(200)]
+            diff = tracer.take()
+        finally:
+            tracer.stop()
+
+        self.assertGreater(diff["size_diff"], 200 * 1024)
+        self.assertTrue(any(__file__ in line["where"] for line in diff["top"]))
+        self.assertFalse(tracer.stats["tracing"])
+        self.assertEqual(tracer.stats["snapshots"], 2)
+        self.assertIs(tracer.stats["diff"], diff)
+        self.assertEqual(len(retained), 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import unittest
+from datetime import datetime, timedelta
+
+import betterproto
+from homeassistant.util import dt as dt_util
+from pymammotion.proto.mctrl_nav import NavPlanJobSet
+
+from custom_components.mammotion.plans import (
+    PLAN_SYNC_INTERVAL,
+    PLAN_SYNC_TIMEOUT,
+    MammotionPlanCache,
+)
+
+
+def _plan(plan_id: str, index: int, total: int, **kwargs) -> dict:
+    return NavPlanJobSet(
+        plan_id=plan_id,
+        plan_index=index,
+        total_plan_num=total,
+        start_time="08:00",
+        required_time=90,
+        **kwargs,
+    ).to_dict(casing=betterproto.Casing.SNAKE)
+
+
+class TestMammotionPlanCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = MammotionPlanCache()
+        self.now = dt_util.utcnow()
+        # 2024-06-03 is a Monday.
+        self.monday = datetime(2024, 6, 3, tzinfo=dt_util.get_default_time_zone())
+
+    def _sync(self, raw: dict) -> int | None:
+        self.cache.begin_sync(self.now)
+        return self.cache.handle(raw)
+
+    def test_sync_walks_every_index(self):
+        self.cache.begin_sync(self.now)
+
+        self.assertEqual(self.cache.handle(_plan("a", 0, 2, weeks=[1])), 1)
+        self.assertIsNone(self.cache.handle(_plan("b", 1, 2, weeks=[3])))
+        self.assertEqual(set(self.cache.plans), {"a", "b"})
+        self.assertFalse(self.cache.sync_due(self.now))
+
+    def test_same_reply_is_ignored(self):
+        raw = _plan("a", 0, 1, weeks=[1])
+        self._sync(raw)
+        version = self.cache.version
+
+        self.assertIsNone(self.cache.handle(raw))
+        self.assertEqual(self.cache.version, version)
+
+    def test_unchanged_plan_keeps_cached_entry(self):
+        self._sync(_plan("a", 0, 1, weeks=[1], start_date="2024-06-01"))
+        cached = self.cache.plans["a"]
+        cached.occurrences(self.monday, self.monday + timedelta(days=7))
+        version = self.cache.version
+
+        self._sync(_plan("a", 0, 1, weeks=[1], start_date="2024-06-01"))
+        self.assertIs(self.cache.plans["a"], cached)
+        self.assertEqual(self.cache.version, version)
+
+        self._sync(_plan("a", 0, 1, weeks=[2], start_date="2024-06-01"))
+        self.assertIsNot(self.cache.plans["a"], cached)
+        self.assertGreater(self.cache.version, version)
+
+    def test_status_fields_do_not_change_the_digest(self):
+        self._sync(_plan("a", 0, 1, weeks=[1], version="3", remained_seconds=600))
+        cached = self.cache.plans["a"]
+
+        self.cache.begin_sync(self.now)
+        self.cache.handle(_plan("b", 0, 2, weeks=[1]))
+        self.cache.handle(_plan("a", 1, 2, weeks=[1], version="3", remained_seconds=120))
+        self.assertIs(self.cache.plans["a"], cached)
+
+        self._sync(_plan("a", 0, 1, weeks=[1], version="4", remained_seconds=120))
+        self.assertIsNot(self.cache.plans["a"], cached)
+
+    def test_sync_drops_deleted_plans(self):
+        self.cache.begin_sync(self.now)
+        self.cache.handle(_plan("a", 0, 2, weeks=[1]))
+        self.cache.handle(_plan("b", 1, 2, weeks=[1]))
+
+        self.cache.begin_sync(self.now)
+        self.cache.handle(_plan("b", 0, 1, weeks=[1]))
+        self.assertEqual(set(self.cache.plans), {"b"})
+
+    def test_reply_outside_a_sync_is_ignored(self):
+        self.assertIsNone(self.cache.handle(_plan("a", 0, 2, weeks=[1])))
+        self.assertEqual(self.cache.plans, {})
+
+    def test_stalled_sync_expires(self):
+        self.cache.begin_sync(self.now)
+        self.cache.handle(_plan("a", 0, 2, weeks=[1]))
+
+        self.assertFalse(self.cache.sync_due(self.now + PLAN_SYNC_TIMEOUT))
+        self.assertIsNone(self.cache.handle(_plan("b", 1, 2, weeks=[1])))
+        self.assertEqual(set(self.cache.plans), {"a"})
+        self.assertTrue(self.cache.sync_due(self.now + PLAN_SYNC_INTERVAL))
+
+    def test_weekly_plan_expands_only_requested_window(self):
+        self._sync(
+            _plan("a", 0, 1, weeks=[1, 3], start_date="2024-06-01", task_name="Front")
+        )
+
+        events = self.cache.events(self.monday, self.monday + timedelta(days=7))
+        self.assertEqual(
+            [start.weekday() for start, _, _ in events], [0, 2]
+        )
+        start, end, plan = events[0]
+        self.assertEqual(start, self.monday.replace(hour=8))
+        self.assertEqual(end - start, timedelta(minutes=90))
+        self.assertEqual(plan.name, "Front")
+        self.assertIs(
+            self.cache.events(self.monday, self.monday + timedelta(days=7)), events
+        )
+
+    def test_restore_round_trip(self):
+        self._sync(_plan("a", 0, 1, weeks=[1], start_date="2024-06-01"))
+
+        restored = MammotionPlanCache()
+        restored.restore(self.cache.as_dict())
+        self.assertEqual(restored.plans["a"].digest, self.cache.plans["a"].digest)
+        self.assertEqual(
+            len(restored.events(self.monday, self.monday + timedelta(days=14))), 2
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
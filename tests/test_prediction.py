@@ -0,0 +1,102 @@
+import dataclasses
+import unittest
+from datetime import UTC, datetime, timedelta
+
+from pymammotion.data.model.device import MowingDevice
+from pymammotion.utility.constant.device_constant import WorkMode
+
+from custom_components.mammotion.prediction import MAX_ZONES, JobPredictor, RateEstimator
+from custom_components.mammotion.snapshot import MowerSnapshot
+
+START = datetime(2024, 6, 1, 10, 0, tzinfo=UTC)
+
+
+def _snapshot(progress, battery, status=WorkMode.MODE_WORKING, charging=0, zone=1):
+    return dataclasses.replace(
+        MowerSnapshot.from_mower(MowingDevice(), 1),
+        reported=True,
+        reported_sys_status=status,
+        charge_state=charging,
+        work_area=(progress << 16) | 1000,
+        battery_val=battery,
+        work_zone=zone,
+    )
+
+
+class TestRateEstimator(unittest.TestCase):
+    def test_first_step_only_aligns(self):
+        estimator = RateEstimator()
+        estimator.observe(10, 0)
+
+        self.assertIsNone(estimator.observe(11, 30))
+        self.assertEqual(estimator.observe(12, 60), 1 / 60)
+        self.assertEqual(estimator.observe(12, 30), None)
+        self.assertEqual(estimator.observe(13, 30), 1 / 60)
+        self.assertEqual(estimator.rate, 1 / 60)
+
+
+class TestJobPredictor(unittest.TestCase):
+    def setUp(self):
+        self.predictor = JobPredictor()
+
+    def _run(self, minutes, progress, battery, **kwargs):
+        return self.predictor.update(
+            _snapshot(progress, battery, **kwargs), START + timedelta(minutes=minutes)
+        )
+
+    def test_finishes_on_one_charge(self):
+        # One percent of the job a minute, one percent of battery every two.
+        for minute in range(11):
+            prediction = self._run(minute, 10 + minute, 90 - minute // 2)
+
+        self.assertEqual(prediction.time_left, 80)
+        self.assertEqual(prediction.battery_runtime, 140)
+        self.assertEqual(prediction.finish_at, START + timedelta(minutes=90))
+        self.assertEqual(prediction.return_at, prediction.finish_at)
+
+    def test_plans_a_recharge_when_the_battery_runs_out(self):
+        self.predictor.charge.rate = 1 / 60
+        for minute in range(11):
+            prediction = self._run(minute, 10 + minute, 40 - minute)
+
+        self.assertEqual(prediction.battery_runtime, 15)
+        self.assertEqual(prediction.return_at, START + timedelta(minutes=25))
+        # 80 minutes of work, 80 minutes per charge, one 80 minute recharge.
+        self.assertEqual(prediction.finish_at, START + timedelta(minutes=10 + 80 + 80))
+
+    def test_zone_rate_carries_over_to_a_new_job(self):
+        for minute in range(5):
+            self._run(minute, 10 + minute, 90)
+        prediction = self._run(6, 1, 90, status=WorkMode.MODE_WORKING)
+
+        self.assertIsNone(self.predictor.progress.rate)
+        self.assertEqual(prediction.time_left, 99)
+
+    def test_no_job_only_reports_runtime(self):
+        self.predictor.drain.rate = 1 / 60
+
+        prediction = self._run(0, 0, 75, status=WorkMode.MODE_READY)
+
+        self.assertEqual(prediction.battery_runtime, 60)
+        self.assertIsNone(prediction.finish_at)
+
+    def test_zone_rates_are_bounded(self):
+        for zone in range(MAX_ZONES + 5):
+            self.predictor._learn_area(zone, 1.0)
+
+        self.assertEqual(len(self.predictor.zone_rates), MAX_ZONES)
+        self.assertNotIn(0, self.predictor.zone_rates)
+
+    def test_restores_learned_rates(self):
+        self.predictor.drain.rate = 0.01
+        self.predictor._learn_area(7, 2.0)
+
+        restored = JobPredictor()
+        restored.restore(self.predictor.as_dict())
+
+        self.assertEqual(restored.drain.rate, 0.01)
+        self.assertEqual(restored.zone_rates, {7: 2.0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import asyncio
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.mammotion.profiling import (
+    PROFILE_CPROFILE,
+    PROFILE_SAMPLER,
+    MammotionCallbackMonitor,
+    async_profile,
+)
+
+
+async def _executor_job(func, *args):
+    return func(*args)
+
+
+class _FakeCoordinator(SimpleNamespace):
+    def async_update_listeners(self):
+        raise AssertionError("monitor should replace the stock listeners")
+
+
+def _coordinator(listeners, handler):
+    state_manager = SimpleNamespace(on_notification_callback=handler)
+    device = SimpleNamespace(
+        ble=lambda: SimpleNamespace(state_manager=state_manager),
+        cloud=lambda: None,
+    )
+    coordinator = _FakeCoordinator(
+        _listeners={index: (listener, None) for index, listener in enumerate(listeners)},
+        device_name="Luba-TEST",
+        manager=SimpleNamespace(get_device_by_name=lambda name: device),
+    )
+    return coordinator, state_manager
+
+
+class TestMammotionCallbackMonitor(unittest.TestCase):
+    def test_times_listeners_and_notifications(self):
+        calls = []
+
+        def _slow():
+            time.sleep(0.02)
+            calls.append("slow")
+
+        async def _notification():
+            calls.append("notification")
+
+        coordinator, state_manager = _coordinator(
+            [_slow, lambda: calls.append("fast")], _notification
+        )
+        monitor = MammotionCallbackMonitor(threshold=0.01)
+        monitor.attach(coordinator)
+
+        with self.assertLogs(level="WARNING") as logs:
+            coordinator.async_update_listeners()
+        asyncio.run(state_manager.on_notification_callback())
+
+        self.assertEqual(calls, ["slow", "fast", "notification"])
+        self.assertEqual(len(logs.output), 1)
+        stats = monitor.stats["callbacks"]
+        slowest, timing = next(iter(stats.items()))
+        self.assertTrue(slowest.endswith("._slow"))
+        self.assertEqual(timing["slow"], 1)
+        self.assertEqual(stats["notification (ble)"]["count"], 1)
+
+        monitor.detach()
+
+        self.assertNotIn("async_update_listeners", vars(coordinator))
+        self.assertIs(state_manager.on_notification_callback, _notification)
+
+
+class TestAsyncProfile(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.hass = MagicMock(spec=HomeAssistant)
+        self.hass.async_add_executor_job = _executor_job
+        self.hass.config = MagicMock()
+        self.hass.config.path = lambda name: str(Path(self.tmp.name) / name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_cprofile_writes_stats_and_report(self):
+        path = asyncio.run(async_profile(self.hass, 0.05, PROFILE_CPROFILE))
+
+        self.assertEqual(path.suffix, ".prof")
+        self.assertTrue(path.exists())
+        self.assertTrue(path.with_suffix(".txt").exists())
+
+    def test_sampler_writes_folded_stacks(self):
+        path = asyncio.run(async_profile(self.hass, 0.05, PROFILE_SAMPLER))
+
+        self.assertEqual(path.suffix, ".folded")
+        self.assertTrue(path.read_text().startswith("# samples "))
+
+
+if __name__ == "__main__":
+    unittest.main()
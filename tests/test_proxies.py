@@ -0,0 +1,95 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.mammotion.proxies import MammotionProxySelector
+
+
+def _heard(source: str, rssi: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        scanner=SimpleNamespace(source=source),
+        ble_device=SimpleNamespace(address="AA:BB", name=source),
+        advertisement=SimpleNamespace(rssi=rssi),
+    )
+
+
+class TestMammotionProxySelector(unittest.TestCase):
+    def setUp(self):
+        self.heard = []
+        bluetooth = SimpleNamespace(async_scanner_devices_by_address=lambda *a, **k: self.heard)
+        patcher = patch("custom_components.mammotion.proxies.bluetooth", bluetooth)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.selector = MammotionProxySelector(MagicMock(spec=HomeAssistant))
+        self.selector.address = "AA:BB"
+
+    def test_prefers_the_strongest_source(self):
+        self.heard = [_heard("shed", -90), _heard("porch", -60)]
+        self.selector.async_refresh()
+
+        self.assertEqual(self.selector.current, "porch")
+        self.assertEqual(self.selector.device().name, "porch")
+
+    def test_migrates_only_past_the_margin(self):
+        self.heard = [_heard("shed", -70), _heard("porch", -60)]
+        self.selector.async_refresh()
+        self.heard = [_heard("shed", -55), _heard("porch", -60)]
+        self.selector.async_refresh()
+
+        self.assertEqual(self.selector.current, "porch")
+
+        for _ in range(5):
+            self.heard = [_heard("shed", -50), _heard("porch", -85)]
+            self.selector.async_refresh()
+
+        self.assertEqual(self.selector.current, "shed")
+        self.assertEqual(self.selector.migrations, 1)
+
+    def test_leaves_a_source_that_disappeared(self):
+        self.heard = [_heard("shed", -90), _heard("porch", -60)]
+        self.selector.async_refresh()
+        self.heard = [_heard("shed", -90)]
+        self.selector.async_refresh()
+
+        self.assertEqual(self.selector.current, "shed")
+        self.assertFalse(self.selector.stats["sources"]["porch"]["present"])
+
+    def test_presence_and_device_changes(self):
+        published = []
+        self.selector._on_device = published.append
+        porch = _heard("porch", -60)
+        self.heard = [porch]
+        self.selector._async_advertisement(None, None)
+        self.selector._async_advertisement(None, None)
+        self.selector.async_refresh()
+
+        self.assertTrue(self.selector.reachable)
+        self.assertEqual(published, [porch.ble_device])
+
+        self.selector._async_unavailable(None)
+
+        self.assertFalse(self.selector.reachable)
+
+        self.heard = [_heard("porch", -60)]
+        self.selector._async_advertisement(None, None)
+
+        self.assertTrue(self.selector.reachable)
+        self.assertEqual(len(published), 2)
+
+    def test_failing_sources_are_penalised(self):
+        self.heard = [_heard("shed", -70), _heard("porch", -60)]
+        self.selector.async_refresh()
+        for _ in range(4):
+            self.selector.record_connect(False, 0)
+        self.selector.async_refresh()
+
+        stats = self.selector.stats
+        self.assertEqual(self.selector.current, "shed")
+        self.assertEqual(stats["sources"]["porch"]["success_rate"], 0)
+        self.assertIsNone(stats["sources"]["porch"]["connect_ms_avg"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from homeassistant.core import HomeAssistant
+from pymammotion.data.model.device import MowingDevice
+from pymammotion.data.model.device_config import OperationSettings
+from pymammotion.proto.common import CommDataCouple
+from pymammotion.proto.mctrl_nav import NavGetCommDataAck
+
+from custom_components.mammotion.route_preview import (
+    TURN_SECONDS,
+    MammotionRoutePlanner,
+    RouteSettings,
+    plan_route,
+)
+
+
+def _shape(hash_id, map_type, points):
+    return NavGetCommDataAck(
+        type=map_type,
+        hash=hash_id,
+        total_frame=1,
+        current_frame=1,
+        data_couple=[CommDataCouple(x=x, y=y) for x, y in points],
+    )
+
+
+RECTANGLE = [(0, 0), (10, 0), (10, 5), (0, 5)]
+OBSTACLE = [(4, 2), (6, 2), (6, 3), (4, 3)]
+
+
+def _settings(**changes):
+    values = dict(
+        areas=(1,), channel_width=0.25, speed=0.5, toward=0, border_laps=0, obstacle_laps=0
+    )
+    return RouteSettings(**(values | changes))
+
+
+class TestPlanRoute(unittest.TestCase):
+    def test_stripes_follow_the_heading(self):
+        frames = [_shape(1, 0, RECTANGLE)]
+
+        along = plan_route([frames], [], _settings())
+        across = plan_route([frames], [], _settings(toward=90))
+
+        # 20 stripes of 10 m or 40 of 5 m, joined by one channel width each.
+        self.assertEqual((along.turns, round(along.length, 2)), (19, 204.75))
+        self.assertEqual((across.turns, round(across.length, 2)), (39, 209.75))
+        self.assertAlmostEqual(along.duration, along.length / 0.5 + 19 * TURN_SECONDS)
+        self.assertEqual(along.path.shape, (40, 2))
+        self.assertAlmostEqual(along.area, 50)
+
+    def test_alternates_direction(self):
+        estimate = plan_route([[_shape(1, 0, RECTANGLE)]], [], _settings())
+
+        self.assertEqual(
+            estimate.path[:4].tolist(), [[0, 0.125], [10, 0.125], [10, 0.375], [0, 0.375]]
+        )
+
+    def test_obstacles_inside_split_stripes(self):
+        frames = [_shape(1, 0, RECTANGLE)]
+        inside = [_shape(2, 1, OBSTACLE)]
+        outside = [_shape(3, 1, [(20, 20), (21, 20), (21, 21)])]
+
+        plain = plan_route([frames], [], _settings())
+        carved = plan_route([frames], [inside, outside], _settings())
+
+        self.assertEqual(carved.turns, plain.turns + 4)
+        self.assertAlmostEqual(carved.area, 48)
+
+    def test_border_laps_inset_the_stripes(self):
+        estimate = plan_route([[_shape(1, 0, RECTANGLE)]], [], _settings(border_laps=2))
+
+        self.assertEqual(estimate.path[:, 1].min(), 0.625)
+        self.assertEqual(estimate.path[:, 0].min(), 0.5)
+
+
+class TestMammotionRoutePlanner(unittest.TestCase):
+    def setUp(self):
+        async def executor(func, *args):
+            return func(*args)
+
+        hass = MagicMock(spec=HomeAssistant)
+        hass.async_add_executor_job = executor
+        mower = MowingDevice()
+        mower.map.update(_shape(1, 0, RECTANGLE))
+        mower.map.hashlist = [1]
+        self.mower = mower
+        self.coordinator = SimpleNamespace(data=mower)
+        self.planner = MammotionRoutePlanner(hass, self.coordinator)
+        self.redraws = MagicMock()
+        self.planner.async_add_preview_listener(self.redraws)
+
+    def test_cached_by_areas_and_settings(self):
+        settings = OperationSettings(areas=[1])
+
+        async def run():
+            first = await self.planner.async_estimate(settings)
+            second = await self.planner.async_estimate(OperationSettings(areas=[1]))
+            wider = await self.planner.async_estimate(
+                OperationSettings(areas=[1], channel_width=35)
+            )
+            return first, second, wider
+
+        first, second, wider = asyncio.run(run())
+
+        self.assertIs(first, second)
+        self.assertLess(wider.length, first.length)
+        self.assertEqual((self.planner.cache_hits, self.planner.cache_misses), (1, 2))
+        self.assertIs(self.planner.preview, wider)
+        self.assertEqual(self.redraws.call_count, 2)
+
+    def test_no_estimate_before_the_first_update(self):
+        self.coordinator.data = None
+
+        estimate = asyncio.run(self.planner.async_estimate(OperationSettings(areas=[1])))
+
+        self.assertIsNone(estimate)
+        self.assertEqual(self.planner.cache_misses, 0)
+
+    def test_map_change_drops_the_cache(self):
+        settings = OperationSettings(areas=[1])
+        asyncio.run(self.planner.async_estimate(settings))
+
+        self.mower.map.update(_shape(2, 0, RECTANGLE))
+        self.mower.map.hashlist = [1, 2]
+        asyncio.run(self.planner.async_estimate(settings))
+
+        self.assertEqual(self.planner.cache_misses, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
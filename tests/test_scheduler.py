@@ -1,140 +1,211 @@
 import unittest
-from datetime import datetime, timedelta
+from datetime import timedelta
 from unittest.mock import MagicMock, patch
 
 from homeassistant.core import HomeAssistant
 from homeassistant.util.dt import utcnow
 
-from custom_components.mammotion.scheduler import MammotionScheduler
 from custom_components.mammotion.coordinator import MammotionDataUpdateCoordinator
-from custom_components.mammotion.error_handling import MammotionErrorHandling
+from custom_components.mammotion.scheduler import (
+    CONFLICT_MERGE,
+    END_OF_TIME,
+    MammotionSchedule,
+    MammotionScheduler,
+    ScheduleConflictError,
+)
 
 
 class TestMammotionScheduler(unittest.TestCase):
     def setUp(self):
         self.hass = MagicMock(spec=HomeAssistant)
         self.coordinator = MagicMock(spec=MammotionDataUpdateCoordinator)
+        self.coordinator.device_name = "Luba-TEST"
+
+        store_patcher = patch("custom_components.mammotion.scheduler.Store")
+        self.store = store_patcher.start().return_value
+        self.addCleanup(store_patcher.stop)
+
+        track_patcher = patch(
+            "custom_components.mammotion.scheduler.async_track_point_in_utc_time"
+        )
+        self.track = track_patcher.start()
+        self.addCleanup(track_patcher.stop)
+
         self.scheduler = MammotionScheduler(self.hass, self.coordinator)
-        self.error_handler = MammotionErrorHandling(self.hass)
+        self.start_time = (utcnow() + timedelta(minutes=1)).replace(microsecond=0)
+        self.end_time = self.start_time + timedelta(minutes=30)
 
     def test_add_schedule(self):
-        start_time = utcnow() + timedelta(seconds=1)
-        end_time = start_time + timedelta(minutes=30)
-        task = "start_mowing"
-        kwargs = {"area": "front_yard"}
-
-        try:
-            self.scheduler.add_schedule(start_time, end_time, task, **kwargs)
-            self.assertEqual(len(self.scheduler.schedules), 1)
-            self.assertEqual(self.scheduler.schedules[0]["task"], task)
-            self.assertEqual(self.scheduler.schedules[0]["kwargs"], kwargs)
-        except Exception as error:
-            self.error_handler.handle_error(error, "test_add_schedule")
-
-    def test_remove_schedule(self):
-        start_time = utcnow() + timedelta(seconds=1)
-        end_time = start_time + timedelta(minutes=30)
-        task = "start_mowing"
-        kwargs = {"area": "front_yard"}
-
-        try:
-            self.scheduler.add_schedule(start_time, end_time, task, **kwargs)
-            self.scheduler.remove_schedule(0)
-            self.assertEqual(len(self.scheduler.schedules), 0)
-        except Exception as error:
-            self.error_handler.handle_error(error, "test_remove_schedule")
-
-    def test_modify_schedule(self):
-        start_time = utcnow() + timedelta(seconds=1)
-        end_time = start_time + timedelta(minutes=30)
-        task = "start_mowing"
-        kwargs = {"area": "front_yard"}
-
-        try:
-            self.scheduler.add_schedule(start_time, end_time, task, **kwargs)
-            new_start_time = start_time + timedelta(minutes=10)
-            new_end_time = end_time + timedelta(minutes=10)
-            new_task = "stop_mowing"
-            new_kwargs = {"area": "back_yard"}
-
-            self.scheduler.modify_schedule(0, new_start_time, new_end_time, new_task, **new_kwargs)
-            self.assertEqual(self.scheduler.schedules[0]["start_time"], new_start_time)
-            self.assertEqual(self.scheduler.schedules[0]["end_time"], new_end_time)
-            self.assertEqual(self.scheduler.schedules[0]["task"], new_task)
-            self.assertEqual(self.scheduler.schedules[0]["kwargs"], new_kwargs)
-        except Exception as error:
-            self.error_handler.handle_error(error, "test_modify_schedule")
-
-    @patch("custom_components.mammotion.scheduler.async_track_point_in_utc_time")
-    def test_schedule_task(self, mock_async_track_point_in_utc_time):
-        start_time = utcnow() + timedelta(seconds=1)
-        end_time = start_time + timedelta(minutes=30)
-        task = "start_mowing"
-        kwargs = {"area": "front_yard"}
-
-        try:
-            self.scheduler.add_schedule(start_time, end_time, task, **kwargs)
-            self.assertEqual(mock_async_track_point_in_utc_time.call_count, 2)
-            self.assertEqual(mock_async_track_point_in_utc_time.call_args_list[0][0][1].__name__, "start_task")
-            self.assertEqual(mock_async_track_point_in_utc_time.call_args_list[1][0][1].__name__, "stop_task")
-        except Exception as error:
-            self.error_handler.handle_error(error, "test_schedule_task")
+        schedule_id = self.scheduler.add_schedule(
+            self.start_time, self.end_time, "start_mowing", area="front_yard"
+        )
+
+        self.assertIn(schedule_id, self.scheduler.schedules)
+        schedule = self.scheduler.schedules[schedule_id]
+        self.assertEqual(schedule.task, "start_mowing")
+        self.assertEqual(schedule.kwargs, {"area": "front_yard"})
+        self.assertEqual(self.scheduler.pending_events, 2)
+        self.store.async_delay_save.assert_called()
+
+    def test_single_timer_is_armed(self):
+        later = self.start_time + timedelta(hours=1)
+        self.scheduler.add_schedule(later, None, "start_mowing")
+        first_id = self.scheduler.add_schedule(self.start_time, self.end_time, "start_mowing")
+        self.scheduler.add_schedule(later + timedelta(hours=1), None, "start_mowing")
+
+        self.assertEqual(self.track.call_count, 2)
+        self.assertEqual(self.track.call_args[0][2], self.start_time)
+        # The first timer was cancelled when the earlier schedule was added.
+        self.track.return_value.assert_called_once()
+        self.assertEqual(self.scheduler._heap[0][2], first_id)
+
+    def test_remove_schedule_cancels_timer(self):
+        schedule_id = self.scheduler.add_schedule(
+            self.start_time, self.end_time, "start_mowing"
+        )
+
+        self.assertTrue(self.scheduler.remove_schedule(schedule_id))
+        self.assertEqual(len(self.scheduler.schedules), 0)
+        self.assertEqual(self.scheduler.pending_events, 0)
+        self.track.return_value.assert_called_once()
+
+    def test_modify_schedule_does_not_double_fire(self):
+        schedule_id = self.scheduler.add_schedule(
+            self.start_time, self.end_time, "start_mowing", area="front_yard"
+        )
+        new_start = self.start_time + timedelta(minutes=10)
+        new_end = self.end_time + timedelta(minutes=10)
+
+        self.assertTrue(
+            self.scheduler.modify_schedule(
+                schedule_id, new_start, new_end, "start_mowing", area="back_yard"
+            )
+        )
+        schedule = self.scheduler.schedules[schedule_id]
+        self.assertEqual(schedule.start_time, new_start)
+        self.assertEqual(schedule.kwargs, {"area": "back_yard"})
+
+        self.scheduler._handle_timer(new_start)
+        self.coordinator.async_start_mowing.assert_called_once_with(area="back_yard")
+
+    def test_end_event_docks_mower(self):
+        self.scheduler.add_schedule(self.start_time, self.end_time, "start_mowing")
+
+        self.scheduler._handle_timer(self.end_time)
+        self.coordinator.async_start_mowing.assert_called_once()
+        self.coordinator.async_dock.assert_called_once()
+        self.assertEqual(self.scheduler.pending_events, 0)
+
+    def test_recurring_schedule_queues_next_occurrence(self):
+        schedule_id = self.scheduler.add_schedule(
+            self.start_time, self.end_time, "start_mowing", rrule="FREQ=DAILY"
+        )
+
+        self.scheduler._handle_timer(self.end_time)
+        schedule = self.scheduler.schedules[schedule_id]
+        self.assertEqual(schedule.next_start, self.start_time + timedelta(days=1))
+        self.assertEqual(self.scheduler.pending_events, 2)
+
+    def test_span_of_rule_sets(self):
+        day = timedelta(days=1)
+        window = self.end_time - self.start_time
+        # The fourth day is both the last one allowed and excluded.
+        fourth = (self.start_time + 3 * day).strftime("%Y%m%dT%H%M%SZ")
+        spans = {}
+        for name, recurrence in {
+            "count": "FREQ=DAILY;COUNT=3",
+            "until_with_exdate": f"RRULE:FREQ=DAILY;UNTIL={fourth}\nEXDATE:{fourth}",
+            "open_with_exdate": f"RRULE:FREQ=DAILY\nEXDATE:{fourth}",
+        }.items():
+            schedule = MammotionSchedule(
+                "id", "start_mowing", self.start_time, self.end_time, recurrence
+            )
+            schedule.compile()
+            spans[name] = schedule.span_end
+
+        self.assertEqual(spans["count"], self.start_time + 2 * day + window)
+        self.assertEqual(spans["until_with_exdate"], self.start_time + 2 * day + window)
+        self.assertEqual(spans["open_with_exdate"], END_OF_TIME)
 
     def test_get_schedules(self):
-        start_time = utcnow() + timedelta(seconds=1)
-        end_time = start_time + timedelta(minutes=30)
-        task = "start_mowing"
-        kwargs = {"area": "front_yard"}
-
-        try:
-            self.scheduler.add_schedule(start_time, end_time, task, **kwargs)
-            schedules = self.scheduler.get_schedules()
-            self.assertEqual(len(schedules), 1)
-            self.assertEqual(schedules[0]["task"], task)
-            self.assertEqual(schedules[0]["kwargs"], kwargs)
-        except Exception as error:
-            self.error_handler.handle_error(error, "test_get_schedules")
-
-    def test_add_multiple_schedules(self):
-        start_time_1 = utcnow() + timedelta(seconds=1)
-        end_time_1 = start_time_1 + timedelta(minutes=30)
-        task_1 = "start_mowing"
-        kwargs_1 = {"area": "front_yard"}
-
-        start_time_2 = utcnow() + timedelta(seconds=2)
-        end_time_2 = start_time_2 + timedelta(minutes=40)
-        task_2 = "stop_mowing"
-        kwargs_2 = {"area": "back_yard"}
-
-        try:
-            self.scheduler.add_schedule(start_time_1, end_time_1, task_1, **kwargs_1)
-            self.scheduler.add_schedule(start_time_2, end_time_2, task_2, **kwargs_2)
-            self.assertEqual(len(self.scheduler.schedules), 2)
-            self.assertEqual(self.scheduler.schedules[0]["task"], task_1)
-            self.assertEqual(self.scheduler.schedules[0]["kwargs"], kwargs_1)
-            self.assertEqual(self.scheduler.schedules[1]["task"], task_2)
-            self.assertEqual(self.scheduler.schedules[1]["kwargs"], kwargs_2)
-        except Exception as error:
-            self.error_handler.handle_error(error, "test_add_multiple_schedules")
-
-    def test_remove_non_existent_schedule(self):
-        try:
-            self.scheduler.remove_schedule(0)
-            self.assertEqual(len(self.scheduler.schedules), 0)
-        except Exception as error:
-            self.error_handler.handle_error(error, "test_remove_non_existent_schedule")
-
-    def test_modify_non_existent_schedule(self):
-        new_start_time = utcnow() + timedelta(minutes=10)
-        new_end_time = new_start_time + timedelta(minutes=10)
-        new_task = "stop_mowing"
-        new_kwargs = {"area": "back_yard"}
-
-        try:
-            self.scheduler.modify_schedule(0, new_start_time, new_end_time, new_task, **new_kwargs)
-            self.assertEqual(len(self.scheduler.schedules), 0)
-        except Exception as error:
-            self.error_handler.handle_error(error, "test_modify_non_existent_schedule")
+        self.scheduler.add_schedule(self.start_time, self.end_time, "start_mowing")
+        self.scheduler.add_schedule(self.end_time, None, "stop_mowing")
+
+        schedules = self.scheduler.get_schedules()
+        self.assertEqual(len(schedules), 2)
+        self.assertEqual(
+            {schedule["task"] for schedule in schedules}, {"start_mowing", "stop_mowing"}
+        )
+        self.assertEqual(schedules[0]["start_time"], self.start_time.isoformat())
+
+    def test_overlapping_schedule_is_rejected(self):
+        self.scheduler.add_schedule(self.start_time, self.end_time, "start_mowing")
+
+        self.scheduler.error_handler = MagicMock()
+        result = self.scheduler.add_schedule(
+            self.start_time + timedelta(minutes=10),
+            self.end_time + timedelta(minutes=10),
+            "start_mowing",
+        )
+        self.assertIsNone(result)
+        self.assertIsInstance(
+            self.scheduler.error_handler.handle_error.call_args[0][0],
+            ScheduleConflictError,
+        )
+        self.assertEqual(len(self.scheduler.schedules), 1)
+
+    def test_recurring_conflict_is_detected(self):
+        self.scheduler.add_schedule(
+            self.start_time, self.end_time, "start_mowing", rrule="FREQ=WEEKLY"
+        )
+        self.scheduler.error_handler = MagicMock()
+
+        next_week = self.start_time + timedelta(weeks=3, minutes=5)
+        self.assertIsNone(
+            self.scheduler.add_schedule(next_week, None, "stop_mowing")
+        )
+        free_day = self.start_time + timedelta(weeks=3, days=1)
+        self.assertIsNotNone(
+            self.scheduler.add_schedule(free_day, None, "stop_mowing")
+        )
+
+    def test_merge_mode_extends_existing_window(self):
+        self.scheduler.conflict_mode = CONFLICT_MERGE
+        first_id = self.scheduler.add_schedule(
+            self.start_time, self.end_time, "start_mowing", area="front_yard"
+        )
+        merged_id = self.scheduler.add_schedule(
+            self.start_time + timedelta(minutes=10),
+            self.end_time + timedelta(minutes=10),
+            "start_mowing",
+            area="front_yard",
+        )
+
+        self.assertEqual(merged_id, first_id)
+        self.assertEqual(len(self.scheduler.schedules), 1)
+        schedule = self.scheduler.schedules[first_id]
+        self.assertEqual(schedule.end_time, self.end_time + timedelta(minutes=10))
+        self.assertEqual(self.scheduler.pending_events, 2)
+
+    def test_schedules_between(self):
+        self.scheduler.add_schedule(
+            self.start_time, self.end_time, "start_mowing", rrule="FREQ=DAILY"
+        )
+        self.scheduler.add_schedule(
+            self.start_time + timedelta(days=30, hours=2), None, "stop_mowing"
+        )
+
+        windows = self.scheduler.schedules_between(
+            self.start_time + timedelta(days=1), self.start_time + timedelta(days=4)
+        )
+        self.assertEqual(len(windows), 3)
+        self.assertEqual(windows[0][0], self.start_time + timedelta(days=1))
+        self.assertTrue(all(window[2].task == "start_mowing" for window in windows))
+
+    def test_non_existent_schedule(self):
+        self.assertFalse(self.scheduler.remove_schedule("missing"))
+        self.assertFalse(self.scheduler.modify_schedule("missing", self.start_time))
+        self.assertEqual(len(self.scheduler.schedules), 0)
 
 
 if __name__ == "__main__":
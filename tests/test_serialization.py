@@ -0,0 +1,91 @@
+import asyncio
+import unittest
+from dataclasses import asdict
+from unittest.mock import MagicMock
+
+from homeassistant.core import HomeAssistant
+from pymammotion.data.model.device import MowingDevice
+from pymammotion.data.model.hash_list import FrameList
+from pymammotion.proto.common import CommDataCouple
+from pymammotion.proto.mctrl_nav import NavGetCommDataAck
+
+from custom_components.mammotion.serialization import MammotionSerializer, cow_copy
+
+
+async def _executor_job(func, *args):
+    return func(*args)
+
+
+def _mower() -> MowingDevice:
+    mower = MowingDevice()
+    frame = NavGetCommDataAck(
+        hash=1, total_frame=1, current_frame=1, data_couple=[CommDataCouple(x=1.0, y=2.0)]
+    )
+    mower.map.area[1] = FrameList(total_frame=1, data=[frame])
+    mower.report_data.dev.battery_val = 80
+    mower.update_raw({"sys": {"toapp_report_data": {"dev": {"sys_status": 13}}}})
+    return mower
+
+
+class TestCowCopy(unittest.TestCase):
+    def test_copy_matches_original(self):
+        mower = _mower()
+
+        self.assertEqual(asdict(cow_copy(mower)), asdict(mower))
+
+    def test_in_place_updates_do_not_reach_the_copy(self):
+        mower = _mower()
+        copied = cow_copy(mower)
+
+        mower.map.area[2] = mower.map.area[1]
+        mower.map.area[1].data.append(mower.map.area[1].data[0])
+        mower.report_data.dev.battery_val = 10
+        mower.device.sys["toapp_report_data"] = {}
+        mower.err_code_list.append(1)
+
+        self.assertEqual(list(copied.map.area), [1])
+        self.assertEqual(len(copied.map.area[1].data), 1)
+        self.assertEqual(copied.report_data.dev.battery_val, 80)
+        self.assertEqual(copied.sys.toapp_report_data.dev.sys_status, 13)
+        self.assertEqual(copied.err_code_list, [])
+
+    def test_parsed_frames_are_shared(self):
+        mower = _mower()
+        copied = cow_copy(mower)
+
+        self.assertIsNot(copied.map.area[1], mower.map.area[1])
+        self.assertIs(copied.map.area[1].data[0].data_couple[0], mower.map.area[1].data[0].data_couple[0])
+
+
+class TestMammotionSerializer(unittest.TestCase):
+    def setUp(self):
+        self.hass = MagicMock(spec=HomeAssistant)
+        self.hass.async_add_executor_job = _executor_job
+        self.serializer = MammotionSerializer(self.hass)
+
+    def test_as_dict_and_json(self):
+        mower = _mower()
+
+        result = asyncio.run(self.serializer.async_as_dict(mower, "save"))
+        encoded = asyncio.run(self.serializer.async_json(mower.report_data, "json"))
+
+        self.assertEqual(result, asdict(mower))
+        self.assertIn(b'"battery_val":80', encoded)
+
+    def test_times_each_call(self):
+        mower = _mower()
+        for _ in range(3):
+            asyncio.run(self.serializer.async_as_dict(mower, "save"))
+        asyncio.run(self.serializer.async_run({"a": 1}, dict, "restore", copy=False))
+
+        stats = self.serializer.stats
+
+        self.assertEqual(stats["save"]["calls"], 3)
+        self.assertGreater(stats["save"]["loop_ms_max"], 0)
+        self.assertGreater(stats["save"]["executor_ms_last"], 0)
+        self.assertEqual(stats["restore"]["calls"], 1)
+        self.assertEqual(stats["restore"]["loop_ms_max"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import asyncio
+import unittest
+
+from pymammotion.utility.constant import WorkMode
+
+from simulator import (
+    FakeMqttBroker,
+    ReportRates,
+    SimulatedMower,
+    SimulatedPlan,
+    async_ble_device_manager,
+    cloud_device_manager,
+)
+
+
+async def _settle():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+class TestSimulatedMowerBle(unittest.TestCase):
+    def setUp(self):
+        self.mower = SimulatedMower(name="Luba-SIMBLE", rates=ReportRates(0, 0, 0, 0))
+
+    def _run(self, scenario):
+        async def run():
+            device = await async_ble_device_manager(self.mower)
+            await scenario(device.ble(), device)
+            await _settle()
+            return device
+
+        return asyncio.run(run())
+
+    def test_report_cfg_updates_state(self):
+        async def scenario(ble, device):
+            reply = await ble.command("get_report_cfg")
+            self.assertTrue(reply)
+
+        device = self._run(scenario)
+        report = device.mower_state.report_data
+        self.assertEqual(report.dev.battery_val, 100)
+        self.assertEqual(report.dev.sys_status, WorkMode.MODE_CHARGING)
+        # The state manager stops reporting again while the mower is idle.
+        self.assertEqual(self.mower.received["todev_report_cfg"], 2)
+
+    def test_start_job_and_return_to_dock(self):
+        async def scenario(ble, device):
+            await ble.command("start_job")
+            self.assertEqual(self.mower.sys_status, WorkMode.MODE_WORKING)
+            self.mower.step(120)
+            await ble.command("get_report_cfg")
+            await _settle()
+            self.assertGreater(device.mower_state.report_data.work.area >> 16, 0)
+            self.assertNotEqual(device.mower_state.location.device.latitude, 0)
+
+            await ble.command("return_to_dock")
+            self.assertEqual(self.mower.sys_status, WorkMode.MODE_RETURNING)
+            self.mower.step(600)
+
+        device = self._run(scenario)
+        self.assertEqual(self.mower.sys_status, WorkMode.MODE_CHARGING)
+        self.assertEqual((self.mower.x, self.mower.y), self.mower.dock)
+
+    def test_map_sync_fetches_every_frame(self):
+        async def scenario(ble, device):
+            await ble.start_map_sync()
+            for _ in range(20):
+                await _settle()
+
+        device = self._run(scenario)
+        area_map = device.mower_state.map
+        self.assertEqual(sorted(area_map.area), [1000, 1001, 1002])
+        for frames in area_map.area.values():
+            self.assertEqual(len(frames.data), frames.total_frame)
+
+    def test_read_plan(self):
+        self.mower.plans = [SimulatedPlan("p1", "Front"), SimulatedPlan("p2", "Back")]
+
+        async def scenario(ble, device):
+            await ble.command("read_plan", sub_cmd=2, plan_index=1)
+
+        device = self._run(scenario)
+        plan = device.mower_state.nav.todev_planjob_set
+        self.assertEqual(plan.task_name, "Back")
+        self.assertEqual(plan.total_plan_num, 2)
+
+    def test_unknown_command_is_echoed(self):
+        async def scenario(ble, device):
+            self.assertTrue(await ble.command("get_device_product_model"))
+
+        self._run(scenario)
+        self.assertEqual(sum(self.mower.unhandled.values()), 1)
+
+
+class TestSimulatedMowerMqtt(unittest.TestCase):
+    def test_commands_round_trip_through_broker(self):
+        mower = SimulatedMower(name="Luba-SIMMQTT", iot_id="sim-mqtt", rates=ReportRates(0, 0, 0, 0))
+
+        async def run():
+            broker = FakeMqttBroker()
+            device = cloud_device_manager(mower, broker)
+            broker.connect_async()
+            await _settle()
+            reply = await device.cloud().command("get_report_cfg")
+            await device.cloud().command("start_job")
+            await _settle()
+            await device.cloud().stop()
+            return broker, device, reply
+
+        broker, device, reply = asyncio.run(run())
+        self.assertTrue(reply)
+        self.assertEqual(mower.sys_status, WorkMode.MODE_WORKING)
+        self.assertEqual(device.mower_state.report_data.dev.sys_status, WorkMode.MODE_WORKING)
+        self.assertGreaterEqual(broker.commands, 2)
+
+
+class TestReportRates(unittest.TestCase):
+    def test_due_reports_follow_rates(self):
+        mower = SimulatedMower(rates=ReportRates(dev_status=1, location=4, work=0, map_sync=0))
+        due = dict.fromkeys(("dev_status", "location", "work", "map_sync", "report"), 0.0)
+
+        sent = sum(len(mower.due_reports(step / 10 + 0.01, due)) for step in range(20))
+
+        # Two seconds: two dev status and eight location reports.
+        self.assertEqual(sent, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import dataclasses
+import unittest
+from types import SimpleNamespace
+
+from pymammotion.data.model.device import MowingDevice
+
+from custom_components.mammotion.coordinates import MammotionCoordinateService
+from custom_components.mammotion.coordinator import MammotionDataUpdateCoordinator
+from custom_components.mammotion.snapshot import MowerSnapshot
+
+
+def _mower(battery: int = 80, charge_state: int = 0) -> MowingDevice:
+    mower = MowingDevice()
+    mower.report_data.dev.battery_val = battery
+    mower.report_data.work.area = (40 << 16) | 250
+    mower.location.orientation = 90
+    mower.update_raw(
+        {"sys": {"toapp_report_data": {"dev": {"sys_status": 13, "charge_state": charge_state}}}}
+    )
+    return mower
+
+
+class TestMowerSnapshot(unittest.TestCase):
+    def test_copies_consumed_fields(self):
+        snapshot = MowerSnapshot.from_mower(_mower(charge_state=1), 3)
+
+        self.assertEqual(snapshot.version, 3)
+        self.assertTrue(snapshot.reported)
+        self.assertEqual(snapshot.reported_sys_status, 13)
+        self.assertEqual(snapshot.charge_state, 1)
+        self.assertEqual(snapshot.battery_val, 80)
+        self.assertEqual(snapshot.orientation, 90)
+        self.assertIsNone(snapshot.position)
+
+    def test_unreported_mower(self):
+        snapshot = MowerSnapshot.from_mower(MowingDevice(), 1)
+
+        self.assertFalse(snapshot.reported)
+        self.assertIsNone(snapshot.pose)
+
+    def test_is_slotted_and_immutable(self):
+        snapshot = MowerSnapshot.from_mower(_mower(), 1)
+
+        self.assertFalse(hasattr(snapshot, "__dict__"))
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            snapshot.battery_val = 10
+
+    def test_changed_fields(self):
+        first = MowerSnapshot.from_mower(_mower(), 1)
+        second = MowerSnapshot.from_mower(_mower(battery=79), 2)
+
+        self.assertIn("battery_val", first.changed(None))
+        self.assertNotIn("version", first.changed(None))
+        self.assertEqual(second.changed(first), {"battery_val"})
+        self.assertEqual(first.changed(first), frozenset())
+
+
+class TestCoordinatorSnapshot(unittest.TestCase):
+    def test_versions_and_changes(self):
+        coordinator = SimpleNamespace(
+            _snapshot=None,
+            snapshot_changes=frozenset(),
+            coordinates=MammotionCoordinateService(),
+        )
+        update = MammotionDataUpdateCoordinator._update_snapshot
+
+        update(coordinator, _mower())
+        update(coordinator, _mower(battery=50))
+
+        self.assertEqual(coordinator._snapshot.version, 2)
+        self.assertEqual(coordinator._snapshot.battery_val, 50)
+        self.assertEqual(coordinator.snapshot_changes, {"battery_val"})
+
+
+if __name__ == "__main__":
+    unittest.main()
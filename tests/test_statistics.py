@@ -0,0 +1,109 @@
+import dataclasses
+import unittest
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from homeassistant.core import HomeAssistant
+from pymammotion.data.model.device import MowingDevice
+from pymammotion.utility.constant.device_constant import WorkMode
+
+from custom_components.mammotion.snapshot import MowerSnapshot
+from custom_components.mammotion.statistics import (
+    BATTERY_USED,
+    CHARGE_CYCLES,
+    MOWED_AREA,
+    MOWING_TIME,
+    MammotionWorkStatistics,
+    WorkAccumulator,
+)
+
+START = datetime(2024, 6, 1, 10, 0, tzinfo=UTC)
+
+
+def _snapshot(progress=0, battery=100, working=True, charging=0) -> MowerSnapshot:
+    return dataclasses.replace(
+        MowerSnapshot.from_mower(MowingDevice(), 1),
+        reported=True,
+        reported_sys_status=WorkMode.MODE_WORKING if working else WorkMode.MODE_READY,
+        charge_state=charging,
+        work_area=(progress << 16) | 500,
+        battery_val=battery,
+    )
+
+
+class TestWorkAccumulator(unittest.TestCase):
+    def setUp(self):
+        self.accumulator = WorkAccumulator()
+
+    def test_adds_differences_to_the_open_hour(self):
+        self.accumulator.update(_snapshot(progress=10, battery=90), START)
+        self.accumulator.update(_snapshot(progress=20, battery=85), START + timedelta(minutes=6))
+
+        self.assertEqual(
+            self.accumulator.totals,
+            {MOWING_TIME: 0.1, MOWED_AREA: 50.0, BATTERY_USED: 5},
+        )
+
+    def test_new_job_and_charging(self):
+        self.accumulator.update(_snapshot(progress=90, battery=20), START)
+        self.accumulator.update(
+            _snapshot(progress=0, battery=70, working=False, charging=1),
+            START + timedelta(minutes=30),
+        )
+
+        self.assertEqual(self.accumulator.totals, {CHARGE_CYCLES: 0.5})
+
+    def test_closing_an_hour_queues_it_with_running_sums(self):
+        self.accumulator.sums = {MOWED_AREA: 1000.0}
+        self.accumulator.update(_snapshot(progress=10), START)
+        self.accumulator.update(_snapshot(progress=20), START + timedelta(minutes=10))
+        self.accumulator.roll(START + timedelta(hours=1, minutes=5))
+        self.accumulator.roll(START + timedelta(hours=2, minutes=5))
+
+        self.assertEqual(len(self.accumulator.pending), 1)
+        hour = self.accumulator.pending[0]
+        self.assertEqual(hour["start"], START.isoformat())
+        self.assertEqual(hour["totals"][MOWED_AREA], 50.0)
+        self.assertEqual(hour["sums"][MOWED_AREA], 1050.0)
+        self.assertEqual(self.accumulator.totals, {})
+
+    def test_restores_in_the_middle_of_an_hour(self):
+        self.accumulator.update(_snapshot(progress=10), START)
+        self.accumulator.update(_snapshot(progress=20), START + timedelta(minutes=10))
+
+        restored = WorkAccumulator()
+        restored.restore(self.accumulator.as_dict())
+        restored.update(_snapshot(progress=30), START + timedelta(minutes=20))
+
+        self.assertEqual(restored.totals[MOWED_AREA], 100.0)
+        self.assertAlmostEqual(restored.totals[MOWING_TIME], 20 / 60)
+
+
+class TestMammotionWorkStatistics(unittest.TestCase):
+    def test_imports_closed_hours_once(self):
+        hass = MagicMock(spec=HomeAssistant)
+        hass.config = SimpleNamespace(components={"recorder"})
+        coordinator = SimpleNamespace(device_name="Luba-VS123456")
+        statistics = MammotionWorkStatistics(hass, coordinator)
+        statistics.metadata = {MOWED_AREA: {"statistic_id": "mammotion:luba_vs123456_mowed_area"}}
+        accumulator = statistics.accumulator
+        accumulator.update(_snapshot(progress=10), START)
+        accumulator.update(_snapshot(progress=20), START + timedelta(minutes=10))
+        accumulator.roll(START + timedelta(hours=1))
+
+        with patch(
+            "custom_components.mammotion.statistics.async_add_external_statistics"
+        ) as add:
+            statistics._async_import()
+            statistics._async_import()
+
+        add.assert_called_once()
+        rows = add.call_args.args[2]
+        self.assertEqual(rows, [{"start": START, "state": 50.0, "sum": 50.0}])
+        self.assertEqual(accumulator.pending, [])
+        self.assertEqual(statistics.stats["imported_hours"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import asyncio
+import dataclasses
+import math
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from homeassistant.core import HomeAssistant
+from pymammotion.data.model.device import MowingDevice
+
+from custom_components.mammotion.snapshot import MowerSnapshot
+from custom_components.mammotion.telemetry import MammotionTelemetryHub, telemetry_frame
+
+
+def _snapshot(**changes) -> MowerSnapshot:
+    return dataclasses.replace(MowerSnapshot.from_mower(MowingDevice(), 1), **changes)
+
+
+class TestTelemetryFrame(unittest.TestCase):
+    def test_rounds_pose_and_position(self):
+        frame = telemetry_frame(
+            _snapshot(
+                battery_val=80,
+                work_area=(40 << 16) | 250,
+                pose=(1.23456, -2.5, math.pi / 2),
+                position=(52.123456789, 4.987654321),
+            )
+        )
+
+        self.assertEqual(frame["battery"], 80)
+        self.assertEqual(frame["progress"], 40)
+        self.assertEqual((frame["x"], frame["y"], frame["heading"]), (1.23, -2.5, 90.0))
+        self.assertEqual((frame["lat"], frame["lon"]), (52.1234568, 4.9876543))
+
+
+class TestMammotionTelemetryHub(unittest.TestCase):
+    def setUp(self):
+        self.hub = MammotionTelemetryHub(MagicMock(spec=HomeAssistant))
+        self.timers = []
+        patcher = patch(
+            "custom_components.mammotion.telemetry.async_call_later",
+            side_effect=lambda hass, delay, action: self.timers.append(action) or MagicMock(),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_sends_full_frame_then_deltas(self):
+        messages = []
+        self.hub.async_subscribe(messages.append, _snapshot(battery_val=80), interval=0.2)
+        self.hub.subscribers[0].sent_at = 0
+
+        self.hub.async_publish(_snapshot(battery_val=79))
+        self.hub.async_publish(_snapshot(battery_val=79))
+
+        self.assertIn("status", messages[0])
+        self.assertEqual(messages[1:], [{"battery": 79}])
+
+    def test_rate_limited_updates_are_merged(self):
+        messages = []
+        self.hub.async_subscribe(messages.append, _snapshot(battery_val=80), interval=1)
+
+        self.hub.async_publish(_snapshot(battery_val=79))
+        self.hub.async_publish(_snapshot(battery_val=78, work_area=10 << 16))
+        self.hub.async_publish(_snapshot(battery_val=77, work_area=10 << 16))
+
+        self.assertEqual(len(messages), 1)
+        self.assertEqual(len(self.timers), 1)
+
+        self.timers[0](None)
+
+        self.assertEqual(messages[1], {"battery": 77, "progress": 10})
+        self.assertEqual(self.hub.stats["subscribers"][0]["coalesced"], 2)
+
+    def test_unsubscribe(self):
+        unsubscribe = self.hub.async_subscribe(lambda delta: None, _snapshot())
+
+        unsubscribe()
+        self.hub.async_publish(_snapshot(battery_val=5))
+
+        self.assertEqual(self.hub.subscribers, {})
+
+
+class TestTelemetryFlushTimer(unittest.TestCase):
+    def test_rate_limited_flush_runs_on_the_event_loop(self):
+        sent = []
+
+        async def run():
+            hass = HomeAssistant("/tmp")
+            hub = MammotionTelemetryHub(hass)
+            hub.async_subscribe(
+                lambda delta: sent.append((threading.get_ident(), delta)),
+                _snapshot(battery_val=80),
+                interval=0.2,
+            )
+            hub.async_publish(_snapshot(battery_val=79))
+            await asyncio.sleep(0.4)
+            await hass.async_stop(force=True)
+
+        asyncio.run(run())
+
+        self.assertEqual(sent[-1][1], {"battery": 79})
+        self.assertEqual({thread for thread, _delta in sent}, {threading.get_ident()})
+
+
+if __name__ == "__main__":
+    unittest.main()